@@ -20,12 +20,15 @@
 # Import Modules:
 import os
 from datetime import datetime
-from itertools import product
+from itertools import islice
 import sys
 from config import *
 import dask.config
 from main.kernel.fricosipy_core import * 
 from main.kernel.io import *
+from main.kernel.writer import WriterClass
+from main.kernel.state import write_restart_file
+from main.kernel.scheduling import order_nodes, write_node_runtimes
 from dask.distributed import Client, LocalCluster, as_completed
 from tornado import gen
 import logging
@@ -89,28 +92,22 @@ def main():
         print('\t Subsurface Variables : (Disabled)')
     print('\t ==============================================================\n')
 
+    # ================== #
+    # Create Result File:
+    # ================== #
+
+    # Node results are written into the output file as they arrive (no global result arrays are held in memory):
+    IO.create_output_file()
+
     # ============================================ #
     # Create a Client for Distributed Calculations
     # ============================================ #
 
-    with LocalCluster(scheduler_port = local_port, n_workers = workers, threads_per_worker = 1, silence_logs = True, processes = True) as cluster:
-        run_fricosipy(cluster, IO, STATIC, METEO, ILLUMINATION, simulation_start_time)
-
-    # ================== #
-    # Write Result File:
-    # ================== #
-
-    # Specify encoding dictionary and ensure maintenance of CRS co-ordinate reference:
-    RESULT = IO.get_result()
-    encoding = dict()
-    for var in RESULT.data_vars:
-        encoding[var] = dict(zlib = True, complevel = compression_level)
-        if 'grid_mapping' in RESULT[var].attrs:
-            encoding[var]['grid_mapping'] = RESULT[var].attrs['grid_mapping']
-            del RESULT[var].attrs['grid_mapping']
-    if 'spatial_ref' in RESULT.coords:
-        encoding['spatial_ref'] = dict(zlib = False)
-    RESULT.to_netcdf(os.path.join(data_path,'output',output_netcdf), encoding = encoding, mode = 'w')
+    try:
+        with LocalCluster(scheduler_port = local_port, n_workers = workers, threads_per_worker = 1, silence_logs = True, processes = True) as cluster:
+            run_fricosipy(cluster, IO, STATIC, METEO, ILLUMINATION, simulation_start_time)
+    finally:
+        IO.close_output_file()
     
     # Record total simulation time:
     simulation_time = int((datetime.now() - simulation_start_time).total_seconds())
@@ -127,14 +124,8 @@ def run_fricosipy(cluster, IO, STATIC, METEO, ILLUMINATION, simulation_start_tim
 
     with Client(cluster) as client:
 
-        # Create Global Numpy Arrays which Aggregates all Local Results
-        IO.create_global_result_arrays()
-
-        # Generate a list of the spatial indexes of all glacial nodes: 
-        nodes = [(y, x) for y, x in product(range(STATIC.sizes['y']), range(STATIC.sizes['x'])) if STATIC.MASK.isel(y=y, x=x).item() == 1]
-
-        # Group nodes according to the number of workers available (i.e. the number that can run simulatenously)
-        batches = [nodes[i:i + workers] for i in range(0, len(nodes), workers)]
+        # Generate a list of the spatial indexes of all glacial nodes (in their order of submission to the cluster): 
+        nodes = order_nodes(IO.STATIC, IO.nodes)
 
         # Print paralleslisation information:
         info = client.scheduler_info()
@@ -150,55 +141,100 @@ def run_fricosipy(cluster, IO, STATIC, METEO, ILLUMINATION, simulation_start_tim
         print('\t ==============================================================\n\n')
 
         print('\t ============================================================')
-        print('\t Running FRICOSIPY simulation on',workers,'workers in',len(batches),'batches...')
+        print('\t Running FRICOSIPY simulation of',len(nodes),'nodes on',workers,'workers...')
         print('\t ============================================================\n')
         sys.stdout.flush()
 
-        # Scatter shared meteorological input for faster computation:
-        METEO_future = client.scatter(METEO, broadcast = True)
-
-        # Simulate each batch sequentially
-        completed_nodes = 0
-        for i in range(len(batches)):
-
-            # Start node simulation timer
-            node_start_time = datetime.now()
-
-            # Submit the spatial nodes to each worker and run the FRICOSIPY model
-            futures = []
-            for y,x in batches[i]:
-                futures.append(client.submit(fricosipy_core, STATIC.isel(y=y, x=x), METEO_future, ILLUMINATION.isel(y=y, x=x), y, x, IO.nt, pure = False))
-            
-            # --- Main FRICOSIPY Simulation ---
-            
-            # Write the results collected from each worker to release memory
+        # Scatter shared meteorological input for faster computation (gridded meteorological data: each node only receives its own column):
+        if not is_gridded(METEO):
+            METEO_future = client.scatter(METEO, broadcast = True)
+
+        def get_node_meteo(y, x):
+            """ Returns the (lazily read) meteorological data of a spatial node """
+            return METEO.isel(y=y, x=x) if is_gridded(METEO) else METEO_future
+
+        def submit_node(y, x, w = 0, STATE = None):
+            """ Submits a spatial node (time window w, starting from the node STATE of the previous time window) to the cluster 
+                and runs the FRICOSIPY model """
+
+            # First time window: initial conditions or the state of the node in the restart file
+            if w == 0:
+                STATE = IO.get_initial_state(y, x)
+            future = client.submit(fricosipy_node, STATIC.isel(y=y, x=x), get_node_meteo(y, x), ILLUMINATION.isel(y=y, x=x), y, x, IO.nt, 
+                                   IO.windows[w], STATE, IO.get_node_stations(y, x), pure = False)
+
+            # Zarr output: the worker writes the node results directly into its region of the output store
+            if output_format == 'zarr':
+                future = client.submit(write_local_results_to_zarr, future, IO.get_output_region(y, x), IO.append_offsets, pure = False)
+
+            # Start node simulation timer (at the first time window)
+            if w == 0:
+                node_start_times[(y, x)] = datetime.now()
+            node_windows[future.key] = w
+            return future
+
+        # Keep every worker busy: a new node is submitted as soon as a node is completed
+        # (time windows: the next time window of a node is submitted as soon as the previous one is completed)
+        node_start_times = dict()
+        node_windows = dict()
+        restart_states = dict()
+        node_runtimes = dict()
+        pending_nodes = iter(nodes)
+        futures = as_completed([submit_node(y, x) for y, x in islice(pending_nodes, workers)])
+
+        # NetCDF output: the node results are written by a background writer thread (the client blocks when the writer falls behind)
+        writer = WriterClass(IO, writer_queue_size) if output_format == 'netcdf' else None
+
+        # --- Main FRICOSIPY Simulation ---
+
+        try:
+            completed_nodes = 0
             for future in futures:
 
                 # Get the results from the workers
-                indY,indX, \
-                AIR_TEMPERATURE,AIR_PRESSURE,RELATIVE_HUMIDITY,SPECIFIC_HUMIDITY,WIND_SPEED,FRACTIONAL_CLOUD_COVER, \
-                SHORTWAVE,LONGWAVE,SENSIBLE,LATENT,SUBSURFACE,RAIN_HEAT_FLUX,MELT_ENERGY, \
-                RAIN,SNOWFALL,EVAPORATION,SUBLIMATION,CONDENSATION,DEPOSITION,SURFACE_MELT,SURFACE_MASS_BALANCE, \
-                REFREEZE,SUBSURFACE_MELT,RUNOFF,MASS_BALANCE, \
-                SNOW_HEIGHT,SNOW_WATER_EQUIVALENT,TOTAL_HEIGHT,SURFACE_ELEVATION,SURFACE_TEMPERATURE,SURFACE_HUMIDITY,SURFACE_ALBEDO,N_LAYERS,FIRN_TEMPERATURE,FIRN_TEMPERATURE_CHANGE,FIRN_FACIE, \
-                LAYER_DEPTH,LAYER_HEIGHT,LAYER_DENSITY,LAYER_TEMPERATURE,LAYER_WATER_CONTENT,LAYER_COLD_CONTENT,LAYER_POROSITY,LAYER_ICE_FRACTION, \
-                LAYER_IRREDUCIBLE_WATER,LAYER_REFREEZE,LAYER_HYDRO_YEAR,LAYER_GRAIN_SIZE = future.result()
-                                
-                IO.copy_local_to_global(indY,indX, \
-                AIR_TEMPERATURE,AIR_PRESSURE,RELATIVE_HUMIDITY,SPECIFIC_HUMIDITY,WIND_SPEED,FRACTIONAL_CLOUD_COVER, \
-                SHORTWAVE,LONGWAVE,SENSIBLE,LATENT,SUBSURFACE,RAIN_HEAT_FLUX,MELT_ENERGY, \
-                RAIN,SNOWFALL,EVAPORATION,SUBLIMATION,CONDENSATION,DEPOSITION,SURFACE_MELT,SURFACE_MASS_BALANCE, \
-                REFREEZE,SUBSURFACE_MELT,RUNOFF,MASS_BALANCE, \
-                SNOW_HEIGHT,SNOW_WATER_EQUIVALENT,TOTAL_HEIGHT,SURFACE_ELEVATION,SURFACE_TEMPERATURE,SURFACE_HUMIDITY,SURFACE_ALBEDO,N_LAYERS,FIRN_TEMPERATURE,FIRN_TEMPERATURE_CHANGE,FIRN_FACIE, \
-                LAYER_DEPTH,LAYER_HEIGHT,LAYER_DENSITY,LAYER_TEMPERATURE,LAYER_WATER_CONTENT,LAYER_COLD_CONTENT,LAYER_POROSITY,LAYER_ICE_FRACTION, \
-                LAYER_IRREDUCIBLE_WATER,LAYER_REFREEZE,LAYER_HYDRO_YEAR,LAYER_GRAIN_SIZE)
+                NODE_RESULT = future.result()
+                w = node_windows.pop(future.key)
+                indY, indX = NODE_RESULT[0], NODE_RESULT[1]
+
+                # Runtime [s] & simulated timesteps of the node (summed over the time windows):
+                runtime, timesteps = node_runtimes.get((indY, indX), (0.0, 0))
+                node_runtimes[(indY, indX)] = (runtime + NODE_RESULT[2].get('runtime', np.nan), timesteps + NODE_RESULT[2].get('timesteps', 0))
+
+                # Submit the next time window of the node (carrying its state forward) or the next node:
+                STATE = NODE_RESULT[4] if len(NODE_RESULT) > 4 else None
+                node_completed = (STATE is None) or (STATE['melted'] == True) or (w + 1 == len(IO.windows))
+                if node_completed:
+                    for y, x in islice(pending_nodes, 1):
+                        futures.add(submit_node(y, x))
+                else:
+                    futures.add(submit_node(indY, indX, w + 1, STATE))
+
+                # Queue the local node results for writing into their region of the output file (NetCDF only)
+                if writer is not None:
+                    writer.put(NODE_RESULT[:4])
+
+                # Final state of the node for the restart file:
+                if node_completed and (restart_output is not None):
+                    restart_states[(indY, indX)] = STATE
 
                 # Update progress bar:
-                completed_nodes += 1
-                report_progress(completed_nodes,len(nodes),simulation_start_time,node_start_time)
-
-            # Write results to file
-            IO.write_results_to_file()
+                if node_completed:
+                    completed_nodes += 1
+                    report_progress(completed_nodes,len(nodes),simulation_start_time,node_start_times.pop((indY, indX)))
+
+        finally:
+            # Wait until all queued node results are written:
+            if writer is not None:
+                writer.close()
+
+        # Write the final state of every node to the restart file (to continue the simulation):
+        if restart_output is not None:
+            write_restart_file(restart_states, IO.STATIC, METEO.time.values[-1])
+            print('\n\t Restart file written: %s' % restart_output)
+
+        # Log the runtime of every simulated node (cost model of the node ordering of subsequent simulations):
+        if node_ordering == 'cost':
+            write_node_runtimes(IO.STATIC, node_runtimes)
 
 # =============================================================================================================== #
 
@@ -24,6 +24,8 @@ illumination_netcdf = '<illumination_file>.nc'
 
 # Output File:
 output_netcdf = '<output_file>.nc'
+output_format = 'netcdf'          # Options: ['netcdf','zarr'] (Zarr: directory store, e.g. '<output_file>.zarr', written directly by the workers)
+output_layout = 'grid'            # Options: ['grid','node'] (node: only the simulated glacier nodes are stored along a 1-D 'node' dimension)
 
 # ================= #
 # SIMULATION PERIOD 
@@ -33,6 +35,18 @@ output_netcdf = '<output_file>.nc'
 time_start   = '2000-01-01T00:00' # Datetime (yyyy-mm-ddThh:mm)
 time_end     = '2024-12-31T23:00' # Datetime (yyyy-mm-ddThh:mm)
 
+# Simulation Restart / Continuation:
+restart_input = None               # Restart file (in 'data/restart/') with the final state of a previous simulation, from which the nodes are initialised
+                                   # (the simulation must start one timestep after its final timestamp) (if unused - 'None': initial conditions)
+restart_output = None              # Restart file (in 'data/restart/') to which the final state of every node is written, e.g. '<restart_file>.nc' (if unused - 'None')
+append_output = False              # Append the timesteps of the simulation to the existing output file instead of rewriting it (Zarr only)
+
+# Cyclic Spin-up (Convergence Detection):
+spin_up_cycles = None              # Maximum number of cycles of the spin-up period, after which the spin-up of a node is stopped (if unused - 'None')
+spin_up_period = None              # (start, end) Datetimes (yyyy-mm-ddThh:mm) of the cycled meteorological forcing, e.g. ('2000-10-01T00:00','2001-09-30T23:00')
+spin_up_depths = [1, 5, 10, 20]    # Depths [m] at which the density & temperature profiles are compared between successive cycles
+spin_up_tolerances = {'density': 1.0, 'temperature': 0.05, 'height': 0.01} # Convergence tolerances of the change over a cycle [kg m-3, K, m]
+
 # ========================== #
 # OUTPUT REPORTING FREQUENCY 
 # ========================== #
@@ -45,6 +59,14 @@ initial_timestamp  = None          # (Datetime (yyyy-mm-ddThh:mm) , if unused -
 reduced_output = False             # Only report output variables on user-defined output timestamps.
 output_timestamps = None           # CSV file with desired output timestamps (if unused - 'None').
 
+# Multi-resolution Aggregates:
+aggregation_levels = {}            # Additional aggregation levels ('daily','monthly','hydrological_year') reported in their own output group,
+                                   # e.g. {'daily': ['SURFACE_MASS_BALANCE','RUNOFF'], 'hydrological_year': ['AIR_TEMPERATURE','MASS_BALANCE']}
+
+# Derived Indicators:
+indicators = []                    # Annual indicators reported in the 'indicators' output group (year,y,x) (see main/kernel/indicators.py),
+                                   # e.g. ['MELT_HOURS','MELT_DAYS','FIRST_MELT_DAY','LAST_MELT_DAY','MAX_SNOW_HEIGHT','REFREEZE_FRACTION','MAX_FIRN_TEMPERATURE','MIN_FIRN_TEMPERATURE']
+
 # ======================= #
 # SPATIAL EXTENT / SUBSET 
 # ======================= #
@@ -67,6 +89,10 @@ other =                    ['SNOW_HEIGHT','SNOW_WATER_EQUIVALENT','TOTAL_HEIGHT'
 # 4-D Output Variables:
 full_field = False                                              
 subsurface_variables =     ['DEPTH','HEIGHT','DENSITY','TEMPERATURE','WATER_CONTENT','COLD_CONTENT','POROSITY','ICE_FRACTION','IRREDUCIBLE_WATER','REFREEZE','HYDRO_YEAR','GRAIN_SIZE']
+ragged_profiles = False           # Store only the active layers of each profile (ragged array with LAYER_START & LAYER_COUNT) instead of padding to max_layers (NetCDF only)
+profile_timestamps = None         # Output schedule of the subsurface variables on their own 'profile_time' co-ordinate (if unused - 'None': reported with the 3-D variables),
+                                  # either a pandas frequency (e.g. 'MS': 1st of each month) or a CSV file of output timestamps (in 'data/output/output_timestamps/')
+profile_depth_grid = None         # Remap the subsurface variables onto a fixed depth grid (cutoff depth [m], resolution [m]), e.g. (20.0, 0.1) (if unused - 'None': reported by layer index)
 
 # ========================== #
 # SIMULATION PARALLELIZATION 
@@ -74,6 +100,24 @@ subsurface_variables =     ['DEPTH','HEIGHT','DENSITY','TEMPERATURE','WATER_CONT
 
 workers = 1                       # Number of processers/workers to simulatenously simulate grid nodes (Note: RAM/memory is shared by the number of processors selected)
 local_port = 8786                 # port for local cluster
+writer_queue_size = 8             # Maximum number of finished node results waiting to be written by the background writer (NetCDF), further results are held back
+node_ordering = 'raster'          # Order of submission of the nodes to the cluster - Options: ['raster','cost'] ('cost': longest predicted runtime first, predicted from the
+                                  # static features & the node runtimes logged by previous simulations ('<data_path>/output/node_runtimes.csv'))
+time_window = None                # Simulate each node over successive time windows, carrying its state forward, so that worker memory is bounded by the window length
+                                  # (pandas frequency of the window starts, e.g. 'YS-OCT': hydrological years, 'MS': months) (if unused - 'None': whole simulation period)
+meteo_chunk_size = None           # Stream the meteorological forcing to each node simulation in chunks of n timesteps (the next chunk is read in the background), e.g. 720
+                                  # (forcing memory bounded by the chunk size) (if unused - 'None': the forcing of the whole simulation period is read at once)
+
+# ===================== #
+# INPUT & RESULT CACHES
+# ===================== #
+
+input_cache = False               # Cache the downscaled meteorological forcing of each node as memory-mappable arrays in '<data_path>/cache/forcing/' (keyed by a hash of the
+                                  # input files, node & forcing parameters), so that repeat runs / subsurface parameter sweeps skip the preprocessing
+input_cache_size = 10.0           # Maximum size of the input cache [GB] (least recently used entries are evicted)
+result_cache = False              # Cache the results of each node in '<data_path>/cache/results/' (keyed by a hash of the node inputs, all parameters and the model code), so that
+                                  # changes to the output variables (all cached), precision, compression or the glacier MASK only simulate the new nodes
+result_cache_size = 50.0          # Maximum size of the result cache [GB] (least recently used entries are evicted)
 
 # ======================== #
 # OUTPUT DATASET PRECISION
@@ -81,9 +125,17 @@ local_port = 8786                 # port for local cluster
 
 precision = 'single'              # either 'half' (16bit), 'single' (32bit) or 'double' (64bit)
 
-# ============================ #
-# COMPRESSION of OUTPUT NetCDF
-# ============================ #
+# ================================== #
+# COMPRESSION of OUTPUT NetCDF / Zarr
+# ================================== #
 
-compression_level = 2             # Choose value between 1 and 9 (highest compression)
+compression_level = 2             # Choose value between 1 and 9 (highest compression): zlib level (NetCDF) or Blosc zstd level of the output variables (Zarr)
                                   # Recommendation: choose 1, 2 or 3 (higher not worthwhile, because of needed time for writing output)
+output_encoding = 'lossless'      # Options: ['lossless','compact'] (compact: per-variable quantisation & integer packing, see ENCODING_PROFILES in main/kernel/output_variables.py)
+compression_threads = 1           # Number of threads compressing the output variables of a node in parallel (Zarr only, NetCDF/HDF5 writes are serialised)
+
+# ========= #
+# DEBUGGING
+# ========= #
+
+debug_mode = False                # Check the incrementally maintained column totals (liquid water & mass) of the subsurface grid every timestep
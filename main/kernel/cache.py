@@ -0,0 +1,205 @@
+"""
+    ==================================================================
+
+                            ON-DISK CACHE FILE
+
+        This file stores preprocessed model inputs (the downscaled
+        meteorological forcing of each node, as memory-mappable arrays)
+        and node results in an on-disk cache ('<data_path>/cache/').
+        Each entry is addressed by a hash of everything it was computed
+        from; the least recently used entries of each cache are evicted
+        above its size limit (input_cache_size / result_cache_size).
+
+    ==================================================================
+"""
+
+import os
+import shutil
+import pickle
+import hashlib
+import numpy as np
+from functools import lru_cache
+import constants
+import parameters
+from config import *
+
+# Version of the cached preprocessing (entries of an older version are never hit):
+CACHE_VERSION = 1
+
+def get_cache_path(cache):
+    """ Returns the directory of a cache ('<data_path>/cache/<cache>/', each entry in its '<key>/' sub-directory) """
+    return os.path.join(data_path, 'cache', cache)
+
+def get_cache_size(cache):
+    """ Returns the size limit of a cache [GB] """
+    return {'forcing': input_cache_size, 'results': result_cache_size}[cache]
+
+# ============================================================================================================================= #
+
+# ================ #
+# Cache Addressing
+# ================ #
+
+def get_file_fingerprint(filename):
+    """ Returns the fingerprint (path, size & modification time) of an input file """
+    status = os.stat(filename)
+    return (os.path.abspath(filename), status.st_size, status.st_mtime_ns)
+
+def get_source_fingerprint(directories):
+    """ Returns the SHA-256 hash of the model source code (.py files) in the given directories """
+    source = hashlib.sha256()
+    for directory in directories:
+        for name in sorted(os.listdir(directory)):
+            if name.endswith('.py'):
+                with open(os.path.join(directory, name), 'rb') as file:
+                    source.update(file.read())
+    return source.hexdigest()
+
+@lru_cache(maxsize = None)
+def get_model_fingerprint():
+    """ Returns the fingerprint of the model physics: the values of all parameters & constants and the hash of the model source code """
+
+    values = [(name, value) for module in (parameters, constants) for name, value in sorted(vars(module).items())
+              if not name.startswith('_') and isinstance(value, (bool, int, float, str, tuple, list, dict))]
+    kernel = os.path.dirname(os.path.abspath(__file__))
+    return (values, get_source_fingerprint([kernel, os.path.join(os.path.dirname(kernel), 'modules')]))
+
+# Configuration options that determine the result blocks of a node (besides the selection of output variables):
+RESULT_CONFIGURATION = ['time_start','time_end','model_spin_up','initial_timestamp','reduced_output','output_timestamps',
+                        'indicators','full_field','ragged_profiles','profile_timestamps','profile_depth_grid','time_window','restart_input',
+                        'spin_up_cycles','spin_up_period','spin_up_depths','spin_up_tolerances']
+
+def get_result_configuration():
+    """ Returns the configuration options (output timestamp & restart files) that determine the result blocks (& final state) of a node """
+
+    # Only the aggregation levels determine the result blocks (all output variables of each level are cached):
+    options = [(name, globals()[name]) for name in RESULT_CONFIGURATION] + [('restart_output', restart_output is not None),
+                                                                             ('aggregation_levels', sorted(aggregation_levels))]
+    files = [get_file_fingerprint(os.path.join(data_path,'output/output_timestamps',str(timestamps))) for timestamps in (output_timestamps, profile_timestamps)
+             if str(timestamps).endswith('.csv')]
+    if restart_input is not None:
+        files.append(get_file_fingerprint(os.path.join(data_path,'restart',restart_input)))
+    return (options, files)
+
+def get_cache_key(*inputs):
+    """ Returns the cache key (SHA-256 hash) of the inputs of a cache entry (numbers, strings, arrays & tuples / lists thereof) """
+
+    key = hashlib.sha256(str(CACHE_VERSION).encode())
+
+    def update(value):
+        if isinstance(value, (tuple, list)):
+            key.update(b'(')
+            for item in value:
+                update(item)
+            key.update(b')')
+        elif isinstance(value, np.ndarray):
+            key.update(str((value.dtype.str, value.shape)).encode())
+            key.update(np.ascontiguousarray(value).tobytes())
+        else:
+            key.update(repr(value).encode())
+        key.update(b',')
+
+    update(inputs)
+
+    return key.hexdigest()
+
+# ============================================================================================================================= #
+
+# ================== #
+# Cache Entries (I/O)
+# ================== #
+
+def load_cache_entry(cache, key):
+    """ Returns the items of a cache entry (arrays as read-only memory maps, other objects unpickled), or None if the entry is not cached """
+
+    entry = os.path.join(get_cache_path(cache), key)
+    try:
+        ITEMS = {}
+        for name in os.listdir(entry):
+            if name.endswith('.npy'):
+                ITEMS[name[:-4]] = np.load(os.path.join(entry, name), mmap_mode = 'r')
+            else:
+                with open(os.path.join(entry, name), 'rb') as file:
+                    ITEMS[name[:-4]] = pickle.load(file)
+        os.utime(entry)  # Recently used
+    except (FileNotFoundError, ValueError, OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+    return ITEMS
+
+def store_cache_entry(cache, key, ITEMS):
+    """ Stores the items of a cache entry (arrays as .npy files, other objects pickled) in a temporary directory first, so that
+        concurrent workers never read a partial entry, and evicts the least recently used entries above the cache size limit """
+
+    entry = os.path.join(get_cache_path(cache), key)
+    if os.path.isdir(entry):
+        return
+
+    staging = entry + '.%s.tmp' % os.getpid()
+    os.makedirs(staging, exist_ok = True)
+    for name, item in ITEMS.items():
+        if isinstance(item, np.ndarray):
+            np.save(os.path.join(staging, name + '.npy'), item)
+        else:
+            with open(os.path.join(staging, name + '.pkl'), 'wb') as file:
+                pickle.dump(item, file, protocol = pickle.HIGHEST_PROTOCOL)
+    try:
+        os.rename(staging, entry)
+    except OSError:
+        # Entry already stored by another worker
+        shutil.rmtree(staging, ignore_errors = True)
+
+    evict_cache_entries(cache)
+
+def remove_cache_entry(cache, key):
+    """ Removes a cache entry (e.g. to replace it) """
+    shutil.rmtree(os.path.join(get_cache_path(cache), key), ignore_errors = True)
+
+def evict_cache_entries(cache):
+    """ Removes the least recently used entries of a cache until it is below its size limit [GB] """
+
+    entries = []
+    for entry in os.scandir(get_cache_path(cache)):
+        if entry.name.endswith('.tmp'):
+            continue
+        try:
+            size = sum(file.stat().st_size for file in os.scandir(entry.path))
+            entries.append((entry.stat().st_mtime, size, entry.path))
+        except FileNotFoundError:
+            continue
+
+    cache_size = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if cache_size <= get_cache_size(cache) * 1e9:
+            break
+        shutil.rmtree(path, ignore_errors = True)
+        cache_size -= size
+
+# ============================================================================================================================= #
+
+# ============ #
+# Node Results
+# ============ #
+
+def select_cached_result(NODE_RESULT, indY, indX, HEADER):
+    """ Returns the cached result of a node (indY, indX, BLOCKS, HEADER[, STATE]) reduced to the requested output variables (HEADER)
+        in the output precision, or None if the cached result does not hold all of them (or was stored in a lower precision) """
+
+    CACHED_BLOCKS, CACHED_HEADER = NODE_RESULT[2:4]
+
+    BLOCKS = {}
+    for block, names in HEADER.items():
+        if not set(names).issubset(CACHED_HEADER.get(block, [])):
+            return None
+        if np.dtype(CACHED_BLOCKS[block].dtype).itemsize < np.dtype(precision).itemsize:
+            return None
+        BLOCKS[block] = np.asarray(CACHED_BLOCKS[block])[[CACHED_HEADER[block].index(name) for name in names]].astype(precision)
+
+    # Layer counts (& time window offsets) are independent of the output variables:
+    for block in CACHED_BLOCKS:
+        if block not in CACHED_HEADER:
+            BLOCKS[block] = CACHED_BLOCKS[block]
+
+    return (indY, indX, BLOCKS, HEADER) + tuple(NODE_RESULT[4:])
+
+# ============================================================================================================================= #
@@ -0,0 +1,326 @@
+"""
+    ==================================================================
+
+                      METEOROLOGICAL FORCING FILE
+
+        This file downscales the meteorological input data (station,
+        multi-station or gridded) to the simulated node and streams the resulting
+        forcing to the node simulation in time chunks, reading and
+        downscaling the next chunk in the background while the
+        current one is simulated.
+
+    ==================================================================
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from scipy.sparse import csr_matrix
+from scipy.spatial import cKDTree
+from constants import *
+from parameters import *
+from config import *
+from main.modules.shortwave_radiation import TOA_insolation, shortwave_radiation_input
+from main.kernel.cache import get_file_fingerprint, get_cache_key, load_cache_entry, store_cache_entry
+
+# Parameters & constants of the node forcing (part of the input cache key):
+FORCING_PARAMETERS = ['station_altitude','station_neighbours','station_idw_power','air_temperature_lapse_rate','air_temperature_offset',
+                      'precipitation_lapse_rate','precipitation_multiplier','precipitation_method','cloud_transmissivity_coeff_alpha',
+                      'cloud_transmissivity_coeff_beta','zero_temperature','g','M','R','latent_heat_sublimation','Atm_Pressure','R_watervapour',
+                      'optical_depth','exp_aerosol','dt']
+FORCING_VARIABLES = ['T2','PRES','RRR','RH2','U2','SWin','LWin','N']
+
+# Meteorological variables summed (instead of averaged) when the meteorological data is aggregated to a coarser model timestep:
+CUMULATIVE_VARIABLES = ['RRR','D']
+
+# ============================================================================================================================= #
+
+# ============================= #
+# Node Meteorological Forcing
+# ============================= #
+
+def is_gridded(METEO):
+    """ Returns True if the meteorological data is gridded on the spatial grid of the model (time,y,x) (or the column of a node) """
+    return ('y' in METEO.coords) and ('x' in METEO.coords)
+
+def is_multi_station(METEO):
+    """ Returns True if the meteorological data contains the records of several stations (time,station) """
+    return 'station' in METEO.dims
+
+def get_station_weights(STATIC, METEO, nodes):
+    """ Returns the interpolation weights of the meteorological stations at the simulated nodes as a sparse (node x station) matrix:
+        inverse distance weighting (station_idw_power) of the station_neighbours nearest stations (a node at a station only uses that station) """
+
+    station_variables = ['STATION_EASTING','STATION_NORTHING','STATION_ALTITUDE']
+    if not set(station_variables).issubset(set(METEO.variables)):
+        raise ValueError("Error: The station co-ordinates and altitudes ({:s}) must be supplied in the input multi-station METEO file".format(", ".join(station_variables)))
+
+    # Horizontal distances from each node to its nearest stations:
+    node_y, node_x = np.asarray(nodes, dtype = np.int64).reshape(-1, 2).T
+    node_positions = np.column_stack((STATIC.EASTING.values[node_y, node_x], STATIC.NORTHING.values[node_y, node_x]))
+    station_positions = np.column_stack((METEO.STATION_EASTING.values, METEO.STATION_NORTHING.values))
+    neighbours = min(station_neighbours, len(station_positions))
+    distances, stations = cKDTree(station_positions).query(node_positions, k = neighbours)
+    distances, stations = distances.reshape(len(node_positions), neighbours), stations.reshape(len(node_positions), neighbours)
+
+    # Inverse distance weights (normalised for each node):
+    at_station = distances == 0
+    weights = np.where(at_station.any(axis = 1, keepdims = True), at_station, 1.0 / np.power(np.where(at_station, 1.0, distances), station_idw_power))
+    weights = weights / weights.sum(axis = 1, keepdims = True)
+
+    return csr_matrix((weights.ravel(), stations.ravel(), np.arange(0, weights.size + 1, neighbours)), shape = (len(node_positions), len(station_positions)))
+
+def resample_forcing(METEO):
+    """ Returns the meteorological data on the model timestep (dt, a multiple of an hour): meteorological data with a finer temporal resolution
+        is aggregated over each model timestep (precipitation summed, other variables averaged) and incomplete model timesteps are dropped """
+
+    if dt % 3600 != 0:
+        raise ValueError('Error: The model timestep (dt) must be a multiple of an hour (3600 s).')
+
+    steps = np.unique(np.diff(METEO.time.values).astype('timedelta64[s]').astype(np.int64))
+    if len(steps) == 0:
+        return METEO
+    if (len(steps) > 1) or (dt % steps[0] != 0):
+        raise ValueError('Error: The meteorological data must have a regular timestep that divides the model timestep (dt).')
+    if steps[0] == dt:
+        return METEO
+
+    # Aggregate the meteorological data to the model timestep (from the first timestamp):
+    RESAMPLED = METEO.resample(time = pd.Timedelta(seconds = dt), closed = 'left', label = 'left', origin = 'start')
+    AGGREGATED = RESAMPLED.mean(keep_attrs = True)
+    for name in CUMULATIVE_VARIABLES:
+        if name in METEO.data_vars:
+            AGGREGATED[name] = RESAMPLED.sum(keep_attrs = True)[name]
+    complete = METEO.time.resample(time = pd.Timedelta(seconds = dt), closed = 'left', label = 'left', origin = 'start').count() == (dt // steps[0])
+
+    return AGGREGATED.isel(time = np.flatnonzero(complete.values))
+
+def get_node_forcing(METEO, STATIC, ILLUMINATION, WEIGHTS = None):
+    """ Returns the meteorological forcing of a node over the timesteps of the METEO dataset (downscaled from the station to the node,
+        gridded meteorological data is already at the node and only the offsets / multipliers are applied):
+
+            T2 [K], PRES [hPa], RRR [mm], RH2 [%], U2 [m s-1], SWin [W m-2], LWin [W m-2] (or None) & N [-] (or None)
+
+        Multi-station meteorological data (time,station) is downscaled from each station of the node and combined with its
+        interpolation WEIGHTS (station).
+    """
+
+    # Static node data:
+    SLOPE = STATIC.SLOPE.values
+    ASPECT = STATIC.ASPECT.values
+    LATITUDE = STATIC.LATITUDE.values
+    LONGITUDE = STATIC.LONGITUDE.values
+
+    # Elevation difference between the node and the meteorological station (none for gridded meteorological data):
+    if is_gridded(METEO):
+        ELEVATION_DIFFERENCE = 0.0
+    elif is_multi_station(METEO):
+        ELEVATION_DIFFERENCE = STATIC.ELEVATION.values - METEO.STATION_ALTITUDE.values
+    else:
+        ELEVATION_DIFFERENCE = STATIC.ELEVATION.values - station_altitude
+
+    # Interpolate temperature using an air temperature lapse rate
+    if 'T2_LAPSE' in list(METEO.keys()):
+        T2 = ((METEO.T2.values + zero_temperature) + ELEVATION_DIFFERENCE * METEO.T2_LAPSE.values) + air_temperature_offset
+    else:
+        T2 = ((METEO.T2.values + zero_temperature) + ELEVATION_DIFFERENCE * air_temperature_lapse_rate) + air_temperature_offset
+
+    # Interpolate atmospheric pressure using the barometric equation
+    np.seterr(divide = 'ignore')
+    if 'T2_LAPSE' in list(METEO.keys()):
+        PRES = np.where(METEO.T2_LAPSE.values == 0,
+                        METEO.PRES.values * np.exp(((-g * M) * ELEVATION_DIFFERENCE)/(R * ((METEO.T2.values + zero_temperature) + air_temperature_offset))),
+                        METEO.PRES.values * np.power((T2 / ((METEO.T2.values + zero_temperature) + air_temperature_offset)),((-g * M) / (R * METEO.T2_LAPSE.values))))
+    else:
+        PRES = METEO.PRES.values * np.power((T2 / ((METEO.T2.values + zero_temperature) + air_temperature_offset)),((-g * M) / (R * air_temperature_lapse_rate)))
+
+    # Precipitation:
+    precipitation_allowed = ['standard','Mattea21']
+
+    # Standard precipiation data [mm] (Van Pelt et al., 2019)
+    if precipitation_method == 'standard':
+        if 'RRR' in list(METEO.keys()):
+            RRR = METEO.RRR.values * (1 + ELEVATION_DIFFERENCE * precipitation_lapse_rate) * precipitation_multiplier
+        else:
+            raise ValueError("Error: Precipitation ('RRR') [mm] must be supplied in the input METEO file")
+
+    # Three-phase precipitation model (Mattea et al., 2021) (Precipitation climatology [m w.e.] * Annual anomaly [-] * Downscaling coefficient) [-])
+    elif precipitation_method == 'Mattea21':
+        if ('PRECIPITATION_CLIMATOLOGY' in list(STATIC.keys())) and ('PRECIPITATION_ANOMALY' in list(METEO.keys())) and ('D' in list(METEO.keys())):
+            RRR = STATIC.PRECIPITATION_CLIMATOLOGY.values * METEO.PRECIPITATION_ANOMALY.values * METEO.D.values * 1000 * precipitation_multiplier
+        else:
+            raise ValueError("Error: All three variables of the three phase precipitation model ('PRECIPITATION_CLIMATOLOGY', 'PRECIPITATION_ANOMALY','D') must be supplied in the input STATIC & METEO files")
+
+    else:
+        raise ValueError("Precipitation method = \"{:s}\" is not allowed, must be one of {:s}".format(precipitation_method, ", ".join(precipitation_allowed)))
+
+    # Remaining variables remain constant across the spatial grid
+    RH2 = METEO.RH2.values
+    U2 = METEO.U2.values
+
+    # Radiative fluxes (SWin & LWin):
+    if ('SWin' in list(METEO.keys())) and ('LWin' in list(METEO.keys())):
+        SWin = METEO.SWin.values
+        LWin = METEO.LWin.values
+        N = None
+
+    # Input shortwave radiation (SWin) and fractional cloud cover (N):
+    elif ('SWin' in list(METEO.keys())) and ('N' in list(METEO.keys())):
+        SWin = METEO.SWin.values
+        N = METEO.N.values
+        LWin = None
+
+    # Input longwave radiation (LWin) and fractional cloud cover (N):
+    elif ('LWin' in list(METEO.keys())) and ('N' in list(METEO.keys())):
+        SWin = None
+        N = METEO.N.values
+        LWin = METEO.LWin.values
+
+    # Fractional cloud cover (N) only:
+    elif 'N' in list(METEO.keys()):
+        N = METEO.N.values
+        SWin = None
+        LWin = None
+
+    # Radiative fluxes error message:
+    else:
+        raise ValueError("Error: Either Fractional cloud cover ('N') or incoming Longwave radiation ('LWin') must be supplied in the input METEO file")
+
+    # Multi-station meteorological data: weighted combination of the downscaled station records
+    if is_multi_station(METEO):
+        T2, PRES, RRR, RH2, U2 = (VAR @ WEIGHTS for VAR in (T2, PRES, RRR, RH2, U2))
+        SWin, LWin, N = (None if VAR is None else VAR @ WEIGHTS for VAR in (SWin, LWin, N))
+
+    # =============================== #
+    # GET ILLUMINATION DATA FROM FILE
+    # =============================== #
+
+    ILLUMINATION_NORM = ILLUMINATION.ILLUMINATION_NORM.values # Illumination (Normal Year)
+    ILLUMINATION_LEAP = ILLUMINATION.ILLUMINATION_LEAP.values # Illumination (Leap Year)
+
+    # =================== #
+    # SHORTWAVE RADIATION
+    # =================== #
+
+    # Hours of each timestep (timesteps longer than an hour: the shortwave radiation is integrated over the hours of the timestep)
+    n_hours = int(dt // 3600)
+    TIME = pd.DatetimeIndex((METEO.time.values[:, np.newaxis] + np.arange(n_hours) * np.timedelta64(3600, 's')).ravel())
+
+    # Top of Atmosphere (TOA) Radiation
+    DOY = TIME.dayofyear.to_numpy()            # Day of Year
+    HOUR = TIME.hour.to_numpy()                # Hour
+    LEAP = TIME.is_leap_year                   # Leap Year (Boolean)
+    HOY = ((DOY - 1) * 24) + HOUR              # Hour of Year
+    TOA_INSOL, TOA_INSOL_FLAT, TOA_INSOL_NORM = TOA_insolation(LATITUDE, LONGITUDE, SLOPE, ASPECT, HOUR, LEAP, HOY)
+
+    # Illumination
+    NODE_ILLUMINATION = np.where(LEAP,ILLUMINATION_LEAP[HOY],ILLUMINATION_NORM[HOY])
+
+    # Meteorological data of each hour of the timestep:
+    PRES_HOURLY, T2_HOURLY, RH2_HOURLY = (np.repeat(VAR, n_hours) for VAR in (PRES, T2, RH2))
+
+    # Input Shortwave Radiation
+    if ('SWin' in list(METEO.keys())):
+
+        # Timesteps longer than an hour: the mean station SWin is distributed over the hours of the timestep in proportion to the clear-sky insolation
+        if n_hours > 1:
+            CLEAR_SKY = shortwave_radiation_input(PRES_HOURLY, T2_HOURLY, RH2_HOURLY, np.maximum(TOA_INSOL_FLAT, 0.0), TOA_INSOL_FLAT, TOA_INSOL_NORM,
+                                                  np.ones(len(HOY)), N = np.zeros(len(HOY))).reshape(-1, n_hours)
+            MEAN_CLEAR_SKY = CLEAR_SKY.mean(axis = 1, keepdims = True)
+            SWin = np.divide(SWin[:, np.newaxis] * CLEAR_SKY, MEAN_CLEAR_SKY, out = np.zeros_like(CLEAR_SKY), where = MEAN_CLEAR_SKY > 0).ravel()
+
+        SWin = shortwave_radiation_input(PRES_HOURLY, T2_HOURLY, RH2_HOURLY, TOA_INSOL, TOA_INSOL_FLAT, TOA_INSOL_NORM, NODE_ILLUMINATION, SWin = SWin)
+        SWin = SWin.reshape(-1, n_hours).mean(axis = 1)
+
+    elif ('N' in list(METEO.keys())):
+        SWin = shortwave_radiation_input(PRES_HOURLY, T2_HOURLY, RH2_HOURLY, TOA_INSOL, TOA_INSOL_FLAT, TOA_INSOL_NORM, NODE_ILLUMINATION, N = np.repeat(N, n_hours))
+        SWin = SWin.reshape(-1, n_hours).mean(axis = 1)
+
+    return {'T2': T2, 'PRES': PRES, 'RRR': RRR, 'RH2': RH2, 'U2': U2, 'SWin': SWin, 'LWin': LWin, 'N': N}
+
+def get_forcing_inputs(STATIC, WEIGHTS = None):
+    """ Returns the inputs that determine the forcing of a node (apart from its time range) for the cache keys: meteo & illumination
+        file fingerprints, node co-ordinates & static data (the glacier MASK aside), station interpolation weights & forcing parameters """
+
+    files = [os.path.join(data_path,'meteo',meteo_netcdf), os.path.join(data_path,'illumination',illumination_netcdf)]
+    return ([get_file_fingerprint(file) for file in files], STATIC.y.values, STATIC.x.values,
+            [(name, STATIC[name].values) for name in sorted(STATIC.data_vars) if name != 'MASK'], WEIGHTS, [globals()[name] for name in FORCING_PARAMETERS])
+
+# ============================================================================================================================= #
+
+# ======================== #
+# Streamed Forcing Chunks
+# ======================== #
+
+class ForcingStream:
+    """ Streams the forcing of a node over the timesteps [start, stop) of the METEO dataset in chunks of chunk_size timesteps.
+        Only the current and the next chunk are held in memory: the next chunk is read and downscaled by a background thread.
+        With the input cache (input_cache), downscaled chunks are memory-mapped from the cache instead of being recomputed. """
+
+    def __init__(self, METEO, STATIC, ILLUMINATION, start, stop, chunk_size, WEIGHTS = None):
+        self.METEO = METEO
+        self.WEIGHTS = WEIGHTS
+        self.STATIC = STATIC
+        self.ILLUMINATION = ILLUMINATION
+        self.stop = stop
+        self.chunk_size = chunk_size
+        self.INPUTS = get_forcing_inputs(STATIC, WEIGHTS) if input_cache else None
+        self.executor = ThreadPoolExecutor(max_workers = 1)
+        self.next_chunk = self.prefetch(start)
+
+    def prefetch(self, start):
+        """ Starts reading the chunk beginning at timestep start (None after the last chunk) """
+        if start >= self.stop:
+            return None
+        return self.executor.submit(self.read, start, min(start + self.chunk_size, self.stop))
+
+    def read(self, start, stop):
+        """ Reads & downscales the forcing of the timesteps [start, stop) (or loads it from the input cache) """
+
+        if input_cache:
+            key = get_cache_key(self.INPUTS, self.METEO.time.values[start], self.METEO.time.values[stop - 1], stop - start)
+            CACHED = load_cache_entry('forcing', key)
+            if CACHED is not None:
+                return start, stop, {name: CACHED.get(name) for name in FORCING_VARIABLES}
+
+        FORCING = get_node_forcing(self.METEO.isel(time = slice(start, stop)).load(), self.STATIC, self.ILLUMINATION, self.WEIGHTS)
+
+        if input_cache:
+            store_cache_entry('forcing', key, {name: VAR for name, VAR in FORCING.items() if VAR is not None})
+
+        return start, stop, FORCING
+
+    def get(self):
+        """ Returns the next chunk (start, stop, FORCING) and starts reading the following one """
+        start, stop, FORCING = self.next_chunk.result()
+        self.next_chunk = self.prefetch(stop)
+        return start, stop, FORCING
+
+    def close(self):
+        """ Stops the background thread (a prefetched chunk is discarded) """
+        self.executor.shutdown(wait = False, cancel_futures = True)
+
+# ============================================================================================================================= #
+
+# ============ #
+# Node Climate
+# ============ #
+
+def get_node_climate(METEO, STATIC, ILLUMINATION, WEIGHTS = None):
+    """ Returns the mean air temperature [K] & mean annual accumulation [m w.e. a-1] (solid precipitation) of a node, estimated from
+        its meteorological forcing over the simulation period (steady-state initial firn profile, see initial_profile_method) """
+
+    n_timesteps = len(METEO.time.values)
+    FORCING_STREAM = ForcingStream(METEO, STATIC, ILLUMINATION, 0, n_timesteps, n_timesteps if meteo_chunk_size is None else meteo_chunk_size, WEIGHTS)
+
+    temperature, snowfall, stop = 0.0, 0.0, 0
+    while stop < n_timesteps:
+        start, stop, FORCING = FORCING_STREAM.get()
+        temperature += np.sum(FORCING['T2'])
+        snowfall += np.sum((FORCING['RRR'] / 1000.0) * (0.5 * (-np.tanh(FORCING['T2'] - zero_temperature) + 1.0)))
+    FORCING_STREAM.close()
+
+    return temperature / n_timesteps, snowfall / (n_timesteps * dt / (365.25 * 86400))
+
+# ============================================================================================================================= #
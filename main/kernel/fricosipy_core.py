@@ -17,12 +17,20 @@ from datetime import datetime
 import datetime as dt
 import os
 import sys
+from time import perf_counter
 
 from constants import *
 from parameters import *
 from config import *
 from main.kernel.io import IOClass
-from main.modules.shortwave_radiation import TOA_insolation, shortwave_radiation_input
+from main.kernel.output_variables import OUTPUT_VARIABLES, get_result_layout, create_result_blocks, get_aggregation_levels, get_aggregation_periods, get_indicators, \
+                                              get_profile_timestamps
+from main.kernel.indicators import INDICATORS
+from main.kernel.regridding import get_depth_grid, remap_profile
+from main.kernel.state import get_grid_state, restore_grid
+from main.kernel.forcing import ForcingStream, get_forcing_inputs, get_node_climate
+from main.kernel.cache import get_cache_key, get_model_fingerprint, get_result_configuration, load_cache_entry, store_cache_entry, \
+                              remove_cache_entry, select_cached_result
 from main.kernel.init import init_snowpack
 from main.modules.albedo import update_albedo
 from main.modules.penetrating_radiation import penetrating_radiation
@@ -35,7 +43,122 @@ from main.modules.snow_metamorphism import snow_metamorphism
 
 # ====================================================================================================================
 
-def fricosipy_core(STATIC, METEO, ILLUMINATION, indY, indX, nt):
+# Model functions compiled by the worker (first node simulated):
+worker_compiled = False
+
+def fricosipy_node(STATIC, METEO, ILLUMINATION, indY, indX, nt, window = None, STATE = None, STATIONS = None):
+    """ Simulates a spatial node with the FRICOSIPY core function (same input & output), or loads its results from the result cache
+        (result_cache): the node results are addressed by a hash of the node inputs, all parameters & constants, the model source code
+        and the output configuration of the result blocks. The cache holds all output variables of the registry (& aggregation levels)
+        in the output precision, so that changes to the selection of output variables, the encoding or format of the output file, or the
+        glacier MASK do not re-simulate the node.
+        The simulation time of the node [s] (excluding the spin-up) is returned in the result blocks ('runtime': node ordering, see scheduling),
+        it is not representative (NaN) for a cached result or the first node simulated by a worker (compilation of the model functions) """
+    global worker_compiled
+
+    if result_cache:
+        key = get_cache_key(get_forcing_inputs(STATIC, None if STATIONS is None else STATIONS[1]), get_model_fingerprint(), get_result_configuration(), nt, window)
+        HEADER = get_result_layout()
+
+        CACHED = load_cache_entry('results', key)
+        if CACHED is not None:
+            NODE_RESULT = select_cached_result(CACHED['result'], indY, indX, HEADER)
+            if NODE_RESULT is not None:
+                NODE_RESULT[2]['runtime'] = np.nan
+                return NODE_RESULT
+
+            # Cached result in a lower precision than requested: replaced by the new result
+            remove_cache_entry('results', key)
+
+    # Cyclic spin-up of the node before the first time window (unless the node is initialised from the restart file):
+    if (spin_up_cycles is not None) and (STATE is None) and ((window is None) or (window[0] == 0)):
+        STATE = spin_up_node(STATIC, METEO, ILLUMINATION, indY, indX, STATIONS)
+
+    node_start_time = perf_counter()
+    NODE_RESULT = fricosipy_core(STATIC, METEO, ILLUMINATION, indY, indX, nt, window, STATE, STATIONS)
+
+    # Report the quiescent fast path statistics of the node to the terminal:
+    if (quiescent_aggregation > 1) and ('quiescent' in NODE_RESULT[2]):
+        n_quiescent, n_timesteps, n_percolation_skipped, n_aggregated = NODE_RESULT[2]['quiescent']
+        print(f"\t Node [X: {STATIC.EASTING.values} , Y: {STATIC.NORTHING.values} ] quiescent timesteps: {n_quiescent} / {n_timesteps} | "
+              f"percolation skipped: {n_percolation_skipped} | aggregated subsurface steps: {n_aggregated}", flush=True)
+    NODE_RESULT[2]['runtime'] = perf_counter() - node_start_time if worker_compiled else np.nan
+    worker_compiled = True
+    if result_cache:
+        store_cache_entry('results', key, {'result': NODE_RESULT})
+
+        # Requested output variables of the cached result:
+        NODE_RESULT = select_cached_result(NODE_RESULT, indY, indX, HEADER)
+
+    return NODE_RESULT
+
+# ====================================================================================================================
+
+# Physical state of a node carried over between the spin-up cycles & to the main simulation:
+SPIN_UP_STATE = ['GRID','melted','accumulation','surface_temperature']
+
+def spin_up_node(STATIC, METEO, ILLUMINATION, indY, indX, STATIONS = None):
+    """ Spins up a spatial node by cycling the meteorological forcing of the spin-up period (spin_up_period) until its firn state has converged:
+        the change of the density & temperature at the spin-up depths (spin_up_depths) and of the total height over a cycle is below the
+        tolerances (spin_up_tolerances), or the maximum number of cycles (spin_up_cycles) is reached.
+
+        Output:
+                STATE                           ::    Physical state of the node at the end of the spin-up: GRID, surface temperature & accumulation
+                                                      (the mass balance, melt & firn temperature bookkeeping of the main simulation starts afresh)
+    """
+
+    # Time window (start, stop) of the spin-up period:
+    time = METEO.time.values
+    window = (int(np.searchsorted(time, np.datetime64(spin_up_period[0]))), int(np.searchsorted(time, np.datetime64(spin_up_period[1]), side = 'right')))
+
+    STATE = None
+    PROFILE = get_spin_up_profile(get_grid_state(init_node_snowpack(STATIC, METEO, ILLUMINATION, STATIONS)))
+    for cycle in range(1, spin_up_cycles + 1):
+
+        # Only the physical state is carried over to the next cycle (the bookkeeping & running aggregates of the output variables are discarded):
+        STATE = fricosipy_core(STATIC, METEO, ILLUMINATION, indY, indX, 0, window, STATE, STATIONS)[4]
+        STATE = {name: STATE[name] for name in SPIN_UP_STATE}
+        if STATE['melted']:
+            return STATE
+
+        PREVIOUS_PROFILE, PROFILE = PROFILE, get_spin_up_profile(STATE['GRID'])
+        converged = all(np.all(np.where(np.isnan(previous) & np.isnan(current), 0.0, np.abs(current - previous)) <= spin_up_tolerances[name])
+                        for name, previous, current in zip(['density','temperature','height'], PREVIOUS_PROFILE, PROFILE))
+        if converged:
+            break
+
+    # Report the number of spin-up cycles of the node to the terminal:
+    print(f"\t Node [X: {STATIC.EASTING.values} , Y: {STATIC.NORTHING.values} ] spin-up {'converged' if converged else 'not converged'} after {cycle} cycles", flush=True)
+
+    return STATE
+
+def get_spin_up_profile(GRID_STATE):
+    """ Returns the firn state compared between the spin-up cycles: the density [kg m^-3] & temperature [K] at the spin-up depths
+        (spin_up_depths: NaN below the subsurface grid) and the total height [m] """
+
+    heights = GRID_STATE['layer_heights']
+    depth = np.cumsum(heights) - (heights / 2)
+    if len(heights) == 0:
+        return np.full(len(spin_up_depths), np.nan), np.full(len(spin_up_depths), np.nan), 0.0
+
+    density = np.interp(spin_up_depths, depth, GRID_STATE['layer_densities'], right = np.nan)
+    temperature = np.interp(spin_up_depths, depth, GRID_STATE['layer_temperatures'], right = np.nan)
+
+    return density, temperature, np.sum(heights)
+
+def init_node_snowpack(STATIC, METEO, ILLUMINATION, STATIONS = None):
+    """ Returns the initial subsurface grid of a node (for the steady-state firn profile: from the climate of the node estimated from its forcing) """
+
+    if initial_profile_method == 'HerronLangway80':
+        if STATIONS is not None:
+            METEO = METEO.isel(station = STATIONS[0])
+        return init_snowpack(STATIC, get_node_climate(METEO, STATIC, ILLUMINATION, None if STATIONS is None else STATIONS[1]))
+
+    return init_snowpack(STATIC)
+
+# ====================================================================================================================
+
+def fricosipy_core(STATIC, METEO, ILLUMINATION, indY, indX, nt, window = None, STATE = None, STATIONS = None):
     """ The FRICOSIPY core function simulates the model on a single spatial node (x,y):
 
         Input:
@@ -45,76 +168,20 @@ def fricosipy_core(STATIC, METEO, ILLUMINATION, indY, indX, nt):
                 indY                            ::    Y spatial index of the simulated node [y]
                 indX                            ::    X spatial index of the simulated node [x]
                 nt                              ::    Temporal dimension of the output result dataset [t]
+                window                          ::    (start, stop) timestep indexes of the simulated time window (None: whole simulation)
+                STATE                           ::    State of the node at the start of the time window or from the restart file (None: initial conditions)
+                STATIONS                        ::    (station indexes, interpolation weights) of the node (multi-station METEO (t,station) only)
 
         Output:
                 indY                            ::    Y spatial index of the simulated node [y]
                 indX                            ::    X spatial index of the simulated node [x]
-
-            # Meteorological Variables (6):
-                
-                AIR_TEMPERATURE (t)             ::    Air temperature [°C]
-                AIR_PRESSURE (t)                ::    Air pressure [hPa]
-                RELATIVE_HUMIDITY (t)           ::    Relative humidity [%]
-                SPECIFIC_HUMIDITY (t)           ::    Specific humidity [g kg-1]
-                WIND_SPEED (t)                  ::    Wind speed [m s-1]
-                FRACTIONAL_CLOUD_COVER (t)      ::    Fractional cloud cover [-]
-
-            # Surface Energy Fluxes (7):
-            
-                SHORTWAVE (t)                   ::    Shortwave radiation flux [W m-2]
-                LONGWAVE (t)                    ::    Longwave radiation flux [W m-2]
-                SENSIBLE (t)                    ::    Sensible heat flux [W m-2]
-                LATENT (t)                      ::    Latent heat flux [W m-2]
-                SUBSURFACE (t)                  ::    Subsurface heat flux [W m-2] 
-                RAIN_HEAT_FLUX (t)              ::    Rain heat flux [W m-2]
-                MELT_ENERGY (t)                 ::    Melt energy flux [W m-2]
-
-            # Surface Mass Fluxes (8):
-
-                RAIN (t)                        ::    Rain [m w.e.]
-                SNOWFALL (t)                    ::    Snowfall [m w.e.]
-                EVAPORATION (t)                 ::    Evaporation [m w.e.]
-                SUBLIMATION (t)                 ::    Sublimation [m w.e.]
-                CONDENSATION (t)                ::    Condensation [m w.e.]
-                DEPOSITION (t)                  ::    Moisture deposition [m w.e.]
-                SURFACE_MELT (t)                ::    Surface melt [m w.e.]
-
-            # Subsurface Mass Fluxes (4):
-
-                SURFACE_MASS_BALANCE (t)        ::    Surface mass balance [m w.e.] 
-                REFREEZE (t)                    ::    Refreezing [m w.e.]
-                SUBSURFACE_MELT (t)             ::    Subsurface melt [m w.e.]
-                RUNOFF (t)                      ::    Surface Runoff [m w.e.]
-                MASS_BALANCE (t)                ::    Mass balance [m w.e.]
-
-            # Other Information (11):
-
-                SNOW_HEIGHT (t)                 ::    Snow height [m]
-                SNOW_WATER_EQUIVALENT (t)       ::    Snow water equivalent [m w.e.]
-                TOTAL_HEIGHT (t)                ::    Total height [m]
-                SURFACE_ELEVATION (t)           ::    Surface elevation [m a.s.l.]
-                SURFACE_TEMPERATURE (t)         ::    Surface temperature [°C]
-                SURFACE_HUMIDITY (t)            ::    Surface humidity [g kg-1]
-                SURFACE_ALBEDO (t)              ::    Surface albedo [-]
-                N_LAYERS (t)                    ::    Number of layers [-]
-                FIRN_TEMPERATURE (t)            ::    Firn temperature [°C]
-                FIRN_TEMPERATURE_CHANGE (t)     ::    Firn temperature change [°C]
-                FIRN_FACIE (t)                  ::    Firn facie [1 : Recrystallization | 2 : Recrystallization-Infiltraion | 3 : Cold-Infilitration | 4 : Temperate]
-
-            Subsurface Variables (12):
-
-                LAYER_DEPTH (z,t)               ::    Layer depth [m]
-                LAYER_HEIGHT (z,t)              ::    Layer height [m]
-                LAYER_DENSITY (z,t)             ::    Layer density [kg m-3]
-                LAYER_TEMPERATURE (z,t)         ::    Layer temperature [°C]
-                LAYER_WATER_CONTENT (z,t)       ::    Layer liquid water content [-]
-                LAYER_COLD_CONTENT (z,t)        ::    Layer cold content [J m-2]
-                LAYER_POROSITY (z,t)            ::    Layer porosity [-]
-                LAYER_ICE_FRACTION (z,t)        ::    Layer ice fraction [-]
-                LAYER_IRREDUCIBLE_WATER (z,t)   ::    Layer irreducible water content
-                LAYER_REFREEZE (z,t)            ::    Layer refreezing [m w.e.]
-                LAYER_HYDRO_YEAR (z,t)          ::    Layer hydrological year [yyyy]
-                LAYER_GRAIN_SIZE (z,t)          ::    Layer grain size [mm]
+                BLOCKS                          ::    Packed result blocks of the requested output variables: series (n,t), profiles (n,t,z), layer_count (t),
+                                                      the multi-resolution aggregates of each aggregation level (n,periods) & the derived indicators (n,years)
+                                                      (& the quiescent fast path statistics & number of simulated timesteps of the node: quiescent, timesteps)
+                HEADER                          ::    Names of the output variables stored in each result block
+                                                      (see the output variables registry: main/kernel/output_variables.py)
+                STATE                           ::    State of the node at the end of the time window (only returned for a time window or a restart file),
+                                                      for a time window the result blocks only hold the time window (offsets: BLOCKS['offsets'])
   
     """
 
@@ -122,12 +189,8 @@ def fricosipy_core(STATIC, METEO, ILLUMINATION, indY, indX, nt):
     # GET STATIC DATA FROM FILE
     # ========================= #
 
-    # Required Variables:
-    ELEVATION = STATIC.ELEVATION.values
+    # Required Variables (the topography used to downscale the meteorological data is read in main/kernel/forcing.py):
     SLOPE = STATIC.SLOPE.values
-    ASPECT = STATIC.ASPECT.values
-    LATITUDE = STATIC.LATITUDE.values
-    LONGITUDE = STATIC.LONGITUDE.values
     EASTING = STATIC.EASTING.values
     NORTHING = STATIC.NORTHING.values
 
@@ -141,173 +204,30 @@ def fricosipy_core(STATIC, METEO, ILLUMINATION, indY, indX, nt):
     # INITIALISE SNOWPACK
     # =================== #
 
-    GRID = init_snowpack(STATIC)
+    # Initial conditions or the subsurface grid carried over from the previous time window:
+    if STATE is None:
+        GRID = init_node_snowpack(STATIC, METEO, ILLUMINATION, STATIONS)
+    else:
+        GRID = restore_grid(STATE['GRID'])
 
     # ================================= #
     # GET METEOROLOGICAL DATA FROM FILE
     # ================================= #
 
-    # Interpolate temperature using an air temperature lapse rate
-    if 'T2_LAPSE' in list(METEO.keys()):
-        T2 = ((METEO.T2.values + zero_temperature) + (ELEVATION - station_altitude) * METEO.T2_LAPSE.values) + air_temperature_offset
-    else:
-        T2 = ((METEO.T2.values + zero_temperature) + (ELEVATION - station_altitude) * air_temperature_lapse_rate) + air_temperature_offset
-
-    # Interpolate atmospheric pressure using the barometric equation
-    np.seterr(divide = 'ignore') 
-    if 'T2_LAPSE' in list(METEO.keys()):
-        PRES = np.where(METEO.T2_LAPSE.values == 0,  
-                        METEO.PRES.values * np.exp(((-g * M) * (ELEVATION - station_altitude))/(R * ((METEO.T2.values + zero_temperature) + air_temperature_offset))),
-                        METEO.PRES.values * np.power((T2 / ((METEO.T2.values + zero_temperature) + air_temperature_offset)),((-g * M) / (R * METEO.T2_LAPSE.values))))
-    else:
-        PRES = METEO.PRES.values * np.power((T2 / ((METEO.T2.values + zero_temperature) + air_temperature_offset)),((-g * M) / (R * air_temperature_lapse_rate)))
-    
-    # Precipitation:
-    precipitation_allowed = ['standard','Mattea21']
-
-    # Standard precipiation data [mm] (Van Pelt et al., 2019)
-    if precipitation_method == 'standard':
-        if 'RRR' in list(METEO.keys()):
-            RRR = METEO.RRR.values * (1 + (ELEVATION - station_altitude) * precipitation_lapse_rate) * precipitation_multiplier
-        else:
-            raise ValueError("Error: Precipitation ('RRR') [mm] must be supplied in the input METEO file")
-
-    # Three-phase precipitation model (Mattea et al., 2021) (Precipitation climatology [m w.e.] * Annual anomaly [-] * Downscaling coefficient) [-]) 
-    elif precipitation_method == 'Mattea21':
-        if ('PRECIPITATION_CLIMATOLOGY' in list(STATIC.keys())) and ('PRECIPITATION_ANOMALY' in list(METEO.keys())) and ('D' in list(METEO.keys())):
-            RRR = STATIC.PRECIPITATION_CLIMATOLOGY.values * METEO.PRECIPITATION_ANOMALY.values * METEO.D.values * 1000 * precipitation_multiplier
-        else:
-            raise ValueError("Error: All three variables of the three phase precipitation model ('PRECIPITATION_CLIMATOLOGY', 'PRECIPITATION_ANOMALY','D') must be supplied in the input STATIC & METEO files")
+    # Multi-station meteorological data: only the interpolation stations of the node are read
+    if STATIONS is not None:
+        METEO = METEO.isel(station = STATIONS[0])
 
-    else:
-        raise ValueError("Precipitation method = \"{:s}\" is not allowed, must be one of {:s}".format(precipitation_method, ", ".join(precipitation_allowed)))
-
-    # Remaining variables remain constant across the spatial grid
-    RH2 = METEO.RH2.values
-    U2 = METEO.U2.values
+    # Calendar of the simulation timestamps (the meteorological forcing itself is streamed in the time loop, see main/kernel/forcing.py):
     MONTH = METEO.time.dt.month.values
     YEAR = METEO.time.dt.year.values
     HYDRO_YEAR = np.where(MONTH < 10, YEAR, YEAR + 1)
-
-    # Radiative fluxes (SWin & LWin):
-    if ('SWin' in list(METEO.keys())) and ('LWin' in list(METEO.keys())):
-        SWin = METEO.SWin.values
-        LWin = METEO.LWin.values
-        N = None
-
-    # Input shortwave radiation (SWin) and fractional cloud cover (N):
-    elif ('SWin' in list(METEO.keys())) and ('N' in list(METEO.keys())):
-        SWin = METEO.SWin.values
-        N = METEO.N.values
-        LWin = None
-
-    # Input longwave radiation (LWin) and fractional cloud cover (N):
-    elif ('LWin' in list(METEO.keys())) and ('N' in list(METEO.keys())):
-        SWin = None
-        N = METEO.N.values
-        LWin = METEO.LWin.values
-
-    # Fractional cloud cover (N) only:
-    elif 'N' in list(METEO.keys()):
-        N = METEO.N.values
-        SWin = None
-        LWin = None
-
-    # Radiative fluxes error message:
-    else:
-        raise ValueError("Error: Either Fractional cloud cover ('N') or incoming Longwave radiation ('LWin') must be supplied in the input METEO file")
-
-    # =============================== #
-    # GET ILLUMINATION DATA FROM FILE
-    # =============================== #
-
-    ILLUMINATION_NORM = ILLUMINATION.ILLUMINATION_NORM.values # Illumination (Normal Year)
-    ILLUMINATION_LEAP = ILLUMINATION.ILLUMINATION_LEAP.values # Illumination (Leap Year)
-
-    # =================== #
-    # SHORTWAVE RADIATION
-    # =================== #
-
-    # Top of Atmosphere (TOA) Radiation
     DOY = METEO.time.dt.dayofyear.values       # Day of Year
-    HOUR = METEO.time.dt.hour.values           # Hour
-    LEAP = METEO.time.dt.is_leap_year.values   # Leap Year (Boolean)
-    HOY = ((DOY - 1) * 24) + HOUR              # Hour of Year    
-    TOA_INSOL, TOA_INSOL_FLAT, TOA_INSOL_NORM = TOA_insolation(LATITUDE, LONGITUDE, SLOPE, ASPECT, HOUR, LEAP, HOY)
-
-    # Illumination
-    NODE_ILLUMINATION = np.where(LEAP,ILLUMINATION_LEAP[HOY],ILLUMINATION_NORM[HOY]) 
-
-    # Input Shortwave Radiation
-    if ('SWin' in list(METEO.keys())):
-        SWin = shortwave_radiation_input(PRES, T2, RH2, TOA_INSOL, TOA_INSOL_FLAT, TOA_INSOL_NORM, NODE_ILLUMINATION, SWin = SWin)
-    elif ('N' in list(METEO.keys())):
-        SWin = shortwave_radiation_input(PRES, T2, RH2, TOA_INSOL, TOA_INSOL_FLAT, TOA_INSOL_NORM, NODE_ILLUMINATION, N = N)
     
     # ====================== #
     # LOCAL RESULT VARIABLES
     # ====================== #
 
-    # Meteorological Variables (6):
-    _AIR_TEMPERATURE = np.full(nt,np.nan, dtype=precision)
-    _AIR_PRESSURE = np.full(nt,np.nan, dtype=precision)
-    _RELATIVE_HUMIDITY = np.full(nt,np.nan, dtype=precision)
-    _SPECIFIC_HUMIDITY = np.full(nt,np.nan, dtype=precision)    
-    _WIND_SPEED = np.full(nt,np.nan, dtype=precision)
-    _FRACTIONAL_CLOUD_COVER = np.full(nt,np.nan, dtype=precision)
-
-    # Surface Energy Fluxes (7):
-    _SHORTWAVE = np.full(nt,np.nan, dtype=precision)
-    _LONGWAVE = np.full(nt,np.nan, dtype=precision)
-    _SENSIBLE = np.full(nt,np.nan, dtype=precision)
-    _LATENT = np.full(nt,np.nan, dtype=precision)
-    _SUBSURFACE = np.full(nt,np.nan, dtype=precision)
-    _RAIN_HEAT_FLUX = np.full(nt,np.nan, dtype=precision)
-    _MELT_ENERGY = np.full(nt,np.nan, dtype=precision)
-
-    # Surface Mass Fluxes (8):
-    _RAIN = np.full(nt,np.nan, dtype=precision)
-    _SNOWFALL = np.full(nt,np.nan, dtype=precision)
-    _EVAPORATION = np.full(nt,np.nan, dtype=precision)
-    _SUBLIMATION = np.full(nt,np.nan, dtype=precision)
-    _CONDENSATION = np.full(nt,np.nan, dtype=precision)
-    _DEPOSITION = np.full(nt,np.nan, dtype=precision)
-    _SURFACE_MELT = np.full(nt,np.nan, dtype=precision)
-    _SURFACE_MASS_BALANCE = np.full(nt,np.nan, dtype=precision)
-
-    # Subsurface Mass Fluxes (4):
-    _REFREEZE = np.full(nt,np.nan, dtype=precision)
-    _SUBSURFACE_MELT = np.full(nt,np.nan, dtype=precision)
-    _RUNOFF = np.full(nt,np.nan, dtype=precision)
-    _MASS_BALANCE = np.full(nt,np.nan, dtype=precision)
-
-    # Other Information (11):
-    _SNOW_HEIGHT = np.full(nt,np.nan, dtype=precision)
-    _SNOW_WATER_EQUIVALENT = np.full(nt,np.nan, dtype=precision)
-    _TOTAL_HEIGHT = np.full(nt,np.nan, dtype=precision)
-    _SURFACE_ELEVATION = np.full(nt,np.nan, dtype=precision)
-    _SURFACE_TEMPERATURE = np.full(nt,np.nan, dtype=precision)
-    _SURFACE_HUMIDITY = np.full(nt,np.nan, dtype=precision)
-    _SURFACE_ALBEDO = np.full(nt,np.nan, dtype=precision)
-    _N_LAYERS = np.full(nt,np.nan, dtype=precision)     
-    _FIRN_TEMPERATURE = np.full(nt,np.nan, dtype=precision)
-    _FIRN_TEMPERATURE_CHANGE = np.full(nt,np.nan, dtype=precision)
-    _FIRN_FACIE = np.zeros(nt, dtype ='int32')
-
-    # Subsurface Variables (12):
-    _LAYER_DEPTH = np.full((nt,max_layers), np.nan, dtype=precision)
-    _LAYER_HEIGHT = np.full((nt,max_layers), np.nan, dtype=precision)
-    _LAYER_DENSITY = np.full((nt,max_layers), np.nan, dtype=precision)
-    _LAYER_TEMPERATURE = np.full((nt,max_layers), np.nan, dtype=precision)
-    _LAYER_WATER_CONTENT = np.full((nt,max_layers), np.nan, dtype=precision)
-    _LAYER_COLD_CONTENT = np.full((nt,max_layers), np.nan, dtype=precision)
-    _LAYER_POROSITY = np.full((nt,max_layers), np.nan, dtype=precision)
-    _LAYER_ICE_FRACTION = np.full((nt,max_layers), np.nan, dtype=precision)
-    _LAYER_IRREDUCIBLE_WATER = np.full((nt,max_layers), np.nan, dtype=precision)
-    _LAYER_REFREEZE = np.full((nt,max_layers), np.nan, dtype=precision)
-    _LAYER_HYDRO_YEAR = np.full((nt,max_layers), np.nan, dtype=precision)
-    _LAYER_GRAIN_SIZE = np.full((nt,max_layers), np.nan, dtype=precision)
-
     # ============================== #
     # AGGREGATION & OUTPUT REPORTING
     # ============================== #
@@ -321,12 +241,42 @@ def fricosipy_core(STATIC, METEO, ILLUMINATION, indY, indX, nt):
         # Initial index is equal to the first timestamp in the METEO dataset (0):
         initial_index = 0
 
+    # Multi-resolution aggregates: period index of each timestep (-1 during the spin-up) and the period-end mask of each aggregation level
+    LEVELS = get_aggregation_levels(full = result_cache)
+    level_periods, level_codes, level_end = {}, {}, {}
+    for level in LEVELS:
+        level_codes[level] = np.full(len(METEO.time.values), -1, dtype = np.int64)
+        level_codes[level][initial_index:] = get_aggregation_periods(METEO.time.values[initial_index:], level)[0]
+        level_periods[level] = int(level_codes[level].max()) + 1
+        level_end[level] = np.append(level_codes[level][1:] != level_codes[level][:-1], True) & (level_codes[level] >= 0)
+
+    # Derived indicators: calendar year index of each timestep (-1 during the spin-up) and the year-end mask
+    INDICATOR_NAMES = get_indicators()
+    if len(INDICATOR_NAMES) > 0:
+        year_codes = np.full(len(METEO.time.values), -1, dtype = np.int64)
+        year_codes[initial_index:] = pd.factorize(YEAR[initial_index:])[0]
+        year_end = np.append(year_codes[1:] != year_codes[:-1], True) & (year_codes >= 0)
+        level_periods['indicators'] = int(year_codes.max()) + 1
+        DAY = METEO.time.values.astype('datetime64[D]').astype(np.int64)
+
+    # Indicator instances (updated every timestep) & firn temperature requirement:
+    INDICATOR_OBJECTS = [INDICATORS[name]() for name in INDICATOR_NAMES]
+    firn_indicators = any('firn_temperature' in indicator.requires for indicator in INDICATOR_OBJECTS)
+
+    # Output schedule of the subsurface variables (reported with the 3-D variables, unless profile_timestamps is set):
+    if (full_field == True) and (profile_timestamps is not None):
+        profile_mask = np.isin(METEO.time.values, get_profile_timestamps(METEO.time.values[initial_index:]))
+    else:
+        profile_mask = None
+
+    # Edges of the fixed depth grid (profiles remapped from layer index to depth, see profile_depth_grid):
+    depth_edges = get_depth_grid() if (full_field == True) and (profile_depth_grid is not None) else None
+
     if reduced_output == True:
 
-        # Output variables are reported on user-defined output timestamps (converting from datetime [ns] to timestamp index):
-        output_indexes = ((pd.read_csv(os.path.join(data_path,'output/output_timestamps',output_timestamps), header = None).to_numpy(dtype = np.datetime64) - \
-                           METEO.time[0].data).astype(dtype = np.float64) / (1e9 * dt)).astype(dtype = np.int32)
-        time_end_index = ((METEO.time[-1].data - METEO.time[0].data).astype(dtype = np.float64) / (1e9 * dt)).astype(dtype = np.int32)
+        # Output variables are reported on user-defined output timestamps (simulation timestamps, see load_meteo_file), as timestamp indexes:
+        output_indexes = np.searchsorted(METEO.time.values, pd.read_csv(os.path.join(data_path,'output/output_timestamps',output_timestamps), header = None).to_numpy(dtype = np.datetime64).flatten()).astype(np.int32)
+        time_end_index = len(METEO.time.values) - 1
 
         # Final simulation timestamp must be included in the output timestamps to prevent an error:
         if time_end_index not in output_indexes:
@@ -337,8 +287,55 @@ def fricosipy_core(STATIC, METEO, ILLUMINATION, indY, indX, nt):
         # Output variables are reported on all simulation timestamps:
         output_indexes = np.arange(initial_index, initial_index + nt)
 
-    # Aggregation timesteps for output variables between output timestamps:
-    aggregation_timesteps = np.diff(np.insert(output_indexes,0,(initial_index - 1)))
+    # Boolean output mask of the simulation timestamps (avoids searching the output indexes every timestep):
+    output_mask = np.zeros(len(METEO.time.values), dtype = bool)
+    output_mask[np.ravel(output_indexes)] = True
+    profile_shape = None if profile_mask is None else (int(profile_mask.sum()),)
+    if profile_mask is None:
+        profile_mask = output_mask
+
+    # Time window: the result blocks only hold the output timestamps, profiles & completed periods of the window [start, stop),
+    # their offsets are the number of output timestamps, profiles & completed periods before the window
+    if window is None:
+        start, stop = 0, len(METEO.time.values)
+    else:
+        start, stop = window
+    period_end = dict(level_end, **({'indicators': year_end} if len(INDICATOR_NAMES) > 0 else {}))
+    OFFSETS = {'series': int(output_mask[:start].sum()), 'profiles': int(profile_mask[:start].sum())}
+    OFFSETS.update({block: int(end[:start].sum()) for block, end in period_end.items()})
+    if window is not None:
+        nt = int(output_mask[start:stop].sum())
+        profile_shape = (int(profile_mask[start:stop].sum()),)
+        level_periods = {block: int(end[start:stop].sum()) for block, end in period_end.items()}
+
+    # Only the output variables requested in the config file are allocated (see output_variables.py),
+    # the result cache holds all output variables (later runs select the requested subset):
+    HEADER = get_result_layout(full = result_cache)
+    BLOCKS = create_result_blocks(HEADER, (nt,), level_periods, profile_shape)
+    if window is not None:
+        BLOCKS['offsets'] = OFFSETS
+
+    # Named views of each output variable within the packed result blocks:
+    RESULTS = {}
+    for block in ['series','profiles']:
+        for i, name in enumerate(HEADER[block]):
+            RESULTS[name] = BLOCKS[block][i]
+
+    # Aggregated output variables (averaged or summated between output timestamps):
+    AGGREGATED = [name for name in RESULTS if OUTPUT_VARIABLES[name]['aggregation'] != 'instantaneous']
+    AVERAGED = [OUTPUT_VARIABLES[name]['aggregation'] == 'mean' for name in AGGREGATED]
+
+    # Firn temperature diagnostics:
+    firn_diagnostics = any(name in RESULTS for name in ['FIRN_TEMPERATURE','FIRN_TEMPERATURE_CHANGE','FIRN_FACIE'])
+
+    # Running aggregates of the aggregated output variables between output timestamps:
+    aggregate = np.zeros(len(AGGREGATED), dtype = np.float64)
+    aggregation_timesteps = 0
+
+    # Running aggregates of each aggregation level (only the period aggregates are stored, never the timestep values):
+    level_aggregate = {level: np.zeros(len(names), dtype = np.float64) for level, names in LEVELS.items()}
+    level_averaged = {level: np.array([OUTPUT_VARIABLES[name]['aggregation'] == 'mean' for name in names], dtype = bool) for level, names in LEVELS.items()}
+    level_timesteps = {level: 0 for level in LEVELS}
 
     # ========= #
     # TIME LOOP
@@ -349,15 +346,102 @@ def fricosipy_core(STATIC, METEO, ILLUMINATION, indY, indX, nt):
     surface_temperature = 270
     annual_mass_balances = np.empty(0)
     cumulative_mass_balance = 0
-    water_content = (np.array(GRID.get_liquid_water_content()) * np.array(GRID.get_height())).sum()
+    water_content = GRID.get_total_liquid_water()
     cumulative_melt = 0.0
     Initial_Firn_Temperature = np.nan
 
+    # Hydrological years of the first simulated timestep & of the timestep before the time window (annual accumulation),
+    # a spin-up cycle starts its bookkeeping at the start of the spin-up period:
+    first_hydro_year = HYDRO_YEAR[start]
+    previous_hydro_year = HYDRO_YEAR[start]
+
+    # Values carried over from the previous time window (or from the restart file of a previous simulation or the spin-up):
+    if STATE is not None:
+        accumulation = STATE['accumulation']
+        surface_temperature = STATE['surface_temperature']
+
+    # Mass balance, melt & firn temperature bookkeeping (not carried over from the spin-up):
+    if (STATE is not None) and ('cumulative_mass_balance' in STATE):
+        annual_mass_balances = STATE['annual_mass_balances']
+        cumulative_mass_balance = STATE['cumulative_mass_balance']
+        cumulative_melt = STATE['cumulative_melt']
+        Initial_Firn_Temperature = STATE['Initial_Firn_Temperature']
+        first_hydro_year = STATE['first_hydro_year']
+        previous_hydro_year = STATE['previous_hydro_year']
+
+    # Running aggregates & indicators carried over from the previous time window (a restart state only holds the physical state of the node):
+    if (STATE is not None) and ('aggregate' in STATE):
+        aggregate = STATE['aggregate']
+        aggregation_timesteps = STATE['aggregation_timesteps']
+        level_aggregate = STATE['level_aggregate']
+        level_timesteps = STATE['level_timesteps']
+        INDICATOR_OBJECTS = STATE['indicators']
+
+    def get_state(melted = False):
+        """ Returns the state of the node at the end of the time window (picklable, handed to the next time window or written to the restart file) """
+        return {'GRID': get_grid_state(GRID), 'melted': melted, 'accumulation': accumulation, 'surface_temperature': surface_temperature,
+                'annual_mass_balances': annual_mass_balances, 'cumulative_mass_balance': cumulative_mass_balance, 'cumulative_melt': cumulative_melt,
+                'Initial_Firn_Temperature': Initial_Firn_Temperature, 'first_hydro_year': first_hydro_year, 'previous_hydro_year': HYDRO_YEAR[stop - 1],
+                'aggregate': aggregate, 'aggregation_timesteps': aggregation_timesteps, 'level_aggregate': level_aggregate,
+                'level_timesteps': level_timesteps, 'indicators': INDICATOR_OBJECTS}
+
+    # The final state of the node is returned for the next time window or the restart file:
+    return_state = (window is not None) or (restart_output is not None)
+
+    # Node melted during the previous simulation (restart file): the node is not simulated
+    if (STATE is not None) and STATE['melted']:
+        return (indY,indX,BLOCKS,HEADER,get_state(melted = True)) if return_state else (indY,indX,BLOCKS,HEADER)
+
+    # Quiescent fast path: dry column (percolation skipped), deferred subsurface time [s] & timesteps, statistics of the node
+    column_dry = False
+    deferred_dt, deferred_steps = 0.0, 0
+    n_quiescent, n_percolation_skipped, n_aggregated = 0, 0, 0
+
+    # Timesteps reading the column (subsurface profiles, instantaneous column outputs, indicators & the initial firn temperature):
+    # the deferred quiescent timesteps are integrated beforehand
+    column_read = np.zeros(len(METEO.time.values), dtype = bool)
+    if full_field:
+        column_read |= profile_mask
+    if firn_diagnostics or any(name in RESULTS for name in ['SNOW_HEIGHT','SNOW_WATER_EQUIVALENT','TOTAL_HEIGHT','SURFACE_ELEVATION','N_LAYERS']):
+        column_read |= output_mask
+    if len(INDICATOR_OBJECTS) > 0:
+        column_read[initial_index:] = True
+    if 'FIRN_TEMPERATURE_CHANGE' in RESULTS:
+        column_read[initial_index] = True
+
+    def integrate_deferred_steps():
+        """ Integrates the deferred quiescent timesteps in a single thermal diffusion, snow metamorphism & densification step
+            (the explicit schemes are still substepped, see explicit_substep) """
+        nonlocal deferred_dt, deferred_steps, n_aggregated
+        thermal_diffusion(GRID, BASAL, deferred_dt)
+        snow_metamorphism(GRID, deferred_dt)
+        densification(GRID, deferred_dt, accumulation)
+        deferred_dt, deferred_steps = 0.0, 0
+        n_aggregated += 1
+
     # Indexes:
-    idx_agg = 0 # Aggregation index (index of the variable aggregation arrays)
     idx_res = 0 # Result index (index of the output/result variable arrays)
+    idx_prof = 0 # Profile index (index of the subsurface variable arrays)
+
+    # Meteorological forcing of the node, streamed in chunks of meteo_chunk_size timesteps (if unused: a single chunk):
+    FORCING_STREAM = ForcingStream(METEO, STATIC, ILLUMINATION, start, stop, (stop - start) if meteo_chunk_size is None else meteo_chunk_size,
+                                   None if STATIONS is None else STATIONS[1])
+    chunk_stop = start
+
+    for t in np.arange(start, stop):
 
-    for t in np.arange(len(METEO.time.values)):
+        # ==================== #
+        # METEOROLOGICAL DATA
+        # ==================== #
+
+        # Next chunk of the meteorological forcing (the following chunk is read in the background):
+        if t == chunk_stop:
+            chunk_start, chunk_stop, FORCING = FORCING_STREAM.get()
+            T2, PRES, RRR, RH2, U2 = FORCING['T2'], FORCING['PRES'], FORCING['RRR'], FORCING['RH2'], FORCING['U2']
+            SWin, LWin, N = FORCING['SWin'], FORCING['LWin'], FORCING['N']
+
+        # Index of the timestep within the forcing chunk:
+        k = t - chunk_start
 
         # ============= #
         # PRECIPITATION
@@ -365,14 +449,14 @@ def fricosipy_core(STATIC, METEO, ILLUMINATION, indY, indX, nt):
 
         # Calc fresh snow density
         if snow_density_method =='Vionnet12':
-            density_fresh_snow = np.maximum(109.0+6.0*(T2[t]-273.16)+26.0*np.sqrt(U2[t]), 50.0)
+            density_fresh_snow = np.maximum(109.0+6.0*(T2[k]-273.16)+26.0*np.sqrt(U2[k]), 50.0)
         elif snow_density_method =='constant':
             density_fresh_snow = constant_fresh_snow_density 
 
         # Derive snowfall [m] and rain rates [m w.e.]
         # Convert total precipitation [mm] to snowfall [m] and rain [m]
-        SNOWFALL = (RRR[t] / 1000.0) * (water_density/density_fresh_snow) * (0.5*(-np.tanh((T2[t] - zero_temperature)) + 1.0))
-        RAIN = (RRR[t] / 1000.0) - SNOWFALL * (density_fresh_snow/water_density)
+        SNOWFALL = (RRR[k] / 1000.0) * (water_density/density_fresh_snow) * (0.5*(-np.tanh((T2[k] - zero_temperature)) + 1.0))
+        RAIN = (RRR[k] / 1000.0) - SNOWFALL * (density_fresh_snow/water_density)
 
         # if snowfall is smaller than the threshold
         if SNOWFALL < minimum_snowfall:
@@ -382,9 +466,17 @@ def fricosipy_core(STATIC, METEO, ILLUMINATION, indY, indX, nt):
         if RAIN < minimum_snowfall * (density_fresh_snow / water_density):
             RAIN = 0.0
 
+        # Quiescent forcing (night, no precipitation, cold surface & liquid-free snowpack at the end of the previous timestep, from the column total):
+        quiescent = (SWin[k] == 0) and (SNOWFALL == 0) and (RAIN == 0) and (surface_temperature < zero_temperature) and \
+                    (GRID.get_total_liquid_water() < 1e-12)
+
+        # Deferred quiescent timesteps are integrated before a non-quiescent timestep modifies the column (before the surface energy balance):
+        if (deferred_steps > 0) and (not quiescent):
+            integrate_deferred_steps()
+
         if SNOWFALL > 0.0:
             # Add a new snow node on top
-           GRID.add_fresh_snow(SNOWFALL, density_fresh_snow, np.minimum(float(T2[t]),zero_temperature), int(HYDRO_YEAR[t]), grain_size_fresh_snow)
+           GRID.add_fresh_snow(SNOWFALL, density_fresh_snow, np.minimum(float(T2[k]),zero_temperature), int(HYDRO_YEAR[t]), grain_size_fresh_snow)
         else:
            GRID.set_fresh_snow_props_update_time(dt)
 
@@ -403,7 +495,7 @@ def fricosipy_core(STATIC, METEO, ILLUMINATION, indY, indX, nt):
         albedo = update_albedo(GRID, surface_temperature)
 
         # Calculate net shortwave radiation
-        SW_net = SWin[t] * (1 - albedo)
+        SW_net = SWin[k] * (1 - albedo)
 
         # Penetrating SW radiation and subsurface melt
         if SW_net > 0.0:
@@ -428,12 +520,12 @@ def fricosipy_core(STATIC, METEO, ILLUMINATION, indY, indX, nt):
         if LWin is not None:
             # Find new surface temperature (LW is directly supplied from meteorological data)
             fun, surface_temperature, lw_radiation_in, lw_radiation_out, sensible_heat_flux, latent_heat_flux, \
-            subsurface_heat_flux, rain_heat_flux, q0, q2 = update_surface_temperature(GRID, z0, T2[t], RH2[t], PRES[t], sw_radiation_net, U2[t], RAIN, SLOPE, LWinput = LWin[t])
+            subsurface_heat_flux, rain_heat_flux, q0, q2 = update_surface_temperature(GRID, z0, T2[k], RH2[k], PRES[k], sw_radiation_net, U2[k], RAIN, SLOPE, LWinput = LWin[k])
 
         else:
             # Find new surface temperature (LW is parametrised using fractional cloud cover)
             fun, surface_temperature, lw_radiation_in, lw_radiation_out, sensible_heat_flux, latent_heat_flux, \
-            subsurface_heat_flux, rain_heat_flux, q0, q2 = update_surface_temperature(GRID, z0, T2[t], RH2[t], PRES[t], sw_radiation_net, U2[t], RAIN, SLOPE, N = N[t])
+            subsurface_heat_flux, rain_heat_flux, q0, q2 = update_surface_temperature(GRID, z0, T2[k], RH2[k], PRES[k], sw_radiation_net, U2[k], RAIN, SLOPE, N = N[k])
 
         # ============================ #
         # SURFACE MASS FLUXES [m w.e.]
@@ -486,14 +578,11 @@ def fricosipy_core(STATIC, METEO, ILLUMINATION, indY, indX, nt):
             print(f"\t Node [X: {EASTING} , Y: {NORTHING} ] has melted!", flush=True)
 
             # Prematurely terminate node simulation and return output variables:    
-            return (indY,indX, \
-            _AIR_TEMPERATURE,_AIR_PRESSURE,_RELATIVE_HUMIDITY,_SPECIFIC_HUMIDITY,_WIND_SPEED,_FRACTIONAL_CLOUD_COVER, \
-            _SHORTWAVE,_LONGWAVE,_SENSIBLE,_LATENT,_SUBSURFACE,_RAIN_HEAT_FLUX,_MELT_ENERGY, \
-            _RAIN,_SNOWFALL,_EVAPORATION,_SUBLIMATION,_CONDENSATION,_DEPOSITION,_SURFACE_MELT,_SURFACE_MASS_BALANCE, \
-            _REFREEZE,_SUBSURFACE_MELT,_RUNOFF,_MASS_BALANCE, \
-            _SNOW_HEIGHT,_SNOW_WATER_EQUIVALENT,_TOTAL_HEIGHT,_SURFACE_ELEVATION,_SURFACE_TEMPERATURE,_SURFACE_HUMIDITY,_SURFACE_ALBEDO,_N_LAYERS,_FIRN_TEMPERATURE,_FIRN_TEMPERATURE_CHANGE,_FIRN_FACIE, \
-            _LAYER_DEPTH,_LAYER_HEIGHT,_LAYER_DENSITY,_LAYER_TEMPERATURE,_LAYER_WATER_CONTENT,_LAYER_COLD_CONTENT,_LAYER_POROSITY,_LAYER_ICE_FRACTION, \
-            _LAYER_IRREDUCIBLE_WATER,_LAYER_REFREEZE,_LAYER_HYDRO_YEAR,_LAYER_GRAIN_SIZE)
+            BLOCKS['timesteps'] = t - start + 1
+            FORCING_STREAM.close()
+            if return_state:
+                return (indY,indX,BLOCKS,HEADER,get_state(melted = True))
+            return (indY,indX,BLOCKS,HEADER)
         
         # ======================== #
         # PERCOLATION & REFREEZING
@@ -501,21 +590,43 @@ def fricosipy_core(STATIC, METEO, ILLUMINATION, indY, indX, nt):
         
         # Calculate surface water [m w.e.]
         surface_water = max(surface_melt + condensation - evaporation + RAIN, 0) 
-        
-        # Calculate run-off and refreezing
-        Q , water_refrozen = percolation_refreezing(GRID, HYDRO_YEAR[t], surface_water, dt)
+
+        # Quiescent timestep (no surface water, the surface remains below the melting point): no liquid water enters the column
+        quiescent = quiescent and (surface_water == 0) and (surface_temperature < zero_temperature)
+        n_quiescent += quiescent
+
+        # Deferred quiescent timesteps are integrated before the liquid water of the timestep percolates:
+        if (deferred_steps > 0) and (not quiescent):
+            integrate_deferred_steps()
+
+        # Calculate run-off and refreezing (skipped while the column remains dry: the refreezing of the last dry timestep has already been reset)
+        if quiescent and column_dry:
+            Q , water_refrozen = 0, 0
+            n_percolation_skipped += 1
+        else:
+            column_dry = quiescent
+            Q , water_refrozen = percolation_refreezing(GRID, HYDRO_YEAR[t], surface_water, dt)
+
+        # Consecutive quiescent timesteps are deferred (see quiescent_aggregation) & integrated in a single thermal diffusion, snow metamorphism
+        # & densification step before a non-quiescent timestep, at the aggregation limit, before the column is read (see column_read) or at the end of the time window:
+        defer = quiescent and (quiescent_aggregation > 1)
+        if defer:
+            deferred_dt += dt
+            deferred_steps += 1
 
         # ================= #
         # THERMAL DIFFUSION
         # ================= #
     
-        thermal_diffusion(GRID, BASAL, dt)
+        if not defer:
+            thermal_diffusion(GRID, BASAL, dt)
 
         # ================= #
         # SNOW METAMORPHISM
         # ================= #
 
-        snow_metamorphism(GRID, dt)
+        if not defer:
+            snow_metamorphism(GRID, dt)
 
         # ================= #
         # DRY DENSIFICATION
@@ -524,7 +635,7 @@ def fricosipy_core(STATIC, METEO, ILLUMINATION, indY, indX, nt):
         # Auxillary function for calculating accumulation for Ligtenberg et al. (2011) firn densification scheme:
 
         # Calculate annual accumulation when it is a new hydrological year (not the first year in case it is incomplete)
-        if (HYDRO_YEAR[t] != HYDRO_YEAR[max(t-1, 0)]) and (HYDRO_YEAR[t] != (HYDRO_YEAR[0] + 1)):
+        if (HYDRO_YEAR[t] != (HYDRO_YEAR[t-1] if t > start else previous_hydro_year)) and (HYDRO_YEAR[t] != (first_hydro_year + 1)):
 
             # Append annual mass balance and calculate accumulation (negative if ablation):
             annual_mass_balances = np.append(annual_mass_balances, cumulative_mass_balance)
@@ -533,61 +644,33 @@ def fricosipy_core(STATIC, METEO, ILLUMINATION, indY, indX, nt):
             # Reset the annual mass balance for the next hydrological year:
             cumulative_mass_balance = 0
 
-        densification(GRID, dt, accumulation)
+        if not defer:
+            densification(GRID, dt, accumulation)
+
+        # Deferred quiescent timesteps (see above):
+        if (deferred_steps == quiescent_aggregation) or ((deferred_steps > 0) and (column_read[t] or (t == stop - 1))):
+            integrate_deferred_steps()
 
         # ============ #
         # MASS BALANCE
         # ============ #
 
         surface_mass_balance = SNOWFALL * (density_fresh_snow / water_density) + deposition - evaporation - sublimation - surface_melt
-        mass_balance = surface_mass_balance - subsurface_melt + water_refrozen + ((np.array(GRID.get_liquid_water_content()) * np.array(GRID.get_height())).sum() - water_content)
-        water_content = (np.array(GRID.get_liquid_water_content()) * np.array(GRID.get_height())).sum()
+        mass_balance = surface_mass_balance - subsurface_melt + water_refrozen + (GRID.get_total_liquid_water() - water_content)
+        water_content = GRID.get_total_liquid_water()
         cumulative_mass_balance +=  mass_balance
 
+        # Conservation check of the incrementally maintained column totals (debug mode only):
+        if debug_mode == True:
+            if GRID.get_column_totals_error() > 1e-6:
+                raise ValueError(f"Error: Column totals of node [X: {EASTING} , Y: {NORTHING} ] have drifted from the subsurface layers at timestep {t}")
+
         # ================== #
         # INITIAL CONDITIONS
         # ================== #
 
-        # Setup Aggregated Variable Arrays:
-        if ((model_spin_up == True) and (t == initial_index)) or ((model_spin_up == False) and (t == 0)):
-
-            # Aggregated Meteorological Data (6):
-            AIR_TEMPERATURE_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-            AIR_PRESSURE_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-            RELATIVE_HUMIDITY_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-            SPECIFIC_HUMIDITY_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-            WIND_SPEED_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-            FRACTIONAL_CLOUD_COVER_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-
-            # Aggregated Energy Fluxes (7):
-            SHORTWAVE_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-            LONGWAVE_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-            SENSIBLE_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-            LATENT_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-            SUBSURFACE_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-            RAIN_FLUX_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-            MELT_ENERGY_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-
-            # Aggregated Surface Mass Fluxes (8):
-            RAIN_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-            SNOWFALL_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-            EVAPORATION_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-            SUBLIMATION_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-            CONDENSATION_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-            DEPOSITION_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-            SURFACE_MELT_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-            SURFACE_MASS_BALANCE_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-
-            # Aggregated Subsurface Mass Fluxes (4):
-            REFREEZING_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-            SUSBSURFACE_MELT_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-            RUNOFF_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-            MASS_BALANCE_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-
-            # Reset result step index
-            idx_agg = 0
-
-            # Calculate initial firn temperature
+        # Calculate initial firn temperature (unless carried over from the previous time window or the restart file):
+        if (t == initial_index) and np.isnan(Initial_Firn_Temperature) and ('FIRN_TEMPERATURE_CHANGE' in RESULTS):
             Index_Depth = np.searchsorted(GRID.get_depth(), firn_temperature_depth, side="left")   
             Initial_Firn_Temperature = GRID.get_temperature()[min(Index_Depth, GRID.get_number_layers() - 1)] - zero_temperature
 
@@ -598,201 +681,192 @@ def fricosipy_core(STATIC, METEO, ILLUMINATION, indY, indX, nt):
         # Store Aggregated Variables:
         if ((model_spin_up == True) and (t >= initial_index)) or (model_spin_up == False):
 
-            # Aggregated Meteorological Data (6):
-            AIR_TEMPERATURE_AGG[idx_agg] = T2[t] - zero_temperature
-            AIR_PRESSURE_AGG[idx_agg] = PRES[t]
-            RELATIVE_HUMIDITY_AGG[idx_agg] = RH2[t]
-            SPECIFIC_HUMIDITY_AGG[idx_agg] = q2
-            WIND_SPEED_AGG[idx_agg] = U2[t]
-            if N is not None:
-                FRACTIONAL_CLOUD_COVER_AGG[idx_agg] = N[t]
-
-            # Aggregated Energy Fluxes (7):
-            SHORTWAVE_AGG[idx_agg] = sw_radiation_net
-            LONGWAVE_AGG[idx_agg] = lw_radiation_in + lw_radiation_out
-            SENSIBLE_AGG[idx_agg] = sensible_heat_flux
-            LATENT_AGG[idx_agg] = latent_heat_flux
-            SUBSURFACE_AGG[idx_agg] = subsurface_heat_flux
-            RAIN_FLUX_AGG[idx_agg] = rain_heat_flux
-            MELT_ENERGY_AGG[idx_agg] = melt_energy
-
-            # Aggregated Surface Mass Fluxes (8):
-            RAIN_AGG[idx_agg] = RAIN
-            SNOWFALL_AGG[idx_agg] = SNOWFALL * (density_fresh_snow/water_density)
-            EVAPORATION_AGG[idx_agg] = evaporation
-            SUBLIMATION_AGG[idx_agg] = sublimation
-            CONDENSATION_AGG[idx_agg] = condensation
-            DEPOSITION_AGG[idx_agg] = deposition
-            SURFACE_MELT_AGG[idx_agg] = surface_melt
-            SURFACE_MASS_BALANCE_AGG[idx_agg] = surface_mass_balance
-
-            # Aggregated Subsurface Mass Fluxes (4):
-            REFREEZING_AGG[idx_agg] = water_refrozen
-            SUSBSURFACE_MELT_AGG[idx_agg] = subsurface_melt
-            RUNOFF_AGG[idx_agg] = Q
-            MASS_BALANCE_AGG[idx_agg] = mass_balance 
+            # Timestep values of the aggregated variables:
+            if (len(AGGREGATED) > 0) or (len(LEVELS) > 0):
+                values = {
+                    # Meteorological Data (6):
+                    'AIR_TEMPERATURE': T2[k] - zero_temperature,
+                    'AIR_PRESSURE': PRES[k],
+                    'RELATIVE_HUMIDITY': RH2[k],
+                    'SPECIFIC_HUMIDITY': q2,
+                    'WIND_SPEED': U2[k],
+                    'FRACTIONAL_CLOUD_COVER': N[k] if N is not None else np.nan,
+
+                    # Energy Fluxes (7):
+                    'SHORTWAVE': sw_radiation_net,
+                    'LONGWAVE': lw_radiation_in + lw_radiation_out,
+                    'SENSIBLE': sensible_heat_flux,
+                    'LATENT': latent_heat_flux,
+                    'SUBSURFACE': subsurface_heat_flux,
+                    'RAIN_HEAT_FLUX': rain_heat_flux,
+                    'MELT_ENERGY': melt_energy,
+
+                    # Surface Mass Fluxes (8):
+                    'RAIN': RAIN,
+                    'SNOWFALL': SNOWFALL * (density_fresh_snow/water_density),
+                    'EVAPORATION': evaporation,
+                    'SUBLIMATION': sublimation,
+                    'CONDENSATION': condensation,
+                    'DEPOSITION': deposition,
+                    'SURFACE_MELT': surface_melt,
+                    'SURFACE_MASS_BALANCE': surface_mass_balance,
+
+                    # Subsurface Mass Fluxes (4):
+                    'REFREEZE': water_refrozen,
+                    'SUBSURFACE_MELT': subsurface_melt,
+                    'RUNOFF': Q,
+                    'MASS_BALANCE': mass_balance}
+
+                for i, name in enumerate(AGGREGATED):
+                    aggregate[i] += values[name]
+
+                # Multi-resolution aggregates (reported at the end of each period):
+                for level, names in LEVELS.items():
+                    for i, name in enumerate(names):
+                        level_aggregate[level][i] += values[name]
+                    level_timesteps[level] += 1
+
+                    if level_end[level][t]:
+                        BLOCKS[level][:, level_codes[level][t] - OFFSETS[level]] = np.where(level_averaged[level], level_aggregate[level] / level_timesteps[level], level_aggregate[level])
+                        level_aggregate[level][:] = 0.0
+                        level_timesteps[level] = 0
 
             # Note: other variables are instantaneously reported and not aggregated!
 
-            # Increase aggregation index:
-            idx_agg += 1  
+            # Increase aggregation timesteps:
+            aggregation_timesteps += 1
+
+            # Derived indicators (reported at the end of each calendar year):
+            if len(INDICATOR_OBJECTS) > 0:
+                state = {'dt': dt, 'doy': DOY[t], 'day': DAY[t], 'surface_melt': surface_melt, 'surface_water': surface_water,
+                         'refreeze': water_refrozen, 'snow_height': GRID.get_total_snowheight()}
+                if firn_indicators:
+                    Index_Depth = np.searchsorted(GRID.get_depth(), firn_temperature_depth, side="left")
+                    state['firn_temperature'] = GRID.get_temperature()[min(Index_Depth, GRID.get_number_layers() - 1)] - zero_temperature
+
+                for indicator in INDICATOR_OBJECTS:
+                    indicator.update(state)
+
+                if year_end[t]:
+                    for i, indicator in enumerate(INDICATOR_OBJECTS):
+                        BLOCKS['indicators'][i, year_codes[t] - OFFSETS['indicators']] = indicator.result()
+                        indicator.reset()
 
         # ============== #
         # RESULT WRITING
         # ============== #
 
-        if (t in output_indexes):
-
-            # Aggregated Meteorological Data (6):
-            _AIR_TEMPERATURE[idx_res] = AIR_TEMPERATURE_AGG.mean()
-            _AIR_PRESSURE[idx_res] = AIR_PRESSURE_AGG.mean()
-            _RELATIVE_HUMIDITY[idx_res] = RELATIVE_HUMIDITY_AGG.mean()
-            _SPECIFIC_HUMIDITY[idx_res] = SPECIFIC_HUMIDITY_AGG.mean()
-            _WIND_SPEED[idx_res] = WIND_SPEED_AGG.mean()
-            _FRACTIONAL_CLOUD_COVER[idx_res] = FRACTIONAL_CLOUD_COVER_AGG.mean()
-
-            # Surface Energy Fluxes (Average Aggregated) (7):
-            _SHORTWAVE[idx_res] = SHORTWAVE_AGG.mean()
-            _LONGWAVE[idx_res] = LONGWAVE_AGG.mean()
-            _SENSIBLE[idx_res] = SENSIBLE_AGG.mean()
-            _LATENT[idx_res] = LATENT_AGG.mean()
-            _SUBSURFACE[idx_res] = SUBSURFACE_AGG.mean()
-            _RAIN_HEAT_FLUX[idx_res] = RAIN_FLUX_AGG.mean()
-            _MELT_ENERGY[idx_res] = MELT_ENERGY_AGG.mean()
-
-            # Surface Mass Fluxes (Cumulative Aggregated) (8):
-            _RAIN[idx_res] = RAIN_AGG.sum()
-            _SNOWFALL[idx_res] = SNOWFALL_AGG.sum()
-            _EVAPORATION[idx_res] = EVAPORATION_AGG.sum()
-            _SUBLIMATION[idx_res] = SUBLIMATION_AGG.sum()
-            _CONDENSATION[idx_res] = CONDENSATION_AGG.sum()
-            _DEPOSITION[idx_res] = DEPOSITION_AGG.sum()
-            _SURFACE_MELT[idx_res] = SURFACE_MELT_AGG.sum()
-            _SURFACE_MASS_BALANCE[idx_res] = SURFACE_MASS_BALANCE_AGG.sum()
-
-            # Subsurface Mass Fluxes (Cumulative Aggregated) (4):
-            _REFREEZE[idx_res] = REFREEZING_AGG.sum()
-            _SUBSURFACE_MELT[idx_res] = SUSBSURFACE_MELT_AGG.sum()
-            _RUNOFF[idx_res] = RUNOFF_AGG.sum()
-            _MASS_BALANCE[idx_res] = MASS_BALANCE_AGG.sum()
-
-            # Other Information (Instantaneous) (10):
-            _SNOW_HEIGHT[idx_res] = GRID.get_total_snowheight()
-            _SNOW_WATER_EQUIVALENT[idx_res] = np.sum(np.asarray(GRID.get_snow_heights()) * (np.asarray(GRID.get_snow_densities()) / water_density))
-            _TOTAL_HEIGHT[idx_res] = GRID.get_total_height()
-            _SURFACE_ELEVATION[idx_res] = GRID.get_base_elevation() + GRID.get_total_height()
-            _SURFACE_TEMPERATURE[idx_res] = surface_temperature - zero_temperature
-            _SURFACE_HUMIDITY[idx_res] = q0
-            _SURFACE_ALBEDO[idx_res] = albedo
-            _N_LAYERS[idx_res] = GRID.get_number_layers()
-
-            # Calculate Firn temperatures:
-            Index_Depth = np.searchsorted(GRID.get_depth(), firn_temperature_depth, side="left")
-            _FIRN_TEMPERATURE[idx_res] = GRID.get_temperature()[min(Index_Depth, GRID.get_number_layers() - 1)] - zero_temperature
-            _FIRN_TEMPERATURE_CHANGE[idx_res] = _FIRN_TEMPERATURE[idx_res] - Initial_Firn_Temperature
-
-            # Determine Firn Facie:
-            if GRID.get_temperature()[min(Index_Depth, GRID.get_number_layers() - 1)] - zero_temperature > 0.1:
-                _FIRN_FACIE[idx_res] = 4
-            elif cumulative_melt == 0:
-                _FIRN_FACIE[idx_res] = 1
-            elif not np.any(GRID.get_firn_refreeze()):
-                _FIRN_FACIE[idx_res] = 2
-            else:
-                _FIRN_FACIE[idx_res] = 3
-
-            # Subsurface Variables (Instantaneous) (11):
-            if full_field:
-                if GRID.get_number_layers() > max_layers:
-                    _LAYER_DEPTH[idx_res, 0:max_layers] = GRID.get_depth()[0:max_layers]
-                    _LAYER_HEIGHT[idx_res, 0:max_layers] = GRID.get_height()[0:max_layers]
-                    _LAYER_DENSITY[idx_res, 0:max_layers] = GRID.get_density()[0:max_layers]
-                    _LAYER_TEMPERATURE[idx_res, 0:max_layers] = np.asarray(GRID.get_temperature()[0:max_layers]) - zero_temperature
-                    _LAYER_WATER_CONTENT[idx_res, 0:max_layers] = GRID.get_liquid_water_content()[0:max_layers]
-                    _LAYER_COLD_CONTENT[idx_res, 0:max_layers] = GRID.get_cold_content()[0:max_layers]
-                    _LAYER_POROSITY[idx_res, 0:max_layers] = GRID.get_porosity()[0:max_layers]
-                    _LAYER_ICE_FRACTION[idx_res, 0:max_layers] = GRID.get_ice_fraction()[0:max_layers]
-                    _LAYER_IRREDUCIBLE_WATER[idx_res, 0:max_layers] = GRID.get_irreducible_water_content()[0:max_layers]
-                    _LAYER_REFREEZE[idx_res, 0:max_layers] = GRID.get_refreeze()[0:max_layers]
-                    _LAYER_GRAIN_SIZE[idx_res, 0:max_layers] = GRID.get_grain_size()[0:max_layers]
+        if output_mask[t]:
+
+            # Aggregated Variables (Average or Cumulative Aggregated):
+            for i, name in enumerate(AGGREGATED):
+                if AVERAGED[i]:
+                    RESULTS[name][idx_res] = aggregate[i] / aggregation_timesteps
                 else:
-                    _LAYER_DEPTH[idx_res, 0:GRID.get_number_layers()] = GRID.get_depth()
-                    _LAYER_HEIGHT[idx_res, 0:GRID.get_number_layers()] = GRID.get_height()
-                    _LAYER_DENSITY[idx_res, 0:GRID.get_number_layers()] = GRID.get_density()
-                    _LAYER_TEMPERATURE[idx_res, 0:GRID.get_number_layers()] = np.asarray(GRID.get_temperature()) - zero_temperature
-                    _LAYER_WATER_CONTENT[idx_res, 0:GRID.get_number_layers()] = GRID.get_liquid_water_content()
-                    _LAYER_COLD_CONTENT[idx_res, 0:GRID.get_number_layers()] = GRID.get_cold_content()
-                    _LAYER_POROSITY[idx_res, 0:GRID.get_number_layers()] = GRID.get_porosity()
-                    _LAYER_ICE_FRACTION[idx_res, 0:GRID.get_number_layers()] = GRID.get_ice_fraction()
-                    _LAYER_IRREDUCIBLE_WATER[idx_res, 0:GRID.get_number_layers()] = GRID.get_irreducible_water_content()
-                    _LAYER_REFREEZE[idx_res, 0:GRID.get_number_layers()] = GRID.get_refreeze()
-                    _LAYER_HYDRO_YEAR[idx_res, 0:GRID.get_number_layers()] = GRID.get_hydro_year()
-                    _LAYER_GRAIN_SIZE[idx_res, 0:GRID.get_number_layers()] = GRID.get_grain_size()
-            else:
-                _LAYER_DEPTH = None
-                _LAYER_HEIGHT = None
-                _LAYER_DENSITY = None
-                _LAYER_TEMPERATURE = None
-                _LAYER_WATER_CONTENT = None
-                _LAYER_COLD_CONTENT = None
-                _LAYER_POROSITY = None
-                _LAYER_ICE_FRACTION = None
-                _LAYER_IRREDUCIBLE_WATER = None
-                _LAYER_REFREEZE = None
-                _LAYER_HYDRO_YEAR = None
-                _LAYER_GRAIN_SIZE = None
+                    RESULTS[name][idx_res] = aggregate[i]
+
+            # Other Information (Instantaneous) (8):
+            if 'SNOW_HEIGHT' in RESULTS:
+                RESULTS['SNOW_HEIGHT'][idx_res] = GRID.get_total_snowheight()
+            if 'SNOW_WATER_EQUIVALENT' in RESULTS:
+                RESULTS['SNOW_WATER_EQUIVALENT'][idx_res] = np.sum(np.asarray(GRID.get_snow_heights()) * (np.asarray(GRID.get_snow_densities()) / water_density))
+            if 'TOTAL_HEIGHT' in RESULTS:
+                RESULTS['TOTAL_HEIGHT'][idx_res] = GRID.get_total_height()
+            if 'SURFACE_ELEVATION' in RESULTS:
+                RESULTS['SURFACE_ELEVATION'][idx_res] = GRID.get_base_elevation() + GRID.get_total_height()
+            if 'SURFACE_TEMPERATURE' in RESULTS:
+                RESULTS['SURFACE_TEMPERATURE'][idx_res] = surface_temperature - zero_temperature
+            if 'SURFACE_HUMIDITY' in RESULTS:
+                RESULTS['SURFACE_HUMIDITY'][idx_res] = q0
+            if 'SURFACE_ALBEDO' in RESULTS:
+                RESULTS['SURFACE_ALBEDO'][idx_res] = albedo
+            if 'N_LAYERS' in RESULTS:
+                RESULTS['N_LAYERS'][idx_res] = GRID.get_number_layers()
+
+            # Firn Temperature Diagnostics (Instantaneous) (3):
+            if firn_diagnostics:
+
+                # Calculate Firn temperatures:
+                Index_Depth = np.searchsorted(GRID.get_depth(), firn_temperature_depth, side="left")
+                Firn_Temperature = GRID.get_temperature()[min(Index_Depth, GRID.get_number_layers() - 1)] - zero_temperature
+                if 'FIRN_TEMPERATURE' in RESULTS:
+                    RESULTS['FIRN_TEMPERATURE'][idx_res] = Firn_Temperature
+                if 'FIRN_TEMPERATURE_CHANGE' in RESULTS:
+                    RESULTS['FIRN_TEMPERATURE_CHANGE'][idx_res] = Firn_Temperature - Initial_Firn_Temperature
+
+                # Determine Firn Facie:
+                if 'FIRN_FACIE' in RESULTS:
+                    if Firn_Temperature > 0.1:
+                        RESULTS['FIRN_FACIE'][idx_res] = 4
+                    elif cumulative_melt == 0:
+                        RESULTS['FIRN_FACIE'][idx_res] = 1
+                    elif not np.any(GRID.get_firn_refreeze()):
+                        RESULTS['FIRN_FACIE'][idx_res] = 2
+                    else:
+                        RESULTS['FIRN_FACIE'][idx_res] = 3
 
             # Increase result index:
             idx_res += 1
 
-            # Reset Aggregation Arrays:
-            if idx_res < nt:
-
-                # Aggregated Meteorological Data (6):
-                AIR_TEMPERATURE_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-                AIR_PRESSURE_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-                RELATIVE_HUMIDITY_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-                SPECIFIC_HUMIDITY_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-                WIND_SPEED_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-                FRACTIONAL_CLOUD_COVER_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)                
-
-                # Aggregated Energy Fluxes (7):
-                SHORTWAVE_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-                LONGWAVE_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-                SENSIBLE_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-                LATENT_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-                SUBSURFACE_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-                RAIN_FLUX_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-                MELT_ENERGY_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-
-                # Aggregated Surface Mass Fluxes (8):
-                SNOWFALL_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-                RAIN_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-                EVAPORATION_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-                SUBLIMATION_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-                CONDENSATION_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-                DEPOSITION_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-                SURFACE_MELT_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-                SURFACE_MASS_BALANCE_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-
-                # Aggregated Subsurface Mass Fluxes (4):
-                REFREEZING_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-                SUSBSURFACE_MELT_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-                RUNOFF_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-                MASS_BALANCE_AGG = np.full(aggregation_timesteps[idx_res], np.nan, dtype=precision)
-
-                # Reset aggregation index
-                idx_agg = 0        
+            # Reset running aggregates:
+            aggregate[:] = 0.0
+            aggregation_timesteps = 0
+
+        # Subsurface Variables (Instantaneous) (12) (on their own output schedule, see profile_timestamps):
+        if full_field and profile_mask[t]:
+            PROFILE = {}
+            if 'LAYER_DEPTH' in RESULTS:
+                PROFILE['LAYER_DEPTH'] = GRID.get_depth()
+            if 'LAYER_HEIGHT' in RESULTS:
+                PROFILE['LAYER_HEIGHT'] = GRID.get_height()
+            if 'LAYER_DENSITY' in RESULTS:
+                PROFILE['LAYER_DENSITY'] = GRID.get_density()
+            if 'LAYER_TEMPERATURE' in RESULTS:
+                PROFILE['LAYER_TEMPERATURE'] = np.asarray(GRID.get_temperature()) - zero_temperature
+            if 'LAYER_WATER_CONTENT' in RESULTS:
+                PROFILE['LAYER_WATER_CONTENT'] = GRID.get_liquid_water_content()
+            if 'LAYER_COLD_CONTENT' in RESULTS:
+                PROFILE['LAYER_COLD_CONTENT'] = GRID.get_cold_content()
+            if 'LAYER_POROSITY' in RESULTS:
+                PROFILE['LAYER_POROSITY'] = GRID.get_porosity()
+            if 'LAYER_ICE_FRACTION' in RESULTS:
+                PROFILE['LAYER_ICE_FRACTION'] = GRID.get_ice_fraction()
+            if 'LAYER_IRREDUCIBLE_WATER' in RESULTS:
+                PROFILE['LAYER_IRREDUCIBLE_WATER'] = GRID.get_irreducible_water_content()
+            if 'LAYER_REFREEZE' in RESULTS:
+                PROFILE['LAYER_REFREEZE'] = GRID.get_refreeze()
+            if 'LAYER_HYDRO_YEAR' in RESULTS:
+                PROFILE['LAYER_HYDRO_YEAR'] = GRID.get_hydro_year()
+            if 'LAYER_GRAIN_SIZE' in RESULTS:
+                PROFILE['LAYER_GRAIN_SIZE'] = GRID.get_grain_size()
+
+            if profile_depth_grid is None:
+
+                # Profiles by layer index (truncated to max_layers):
+                n_layers = min(GRID.get_number_layers(), max_layers)
+                BLOCKS['layer_count'][idx_prof] = n_layers
+                for name, values in PROFILE.items():
+                    RESULTS[name][idx_prof, 0:n_layers] = np.asarray(values)[0:n_layers]
+            else:
+
+                # Profiles remapped onto the fixed depth grid (layer count: depth intervals above the bottom of the profile):
+                height = np.asarray(GRID.get_height())
+                BLOCKS['layer_count'][idx_prof] = np.count_nonzero(depth_edges[:-1] < np.sum(height))
+                for name, values in PROFILE.items():
+                    RESULTS[name][idx_prof] = remap_profile(height, values, depth_edges, OUTPUT_VARIABLES[name]['remap'])
+
+            # Increase profile index:
+            idx_prof += 1
 
     # ============================================================================================================================= #
 
-    return (indY,indX, \
-            _AIR_TEMPERATURE,_AIR_PRESSURE,_RELATIVE_HUMIDITY,_SPECIFIC_HUMIDITY,_WIND_SPEED,_FRACTIONAL_CLOUD_COVER, \
-            _SHORTWAVE,_LONGWAVE,_SENSIBLE,_LATENT,_SUBSURFACE,_RAIN_HEAT_FLUX,_MELT_ENERGY, \
-            _RAIN,_SNOWFALL,_EVAPORATION,_SUBLIMATION,_CONDENSATION,_DEPOSITION,_SURFACE_MELT,_SURFACE_MASS_BALANCE, \
-            _REFREEZE,_SUBSURFACE_MELT,_RUNOFF,_MASS_BALANCE, \
-            _SNOW_HEIGHT,_SNOW_WATER_EQUIVALENT,_TOTAL_HEIGHT,_SURFACE_ELEVATION,_SURFACE_TEMPERATURE,_SURFACE_HUMIDITY,_SURFACE_ALBEDO,_N_LAYERS,_FIRN_TEMPERATURE,_FIRN_TEMPERATURE_CHANGE,_FIRN_FACIE, \
-            _LAYER_DEPTH,_LAYER_HEIGHT,_LAYER_DENSITY,_LAYER_TEMPERATURE,_LAYER_WATER_CONTENT,_LAYER_COLD_CONTENT,_LAYER_POROSITY,_LAYER_ICE_FRACTION, \
-            _LAYER_IRREDUCIBLE_WATER,_LAYER_REFREEZE,_LAYER_HYDRO_YEAR,_LAYER_GRAIN_SIZE)
+    # Quiescent fast path statistics of the node (reported by fricosipy_node, not for the spin-up cycles) & simulated timesteps:
+    BLOCKS['quiescent'] = (n_quiescent, stop - start, n_percolation_skipped, n_aggregated)
+    BLOCKS['timesteps'] = stop - start
+
+    FORCING_STREAM.close()
+    if return_state:
+        return (indY,indX,BLOCKS,HEADER,get_state())
+    return (indY,indX,BLOCKS,HEADER)
 
 # ====================================================================================================================
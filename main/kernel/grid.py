@@ -43,6 +43,8 @@ spec['fresh_snow_age'] = float64
 spec['fresh_snow_albedo'] = float64
 spec['fresh_snow_SWE'] = float64
 spec['base_elevation'] = float64
+spec['total_liquid_water'] = float64
+spec['total_mass'] = float64
 spec['grid'] = types.ListType(node_type)
 
 # ================================================================================================== #
@@ -79,11 +81,21 @@ class Grid:
                 Fresh snow SWE       ::    Snow Water Equivalent (SWE) of fresh snow [m] 
                 Base elevation       ::    Elevation of the bottom of the simulation [m a.s.l.] (used to track the absolute height of the glacier)
 
+        Column Totals:
+
+                Total liquid water   ::    Liquid water stored in the subsurface layers [m w.e.]
+                Total SWE            ::    Snow Water Equivalent (SWE) of the snow layers [m w.e.]
+                Total mass           ::    Mass of the subsurface column [kg m-2]
+
         Note 1: The fresh and old snow properties here are independant from the subsurface layers; they track the time since specific snowfall events for the albedo calculation   
 
         Note 2: Firn here is defined as layers that have a hydrological layer at least one year older that the
         current simulation year. The firn layer refreezing variable is used to determine the firn facie.
 
+        Note 3: The column totals are maintained incrementally by every setter that alters a layer's height, 
+        ice fraction or liquid water content (as well as when layers are added or removed), so that they can 
+        be read at no cost. 
+
         """
 
     # =============== #
@@ -132,6 +144,9 @@ class Grid:
 
         self.init_grid()
 
+        # Initialise the column totals
+        self.reset_column_totals()
+
     # ================================================================================================= #
 
     # =============== #
@@ -186,6 +201,9 @@ class Grid:
         # Increase node counter
         self.number_nodes += 1
 
+        # Add the new layer to the column totals
+        self.update_column_totals(0, 1.0)
+
         # Set the fresh snow properties for albedo calculation
         SWE = height * (density / water_density)
         self.set_fresh_snow_props(SWE)
@@ -204,9 +222,11 @@ class Grid:
             pass
         else:
             if idx is None:
+                self.update_column_totals(0, -1.0)
                 self.grid.pop(0)
             else:
                 for index in sorted(idx, reverse=True):
+                    self.update_column_totals(index, -1.0)
                     del self.grid[index]
 
             # Decrease node counter
@@ -329,6 +349,45 @@ class Grid:
 
     # =================================================================================================
 
+    # ============= #
+    # Column Totals
+    # ============= #
+
+    def update_column_totals(self, idx, sign):
+        """ Adds (sign = 1.0) or subtracts (sign = -1.0) the contribution of node idx to the column totals """
+        height = self.grid[idx].get_layer_height()
+        density = self.grid[idx].get_layer_density()
+        self.total_liquid_water += sign * self.grid[idx].get_layer_liquid_water_content() * height
+        self.total_mass += sign * density * height
+
+    def reset_column_totals(self):
+        """ Recalculates the column totals from the individual layers """
+        self.total_liquid_water = 0.0
+        self.total_mass = 0.0
+        for idx in range(self.number_nodes):
+            self.update_column_totals(idx, 1.0)
+
+    def get_column_totals_error(self):
+        """ Returns the largest discrepancy between the incremental column totals and a full recalculation 
+            (liquid water [m w.e.] and column mass [kg m-2] converted to [m w.e.]), the totals are left unchanged """
+        liquid_water = 0.0
+        mass = 0.0
+        for idx in range(self.number_nodes):
+            height = self.grid[idx].get_layer_height()
+            liquid_water += self.grid[idx].get_layer_liquid_water_content() * height
+            mass += self.grid[idx].get_layer_density() * height
+        return max(abs(liquid_water - self.total_liquid_water), abs(mass - self.total_mass) / water_density)
+
+    def get_total_liquid_water(self):
+        """ Returns the liquid water stored in the subsurface column [m w.e.] """
+        return self.total_liquid_water
+
+    def get_total_mass(self):
+        """ Returns the mass of the subsurface column [kg m-2] """
+        return self.total_mass
+
+    # =================================================================================================
+
     # ================= #
     # Check GRID Layers
     # ================= #
@@ -469,34 +528,46 @@ class Grid:
 
     def set_node_height(self, idx, height):
         """ Sets the layer height of node idx [m] """
+        self.update_column_totals(idx, -1.0)
         self.grid[idx].set_layer_height(height)
+        self.update_column_totals(idx, 1.0)
 
     def set_height(self, height):
         """ Sets the layer height profile [m] (z) """
         for idx in range(self.number_nodes):
+            self.update_column_totals(idx, -1.0)
             self.grid[idx].set_layer_height(height[idx])
+            self.update_column_totals(idx, 1.0)
 
     # ---------------------------------------------- #
 
     def set_node_liquid_water_content(self, idx, liquid_water_content):
         """ Sets the layer liquid water content of node idx [-] """
+        self.update_column_totals(idx, -1.0)
         self.grid[idx].set_layer_liquid_water_content(liquid_water_content)
+        self.update_column_totals(idx, 1.0)
 
     def set_liquid_water_content(self, liquid_water_content):
         """ Sets the layer liquid water content profile [-] (z) """
         for idx in range(self.number_nodes):
+            self.update_column_totals(idx, -1.0)
             self.grid[idx].set_layer_liquid_water_content(liquid_water_content[idx])
+            self.update_column_totals(idx, 1.0)
 
     # ---------------------------------------------- #
 
     def set_node_ice_fraction(self, idx, ice_fraction):
         """ Sets the layer ice fraction of node idx [-] """
+        self.update_column_totals(idx, -1.0)
         self.grid[idx].set_layer_ice_fraction(ice_fraction)
+        self.update_column_totals(idx, 1.0)
 
     def set_ice_fraction(self, ice_fraction):
         """ Sets the layer ice fraction profile [-] (z) """
         for idx in range(self.number_nodes):
+            self.update_column_totals(idx, -1.0)
             self.grid[idx].set_layer_ice_fraction(ice_fraction[idx])
+            self.update_column_totals(idx, 1.0)
 
     # ---------------------------------------------- #
 
@@ -0,0 +1,149 @@
+"""
+    ==================================================================
+
+                        DERIVED INDICATORS FILE
+
+        This file contains the online indicators (e.g. melt days,
+        melt onset, annual extremes), which are updated every
+        timestep of the time loop and reported once per calendar
+        year in the 'indicators' group of the output dataset.
+
+        New indicators are added by subclassing Indicator and
+        registering them in the INDICATORS registry.
+
+    ==================================================================
+"""
+
+import numpy as np
+from collections import OrderedDict
+
+# ============================================================================================================================= #
+
+# Timestep state available to the indicators (see fricosipy_core.py):
+#   'dt'                :: timestep [s]
+#   'doy'               :: day of year [-]
+#   'day'               :: day index (days since 1970-01-01) [-]
+#   'surface_melt'      :: surface melt [m w.e.]
+#   'surface_water'     :: surface water input (melt, rain & condensation) [m w.e.]
+#   'refreeze'          :: refreezing [m w.e.]
+#   'snow_height'       :: snow height [m]
+#   'firn_temperature'  :: firn temperature at the firn temperature depth [°C] (only evaluated if required)
+
+class Indicator:
+    """ Online indicator: updated every timestep and reported once per year """
+
+    units = '-'
+    long_name = ''
+    requires = ()
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """ Resets the indicator at the start of a year """
+        self.value = np.nan
+
+    def update(self, state):
+        """ Updates the indicator with the state of a timestep """
+        pass
+
+    def result(self):
+        """ Returns the annual value of the indicator """
+        return self.value
+
+class MeltHours(Indicator):
+    units = 'h'
+    long_name = 'Annual Number of Melt Hours'
+
+    def reset(self):
+        self.value = 0.0
+
+    def update(self, state):
+        if state['surface_melt'] > 0.0:
+            self.value += state['dt'] / 3600
+
+class MeltDays(Indicator):
+    units = 'days'
+    long_name = 'Annual Number of Melt Days'
+
+    def reset(self):
+        self.value = 0
+        self.last_day = None
+
+    def update(self, state):
+        if (state['surface_melt'] > 0.0) and (state['day'] != self.last_day):
+            self.value += 1
+            self.last_day = state['day']
+
+class FirstMeltDay(Indicator):
+    units = 'doy'
+    long_name = 'Day of Year of the First Melt'
+
+    def update(self, state):
+        if (state['surface_melt'] > 0.0) and np.isnan(self.value):
+            self.value = state['doy']
+
+class LastMeltDay(Indicator):
+    units = 'doy'
+    long_name = 'Day of Year of the Last Melt'
+
+    def update(self, state):
+        if state['surface_melt'] > 0.0:
+            self.value = state['doy']
+
+class MaxSnowHeight(Indicator):
+    units = 'm'
+    long_name = 'Annual Maximum Snow Height'
+
+    def update(self, state):
+        self.value = np.fmax(self.value, state['snow_height'])
+
+class RefreezeFraction(Indicator):
+    units = '-'
+    long_name = 'Annual Refreezing Fraction of the Surface Water Input'
+
+    def reset(self):
+        self.refreeze = 0.0
+        self.surface_water = 0.0
+
+    def update(self, state):
+        self.refreeze += state['refreeze']
+        self.surface_water += state['surface_water']
+
+    def result(self):
+        return self.refreeze / self.surface_water if self.surface_water > 0.0 else np.nan
+
+class MaxFirnTemperature(Indicator):
+    units = '°C'
+    long_name = 'Annual Maximum Firn Temperature at x m Depth'
+    requires = ('firn_temperature',)
+
+    def update(self, state):
+        self.value = np.fmax(self.value, state['firn_temperature'])
+
+class MinFirnTemperature(Indicator):
+    units = '°C'
+    long_name = 'Annual Minimum Firn Temperature at x m Depth'
+    requires = ('firn_temperature',)
+
+    def update(self, state):
+        self.value = np.fmin(self.value, state['firn_temperature'])
+
+# ============================================================================================================================= #
+
+# ============================ #
+# Derived Indicators Registry
+# ============================ #
+
+INDICATORS = OrderedDict([
+    ('MELT_HOURS',              MeltHours),
+    ('MELT_DAYS',               MeltDays),
+    ('FIRST_MELT_DAY',          FirstMeltDay),
+    ('LAST_MELT_DAY',           LastMeltDay),
+    ('MAX_SNOW_HEIGHT',         MaxSnowHeight),
+    ('REFREEZE_FRACTION',       RefreezeFraction),
+    ('MAX_FIRN_TEMPERATURE',    MaxFirnTemperature),
+    ('MIN_FIRN_TEMPERATURE',    MinFirnTemperature),
+])
+
+# ============================================================================================================================= #
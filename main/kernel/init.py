@@ -6,7 +6,8 @@
 
         This file initialises the model's subsurface grid (snowpack) 
         according to the user-specified initial conditions in the 
-        parameters file.
+        parameters file (or with the steady-state firn density profile
+        of Herron & Langway (1980), see initial_profile_method).
 
     ==================================================================
 """
@@ -21,8 +22,9 @@ from main.kernel.grid import *
 # Initialise Snowpack
 # =================== #
 
-def init_snowpack(STATIC):
-    """ This function initialises the snowpack / glacier for the first simulation time step """
+def init_snowpack(STATIC, CLIMATE = None):
+    """ This function initialises the snowpack / glacier for the first simulation time step
+        (CLIMATE: mean air temperature [K] & annual accumulation [m w.e. a-1] of the node for the steady-state firn profile) """
 	
     # Initialise layer variable arrays
     layer_heights = []
@@ -42,6 +44,24 @@ def init_snowpack(STATIC):
         snowheight = initial_snowheight
         glacier_height = initial_glacier_height
 
+    initial_profile_allowed = ['linear','HerronLangway80']
+    if initial_profile_method not in initial_profile_allowed:
+        raise ValueError("Initial profile method = \"{:s}\" is not allowed, must be one of {:s}".format(initial_profile_method, ", ".join(initial_profile_allowed)))
+
+    # Initial temperature profile boundary conditions:
+    upper_temperature = initial_upper_temperature + zero_temperature
+    lower_temperature = initial_lower_temperature + zero_temperature
+
+    # Steady-state firn profile: the firn extends to the snow-ice density threshold and is isothermal at the mean air temperature
+    # (nodes without accumulation are initialised with the linear profiles)
+    steady_state = (initial_profile_method == 'HerronLangway80') and (CLIMATE is not None) and (CLIMATE[1] > 0)
+    if steady_state:
+        firn_temperature = min(CLIMATE[0], zero_temperature)
+        total_height = snowheight + glacier_height
+        snowheight = min(herron_langway_depth(snow_ice_threshold, firn_temperature, CLIMATE[1]), total_height)
+        glacier_height = total_height - snowheight
+        upper_temperature = lower_temperature = firn_temperature
+
     # Base elevation:
     base_elevation = STATIC.ELEVATION.values - (snowheight + glacier_height)
 
@@ -93,12 +113,15 @@ def init_snowpack(STATIC):
         midpoint_depths = np.cumsum(layer_heights) - (layer_heights / 2.0)
         
         # Calculate temperature and density gradients
-        dT = ((initial_upper_temperature + zero_temperature) - (initial_lower_temperature + zero_temperature)) / (snowheight + glacier_height)
+        dT = (upper_temperature - lower_temperature) / (snowheight + glacier_height)
         drho = (initial_upper_snowpack_density - initial_lower_snowpack_density) / snowheight
 
         # Initialise snow layer variables
-        layer_densities = initial_upper_snowpack_density - (drho * midpoint_depths)
-        layer_T = (initial_upper_temperature + zero_temperature) - (dT * midpoint_depths)
+        if steady_state:
+            layer_densities = herron_langway_density(midpoint_depths, firn_temperature, CLIMATE[1])
+        else:
+            layer_densities = initial_upper_snowpack_density - (drho * midpoint_depths)
+        layer_T = upper_temperature - (dT * midpoint_depths)
         layer_liquid_water = np.zeros(n_snow_layers)
         layer_refreeze = np.zeros(n_snow_layers)
         layer_firn_refreeze = np.zeros(n_snow_layers)
@@ -115,7 +138,7 @@ def init_snowpack(STATIC):
         midpoint_depths = (np.cumsum(glacier_layer_heights) - (glacier_layer_heights / 2.0)) + np.sum(layer_heights)
 
         # Initialise full glacier layer variables
-        layer_T = np.concatenate((layer_T, (initial_upper_temperature + zero_temperature) - (dT * midpoint_depths)))
+        layer_T = np.concatenate((layer_T, upper_temperature - (dT * midpoint_depths)))
         layer_heights = np.concatenate((layer_heights, np.ones(n_glacier_layers) * initial_glacier_layer_heights))
         layer_densities = np.concatenate((layer_densities, np.ones(n_glacier_layers) * ice_density))
         layer_liquid_water = np.concatenate((layer_liquid_water, np.zeros(n_glacier_layers)))
@@ -140,12 +163,12 @@ def init_snowpack(STATIC):
         midpoint_depths = np.cumsum(glacier_layer_heights) - (glacier_layer_heights / 2.0)
 
         # Calculate temperature gradient
-        dT = ((initial_upper_temperature + zero_temperature) - (initial_lower_temperature + zero_temperature)) / glacier_height
+        dT = (upper_temperature - lower_temperature) / glacier_height
 
         # Initialise glacier layer variables
         layer_heights = np.ones(n_glacier_layers) * initial_glacier_layer_heights
         layer_densities = np.ones(n_glacier_layers) * ice_density
-        layer_T = (initial_upper_temperature + zero_temperature) - (dT * midpoint_depths)
+        layer_T = upper_temperature - (dT * midpoint_depths)
         layer_liquid_water = np.zeros(n_glacier_layers)
         layer_refreeze = np.zeros(n_glacier_layers)
         layer_firn_refreeze = np.zeros(n_glacier_layers)
@@ -176,4 +199,41 @@ def init_snowpack(STATIC):
     
     return GRID
 
+# ==================================================================================================================== #
+
+# ================================================ #
+# Steady-state Firn Profile (Herron & Langway, 1980)
+# ================================================ #
+
+def herron_langway_critical_depth(temperature):
+    """ Returns the depth [m] of the critical density (550 kg m-3) separating the two densification stages of Herron & Langway (1980) """
+
+    k0 = 11.0 * np.exp(-10160.0 / (R * temperature))
+    return max((np.log(0.55 / (ice_density / 1000.0 - 0.55)) - np.log(initial_upper_snowpack_density / (ice_density - initial_upper_snowpack_density))) / ((ice_density / 1000.0) * k0), 0.0)
+
+def herron_langway_density(depth, temperature, accumulation):
+    """ Returns the steady-state firn density [kg m-3] at depth [m] (Herron & Langway, 1980) for the mean temperature [K] & annual accumulation [m w.e. a-1]
+        (the surface density is initial_upper_snowpack_density) """
+
+    k0 = 11.0 * np.exp(-10160.0 / (R * temperature))
+    k1 = 575.0 * np.exp(-21400.0 / (R * temperature))
+    critical_depth = herron_langway_critical_depth(temperature)
+
+    # Stage 1 (above the critical density) & stage 2 (below the critical density):
+    Z0 = np.exp((ice_density / 1000.0) * k0 * depth + np.log(initial_upper_snowpack_density / (ice_density - initial_upper_snowpack_density)))
+    Z1 = np.exp((ice_density / 1000.0) * k1 * (depth - critical_depth) / np.sqrt(accumulation) + np.log(0.55 / (ice_density / 1000.0 - 0.55)))
+    Z = np.where(depth < critical_depth, Z0, Z1)
+
+    return ice_density * Z / (1.0 + Z)
+
+def herron_langway_depth(density, temperature, accumulation):
+    """ Returns the steady-state depth [m] of a firn density [kg m-3] (Herron & Langway, 1980) for the mean temperature [K] & annual accumulation [m w.e. a-1] """
+
+    k0 = 11.0 * np.exp(-10160.0 / (R * temperature))
+    k1 = 575.0 * np.exp(-21400.0 / (R * temperature))
+
+    if density <= 550.0:
+        return max((np.log(density / (ice_density - density)) - np.log(initial_upper_snowpack_density / (ice_density - initial_upper_snowpack_density))) / ((ice_density / 1000.0) * k0), 0.0)
+    return herron_langway_critical_depth(temperature) + np.sqrt(accumulation) * (np.log(density / (ice_density - density)) - np.log(0.55 / (ice_density / 1000.0 - 0.55))) / ((ice_density / 1000.0) * k1)
+
 # ==================================================================================================================== #
\ No newline at end of file
@@ -16,9 +16,18 @@ import numpy as np
 import pandas as pd
 import dask.array as da
 import rioxarray 
+import netCDF4
+from xarray.backends.locks import HDF5_LOCK
+from concurrent.futures import ThreadPoolExecutor
 from constants import *
 from parameters import *
 from config import * 
+from main.kernel.output_variables import OUTPUT_VARIABLES, get_output_variables, get_result_layout, is_profile, get_output_encoding, encode_values, \
+                                         get_aggregation_levels, get_aggregation_periods, get_indicators, \
+                                         get_profile_timestamps, get_profile_size
+from main.kernel.regridding import get_depth_grid
+from main.kernel.state import get_time_windows, load_restart_file, get_restart_state
+from main.kernel.forcing import is_gridded, is_multi_station, get_station_weights, resample_forcing
 import sys
 import warnings
 warnings.filterwarnings("ignore", message = "angle from rectified to skew grid parameter lost")
@@ -40,6 +49,10 @@ class IOClass:
         self.other = other
         self.subsurface_variables = subsurface_variables
 
+        # Requested output variables and their layout in the packed result blocks (see output_variables.py):
+        self.output_variables = get_output_variables()
+        self.result_layout = get_result_layout()
+
         # Initialise input datasets:
         self.METEO = METEO
         self.STATIC = STATIC
@@ -107,6 +120,12 @@ class IOClass:
             if not (time_start < initial_timestamp < time_end):
                 raise ValueError('Error: Initial timestamp is not contained within the temporal range of the input meteorological file.')
 
+        if spin_up_cycles is not None:
+            if (spin_up_period is None) or not (time_start <= spin_up_period[0] < spin_up_period[1] <= time_end):
+                raise ValueError('Error: Spin-up period is not contained within the simulation temporal range.')
+            if spin_up_cycles < 1:
+                raise ValueError('Error: The number of spin-up cycles must be at least 1.')
+
         if reduced_output == True:
             if  (np.asarray(time_start, dtype = np.datetime64) > pd.read_csv(os.path.join(data_path,'output/output_timestamps',output_timestamps), header = None).to_numpy(dtype = np.datetime64)).any() or \
                 (pd.read_csv(os.path.join(data_path,'output/output_timestamps',output_timestamps), header = None).to_numpy(dtype = np.datetime64) > np.asarray(time_end, dtype = np.datetime64)).any():
@@ -120,6 +139,27 @@ class IOClass:
         # Select Temporal Range
         self.METEO = self.METEO.sel(time=slice(time_start, time_end))
 
+        # Meteorological data with a finer temporal resolution than the model timestep (dt) is aggregated to the model timestep:
+        n_timesteps = self.METEO.sizes['time']
+        self.METEO = resample_forcing(self.METEO)
+        if self.METEO.sizes['time'] != n_timesteps:
+            print('\t Meteorological data aggregated to the model timestep (%s s). Simulation Timesteps: %s ' % (dt, self.METEO.sizes['time']))
+
+        # Output timestamps must be simulation timestamps (on the model timestep, dt):
+        if reduced_output == True:
+            if not np.isin(pd.read_csv(os.path.join(data_path,'output/output_timestamps',output_timestamps), header = None).to_numpy(dtype = np.datetime64).flatten(), self.METEO.time.values).all():
+                raise ValueError('Error: Output timestamps must be simulation timestamps on the model timestep (dt = %s s).' % dt)
+
+        # Gridded meteorological data (time,y,x): select the spatial extent from config.py (only the columns of each node are read by the workers)
+        if is_gridded(self.METEO):
+            if spatial_subset == True:
+                self.METEO = self.METEO.sel(y = slice(y_min,y_max), x = slice(x_min,x_max))
+            print('\t Gridded Meteorological Data: %s x %s grid nodes (no station downscaling)' % (self.METEO.sizes['y'], self.METEO.sizes['x']))
+
+        # Multi-station meteorological data (time,station): the stations of each node are combined along the last axis
+        if is_multi_station(self.METEO):
+            self.METEO = self.METEO.transpose('time', 'station', ...)
+
         return self.METEO
     
     # =================================================================================================
@@ -172,9 +212,9 @@ class IOClass:
             # Output variables are reported on user-defined output timestamps:
             self.RESULT.coords['time'] = pd.read_csv(os.path.join(data_path,'output/output_timestamps',output_timestamps), header = None).to_numpy(dtype = np.datetime64).flatten()
 
-            # Final simulation timestamp must be included in the output timestamps to prevent an error:
-            if pd.to_datetime(time_end).to_numpy()  not in self.RESULT.coords['time']:
-                self.RESULT.coords['time'] = np.append(self.RESULT.coords['time'],np.asarray(time_end, dtype = np.datetime64))
+            # Final simulation timestamp (after the aggregation to the model timestep) must be included in the output timestamps to prevent an error:
+            if self.METEO.time.values[-1] not in self.RESULT.coords['time']:
+                self.RESULT.coords['time'] = np.append(self.RESULT.coords['time'], self.METEO.time.values[-1])
 
         else:
             if model_spin_up == True:
@@ -186,12 +226,68 @@ class IOClass:
                 # Output variables are reported on all simulation timestamps
                 self.RESULT.coords['time'] = self.METEO.coords['time'] 
 
-        # Subsurface layer coordinate
-        if full_field == True:
+        # Subsurface layer coordinate (ragged profiles are stored along the 'layer_obs' dimension instead)
+        if (full_field == True) and (profile_depth_grid is not None):
+
+            # Profiles remapped onto the fixed depth grid: centre of each depth interval
+            edges = get_depth_grid()
+            self.RESULT.coords['depth'] = 0.5 * (edges[1:] + edges[:-1])
+            self.RESULT['depth'].attrs = {'units': 'm', 'long_name': 'Depth below the Surface (Centre of the Depth Interval)'}
+
+        elif (full_field == True) and (ragged_profiles == False):
             self.RESULT.coords['layer'] = np.arange(max_layers)
 
-        # Output File Temporal Dimension
+        # Gridded meteorological data must be on the spatial grid of the static file:
+        if is_gridded(self.METEO):
+            if not (np.array_equal(self.METEO.y.values, self.STATIC.y.values) and np.array_equal(self.METEO.x.values, self.STATIC.x.values)):
+                raise ValueError('Error: Gridded meteorological data must be on the spatial grid (y,x) of the input static file.')
+
+        # Simulated (glacier) nodes in row-major order:
+        self.nodes = [(int(y), int(x)) for y, x in np.argwhere(self.STATIC.MASK.values == 1)]
+        self.node_index = {node: n for n, node in enumerate(self.nodes)}
+
+        # Multi-station meteorological data: interpolation weights of the stations at each node (sparse node x station matrix)
+        if is_multi_station(self.METEO):
+            self.station_weights = get_station_weights(self.STATIC, self.METEO, self.nodes)
+            print('\t Multi-station Meteorological Data: %s stations (%s interpolation stations per node)' % (self.METEO.sizes['station'], min(station_neighbours, self.METEO.sizes['station'])))
+        else:
+            self.station_weights = None
+
+        # Node-indexed output layout: the simulated nodes are stored along a 1-D 'node' dimension
+        if output_layout == 'node':
+            node_y = np.array([y for y, x in self.nodes], dtype = np.int64)
+            node_x = np.array([x for y, x in self.nodes], dtype = np.int64)
+            self.RESULT.coords['node'] = np.arange(len(self.nodes))
+            self.RESULT.coords['node_y'] = ('node', self.STATIC.y.values[node_y])
+            self.RESULT.coords['node_x'] = ('node', self.STATIC.x.values[node_x])
+            self.RESULT.coords['node_easting'] = ('node', self.STATIC.EASTING.values[node_y, node_x])
+            self.RESULT.coords['node_northing'] = ('node', self.STATIC.NORTHING.values[node_y, node_x])
+
+        # Simulation timestamps after the model spin-up:
+        if model_spin_up == True:
+            simulation_time = self.METEO.sel(time=slice(initial_timestamp, time_end)).time.values
+        else:
+            simulation_time = self.METEO.time.values
+
+        # Subsurface variables on their own output schedule ('profile_time' co-ordinate):
+        if (full_field == True) and (profile_timestamps is not None):
+            self.RESULT.coords['profile_time'] = get_profile_timestamps(simulation_time)
+
+        # Successive time windows of the node simulations (timestep indexes, see time_window):
+        self.windows = get_time_windows(self.METEO.time.values)
+
+        # Restart file: the nodes are initialised from the final state of a previous simulation
+        self.RESTART = load_restart_file(self.METEO.time.values[0]) if restart_input is not None else None
+
+        # Output File Temporal Dimension (& of the subsurface variables)
         self.nt = self.RESULT.sizes['time']
+        self.n_profiles = self.RESULT.sizes['profile_time'] if 'profile_time' in self.RESULT.coords else self.nt
+
+        # Output groups (after the model spin-up): multi-resolution aggregates on the periods of each aggregation level
+        # and the derived indicators on each calendar year (dimension & co-ordinate of each group)
+        self.groups = {level: ('time', get_aggregation_periods(simulation_time, level)[1]) for level in get_aggregation_levels()}
+        if len(get_indicators()) > 0:
+            self.groups['indicators'] = ('year', np.unique(pd.DatetimeIndex(simulation_time).year))
 
         # ===================================== #
         # Assign Attributes to the NETCDF File:
@@ -200,6 +296,12 @@ class IOClass:
         # Global attributes from config.py
         self.RESULT.attrs['Compression_level'] = compression_level
         self.RESULT.attrs['Full_field'] = str(full_field)
+        self.RESULT.attrs['Ragged_profiles'] = str(ragged_profiles)
+        self.RESULT.attrs['Output_layout'] = output_layout
+        self.RESULT.attrs['Profile_timestamps'] = str(profile_timestamps)
+        self.RESULT.attrs['Profile_depth_grid'] = str(profile_depth_grid)
+        self.RESULT.attrs['Time_window'] = str(time_window)
+        self.RESULT.attrs['Restart_input'] = str(restart_input)
 
         # Global attributes from parameters.py
 
@@ -360,367 +462,330 @@ class IOClass:
     
     # =================================================================================================
   
-    # ==================== #
-    # Global Result Arrays
-    # ==================== #
-
-    def create_global_result_arrays(self):
-        """ Creates the global result arrays in the RESULT Xarray dataset """
-
-        # Meteorological Variables (6):
-        if ('AIR_TEMPERATURE' in self.meteorological_variables):
-            self.AIR_TEMPERATURE = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('AIR_PRESSURE' in self.meteorological_variables):
-            self.AIR_PRESSURE = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('RELATIVE_HUMIDITY' in self.meteorological_variables):
-            self.RELATIVE_HUMIDITY = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('SPECIFIC_HUMIDITY' in self.meteorological_variables):
-            self.SPECIFIC_HUMIDITY = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)        
-        if ('WIND_SPEED' in self.meteorological_variables):
-            self.WIND_SPEED = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('FRACTIONAL_CLOUD_COVER' in self.meteorological_variables):
-            self.FRACTIONAL_CLOUD_COVER = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-
-        # Surface Energy Fluxes (7):
-        if ('SHORTWAVE' in self.surface_energy_fluxes):
-            self.SHORTWAVE = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('LONGWAVE' in self.surface_energy_fluxes):
-            self.LONGWAVE = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('SENSIBLE' in self.surface_energy_fluxes):
-            self.SENSIBLE = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('LATENT' in self.surface_energy_fluxes):
-            self.LATENT = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('SUBSURFACE' in self.surface_energy_fluxes):
-            self.SUBSURFACE = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('RAIN_HEAT_FLUX' in self.surface_energy_fluxes):
-            self.RAIN_HEAT_FLUX = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('MELT_ENERGY' in self.surface_energy_fluxes):
-            self.MELT_ENERGY = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-
-        # Surface Mass Fluxes (8):
-        if ('RAIN' in self.surface_mass_fluxes):
-            self.RAIN = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('SNOWFALL' in self.surface_mass_fluxes):
-            self.SNOWFALL = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('EVAPORATION' in self.surface_mass_fluxes):
-            self.EVAPORATION = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('SUBLIMATION' in self.surface_mass_fluxes):
-            self.SUBLIMATION = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('CONDENSATION' in self.surface_mass_fluxes):
-            self.CONDENSATION = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('DEPOSITION' in self.surface_mass_fluxes):
-            self.DEPOSITION = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('SURFACE_MELT' in self.surface_mass_fluxes):
-            self.SURFACE_MELT = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('SURFACE_MASS_BALANCE' in self.surface_mass_fluxes):
-            self.SURFACE_MASS_BALANCE = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-
-        # Subsurface Mass Fluxes (4):
-        if ('REFREEZE' in self.subsurface_mass_fluxes):
-            self.REFREEZE = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('SUBSURFACE_MELT' in self.subsurface_mass_fluxes):
-            self.SUBSURFACE_MELT = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('RUNOFF' in self.subsurface_mass_fluxes):
-            self.RUNOFF = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('MASS_BALANCE' in self.subsurface_mass_fluxes):
-            self.MASS_BALANCE = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-
-        # Other Information (11):
-        if ('SNOW_HEIGHT' in self.other):
-            self.SNOW_HEIGHT = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('SNOW_WATER_EQUIVALENT' in self.other):
-            self.SNOW_WATER_EQUIVALENT = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('TOTAL_HEIGHT' in self.other):
-            self.TOTAL_HEIGHT = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('SURFACE_ELEVATION' in self.other):
-            self.SURFACE_ELEVATION = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('SURFACE_TEMPERATURE' in self.other):
-            self.SURFACE_TEMPERATURE = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('SURFACE_HUMIDITY' in self.other):
-            self.SURFACE_HUMIDITY = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('SURFACE_ALBEDO' in self.other):
-            self.SURFACE_ALBEDO = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('N_LAYERS' in self.other):
-            self.N_LAYERS = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('FIRN_TEMPERATURE' in self.other):
-            self.FIRN_TEMPERATURE = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('FIRN_TEMPERATURE_CHANGE' in self.other):
-            self.FIRN_TEMPERATURE_CHANGE = np.full((self.nt,self.ny,self.nx), np.nan, dtype = precision)
-        if ('FIRN_FACIE' in self.other):
-            self.FIRN_FACIE = np.zeros((self.nt,self.ny,self.nx), dtype = 'int32')
-
-        # Subsurface Variables (12):
-        if full_field:
-            if ('DEPTH' in self.subsurface_variables):
-                self.LAYER_DEPTH = np.full((self.nt,self.ny,self.nx,max_layers), np.nan, dtype = precision)
-            if ('HEIGHT' in self.subsurface_variables):
-                self.LAYER_HEIGHT = np.full((self.nt,self.ny,self.nx,max_layers), np.nan, dtype = precision)
-            if ('DENSITY' in self.subsurface_variables):
-                self.LAYER_DENSITY = np.full((self.nt,self.ny,self.nx,max_layers), np.nan, dtype = precision)
-            if ('TEMPERATURE' in self.subsurface_variables):
-                self.LAYER_TEMPERATURE = np.full((self.nt,self.ny,self.nx,max_layers), np.nan, dtype = precision)
-            if ('WATER_CONTENT' in self.subsurface_variables):
-                self.LAYER_WATER_CONTENT = np.full((self.nt,self.ny,self.nx,max_layers), np.nan, dtype = precision)
-            if ('COLD_CONTENT' in self.subsurface_variables):
-                self.LAYER_COLD_CONTENT = np.full((self.nt,self.ny,self.nx,max_layers), np.nan, dtype = precision)
-            if ('POROSITY' in self.subsurface_variables):
-                self.LAYER_POROSITY = np.full((self.nt,self.ny,self.nx,max_layers), np.nan, dtype = precision)
-            if ('ICE_FRACTION' in self.subsurface_variables):
-                self.LAYER_ICE_FRACTION = np.full((self.nt,self.ny,self.nx,max_layers), np.nan, dtype = precision)
-            if ('IRREDUCIBLE_WATER' in self.subsurface_variables):
-                self.LAYER_IRREDUCIBLE_WATER = np.full((self.nt,self.ny,self.nx,max_layers), np.nan, dtype = precision)
-            if ('REFREEZE' in self.subsurface_variables):
-                self.LAYER_REFREEZE = np.full((self.nt,self.ny,self.nx,max_layers), np.nan, dtype = precision)
-            if ('HYDRO_YEAR' in self.subsurface_variables):
-                self.LAYER_HYDRO_YEAR = np.full((self.nt,self.ny,self.nx,max_layers), np.nan, dtype = precision)
-            if ('GRAIN_SIZE' in self.subsurface_variables):
-                self.LAYER_GRAIN_SIZE = np.full((self.nt,self.ny,self.nx,max_layers), np.nan, dtype = precision)
-
-        # Convert to Dask arrays for efficient computation:
-        self.RESULT = self.RESULT.chunk(chunks='auto') 
+    # ========================== #
+    # Create Output NETCDF File:
+    # ========================== #
+
+    def create_output_file(self):
+        """ Writes the RESULT Xarray dataset (co-ordinates, attributes & static variables) to the output file (NetCDF or Zarr)
+            and creates the requested output variables, which are then filled region-by-region as node results arrive """
+
+        # Specify encoding dictionary and ensure maintenance of CRS co-ordinate reference:
+        RESULT = self.get_result()
+        self.append_offsets = dict()
+        encoding = dict()
+        for var in RESULT.data_vars:
+            encoding[var] = dict(zlib = True, complevel = compression_level) if output_format == 'netcdf' else dict()
+            if 'grid_mapping' in RESULT[var].attrs:
+                encoding[var]['grid_mapping'] = RESULT[var].attrs['grid_mapping']
+                del RESULT[var].attrs['grid_mapping']
+        if ('spatial_ref' in RESULT.coords) and (output_format == 'netcdf'):
+            encoding['spatial_ref'] = dict(zlib = False)
+
+        output_format_allowed = ['netcdf','zarr']
+
+        # NetCDF: the skeleton is written with Xarray and the output variables are created with netCDF4 (written by the client)
+        if output_format == 'netcdf':
+            if append_output == True:
+                raise ValueError('Error: Appending to an existing output file is only supported for the Zarr output format.')
+
+            RESULT.to_netcdf(os.path.join(data_path,'output',output_netcdf), encoding = encoding, mode = 'w')
+
+            # Multi-resolution aggregates & derived indicators: each output group has its own temporal co-ordinate
+            for group in self.groups:
+                self.get_group_result(RESULT, group).to_netcdf(os.path.join(data_path,'output',output_netcdf), mode = 'a', group = group)
+
+            # Re-open the output file and create the requested output variables (values are written already encoded):
+            self.OUTPUT = netCDF4.Dataset(os.path.join(data_path,'output',output_netcdf), mode = 'a')
+
+            # Ragged profiles: active layers of each profile (t,y,x) are stored contiguously along the unlimited 'layer_obs' dimension
+            if (ragged_profiles == True) and (len(self.result_layout['profiles']) > 0):
+                self.create_ragged_index_variables(RESULT)
+
+            for block, names in self.result_layout.items():
+                group = self.OUTPUT[block] if block in self.groups else self.OUTPUT
+                for name in names:
+                    var = OUTPUT_VARIABLES[name]
+                    var_encoding = get_output_encoding(name)
+                    dims = self.get_output_dims(name)
+                    variable = group.createVariable(var['netcdf_name'], var_encoding['dtype'], dims, zlib = True, complevel = compression_level,
+                                                    shuffle = var_encoding['shuffle'], chunksizes = self.get_output_chunks(name, block),
+                                                    fill_value = var_encoding['fill_value'])
+                    variable.units = var['units']
+                    variable.long_name = var['long_name']
+                    for attr in ['scale_factor','add_offset','least_significant_digit']:
+                        if attr in var_encoding:
+                            variable.setncattr(attr, var_encoding[attr])
+                    if ('spatial_ref' in RESULT.coords) and ('layer_obs' not in dims):
+                        variable.grid_mapping = 'spatial_ref'
+
+            # The output variables are written already encoded (quantised / packed, missing values as the fill value):
+            self.OUTPUT.set_auto_maskandscale(False)
+
+        # Zarr: the skeleton and the (empty) output variables are written with Xarray (written directly by the workers)
+        elif output_format == 'zarr':
+            if ragged_profiles == True:
+                raise ValueError('Error: Ragged profiles are only supported for the NetCDF output format.')
+
+            # Append mode: the timesteps of the simulation are appended to the existing output store
+            if append_output == True:
+                self.append_output_store(RESULT)
+                self.OUTPUT = None
+                return
+
+            # Zarr is an optional dependency (only required for the Zarr output format):
+            from zarr.codecs import BloscCodec
+
+            # Root group & the output groups (multi-resolution aggregates & derived indicators):
+            GROUPS = {block: (RESULT, encoding) for block in ['series','profiles']}
+            GROUPS.update({group: (self.get_group_result(RESULT, group), dict()) for group in self.groups})
+
+            for block, names in self.result_layout.items():
+                GROUP, group_encoding = GROUPS[block]
+                for name in names:
+                    var = OUTPUT_VARIABLES[name]
+                    var_encoding = get_output_encoding(name)
+                    chunksizes = self.get_output_chunks(name, block)
+                    dims = self.get_output_dims(name)
+                    shape = tuple(GROUP.sizes[dim] if dim in GROUP.sizes else get_profile_size() for dim in dims)
+                    GROUP[var['netcdf_name']] = (dims, da.empty(shape, chunks = chunksizes, dtype = var['dtype']))
+                    GROUP[var['netcdf_name']].attrs['units'] = var['units']
+                    GROUP[var['netcdf_name']].attrs['long_name'] = var['long_name']
+                    group_encoding[var['netcdf_name']] = dict(chunks = chunksizes, dtype = var_encoding['dtype'], _FillValue = var_encoding['fill_value'],
+                                                              fill_value = var_encoding['fill_value'],
+                                                              compressors = BloscCodec(cname = 'zstd', clevel = compression_level,
+                                                                                       shuffle = 'shuffle' if var_encoding['shuffle'] else 'noshuffle'))
+                    for attr in ['scale_factor','add_offset']:
+                        if attr in var_encoding:
+                            group_encoding[var['netcdf_name']][attr] = var_encoding[attr]
+                    if 'least_significant_digit' in var_encoding:
+                        GROUP[var['netcdf_name']].attrs['least_significant_digit'] = var_encoding['least_significant_digit']
+                    if 'spatial_ref' in GROUP.coords:
+                        group_encoding[var['netcdf_name']]['grid_mapping'] = 'spatial_ref'
+
+            # Only the metadata, co-ordinates and static variables are written (the output variables remain empty):
+            RESULT.to_zarr(os.path.join(data_path,'output',output_netcdf), encoding = encoding, mode = 'w', compute = False)
+            for group in self.groups:
+                GROUP, group_encoding = GROUPS[group]
+                GROUP.to_zarr(os.path.join(data_path,'output',output_netcdf), group = group, encoding = group_encoding, mode = 'w', compute = False)
+            self.OUTPUT = None
+
+        else:
+            raise ValueError("Output format = \"{:s}\" is not allowed, must be one of {:s}".format(output_format, ", ".join(output_format_allowed)))
+
+    def append_output_store(self, RESULT):
+        """ Appends the timesteps of the simulation to the existing output Zarr store (e.g. a simulation continued from a restart file):
+            the temporal co-ordinates & output variables are extended and the node results are written after the existing timesteps """
+
+        # Zarr is an optional dependency (only required for the Zarr output format):
+        import zarr
+        from xarray.coding.times import encode_cf_datetime
+
+        if len(self.groups) > 0:
+            raise ValueError('Error: Appending to an existing output file is not supported with aggregation levels or derived indicators.')
+
+        path = os.path.join(data_path,'output',output_netcdf)
+        EXISTING = xr.open_zarr(path)
+        STORE = zarr.open_group(path, mode = 'r+')
+
+        # The appended simulation must follow the existing timesteps and report the same output variables on the same spatial layout:
+        if RESULT.time.values[0] <= EXISTING.time.values[-1]:
+            raise ValueError('Error: The appended timesteps must follow the final timestamp of the existing output file (%s).' % EXISTING.time.values[-1])
+        for names in self.result_layout.values():
+            for name in names:
+                if OUTPUT_VARIABLES[name]['netcdf_name'] not in EXISTING.data_vars:
+                    raise ValueError('Error: Output variable %s is not in the existing output file.' % OUTPUT_VARIABLES[name]['netcdf_name'])
+        for dim in RESULT.dims:
+            if (dim not in ['time','profile_time']) and (dim in EXISTING.dims) and (EXISTING.sizes[dim] != RESULT.sizes[dim]):
+                raise ValueError('Error: Dimension %s of the existing output file does not match the simulation.' % dim)
+
+        # Node results are written after the existing timesteps (& profiles):
+        self.append_offsets = {'series': EXISTING.sizes['time'], 'profiles': EXISTING.sizes['profile_time'] if 'profile_time' in RESULT.coords else EXISTING.sizes['time']}
+
+        # Extend the temporal co-ordinates (encoded with the units & calendar of the existing output file):
+        for dim in ['time','profile_time']:
+            if dim in RESULT.coords:
+                ARRAY = STORE[dim]
+                values = encode_cf_datetime(RESULT[dim].values, ARRAY.attrs['units'], ARRAY.attrs.get('calendar', 'proleptic_gregorian'))[0]
+                n = ARRAY.shape[0]
+                ARRAY.resize((n + len(values),))
+                ARRAY[n:] = np.asarray(values).astype(ARRAY.dtype)
+
+        # Extend the output variables along their temporal dimension:
+        for names in self.result_layout.values():
+            for name in names:
+                ARRAY = STORE[OUTPUT_VARIABLES[name]['netcdf_name']]
+                ARRAY.resize((ARRAY.shape[0] + RESULT.sizes[self.get_output_dims(name)[0]],) + ARRAY.shape[1:])
+
+        zarr.consolidate_metadata(path)
+
+    def get_group_result(self, RESULT, group):
+        """ Returns the Xarray dataset (co-ordinates & attributes) of an output group (aggregation level or indicators) """
+
+        dim, values = self.groups[group]
+        GROUP = xr.Dataset(coords = {dim: values})
+        for coord in ['y','x','node','node_y','node_x','node_easting','node_northing','spatial_ref']:
+            if coord in RESULT.coords:
+                GROUP.coords[coord] = RESULT.coords[coord]
+        if group == 'indicators':
+            GROUP.attrs['Firn_temperature_depth'] = firn_temperature_depth
+        else:
+            GROUP.attrs['Aggregation_level'] = group
+
+        return GROUP
+
+    def get_output_dims(self, name):
+        """ Returns the dimensions of an output variable in the output file layout """
+
+        # Ragged profiles are stored along the 'layer_obs' dimension:
+        if is_profile(name) and (ragged_profiles == True):
+            return ('layer_obs',)
+
+        # Subsurface variables on their own output schedule:
+        dims = OUTPUT_VARIABLES[name]['dims']
+        if is_profile(name) and ('profile_time' in self.RESULT.coords):
+            dims = ('profile_time',) + dims[1:]
+
+        # Profiles remapped onto the fixed depth grid:
+        if is_profile(name) and (profile_depth_grid is not None):
+            dims = dims[:-1] + ('depth',)
+
+        # Node-indexed layout: the spatial dimensions (y,x) are replaced by the 'node' dimension
+        if output_layout == 'node':
+            return (dims[0], 'node') + dims[3:]
+
+        return dims
+
+    def get_output_region(self, y, x):
+        """ Returns the spatial index of a node in the output file layout """
+        if output_layout == 'node':
+            return (self.node_index[(y, x)],)
+        return (y, x)
+
+    def get_initial_state(self, y, x):
+        """ Returns the initial state of a node from the restart file (None: initial conditions, see init_snowpack) """
+        if self.RESTART is None:
+            return None
+        return get_restart_state(self.RESTART, self.STATIC.y.values[y], self.STATIC.x.values[x])
+
+    def get_node_stations(self, y, x):
+        """ Returns the (station indexes, interpolation weights) of a node (multi-station meteorological data, otherwise None) """
+        if self.station_weights is None:
+            return None
+        weights = self.station_weights[self.node_index[(y, x)]]
+        return weights.indices, weights.data
+
+    def get_output_chunks(self, name, block = 'series'):
+        """ Returns the chunk sizes of an output variable (depending on its layout & storage data type) in a result block """
+
+        dtype = get_output_encoding(name)['dtype']
+
+        # Multi-resolution aggregates & derived indicators are reported on the periods of their output group:
+        if block in self.groups:
+            nt = len(self.groups[block][1])
+        else:
+            nt = self.n_profiles if is_profile(name) else self.nt
+
+        # Each node region is stored in its own chunks (profiles are split in time to limit the chunk size to ~4 MB):
+        dims = self.get_output_dims(name)
+        if dims == ('layer_obs',):
+            chunksizes = (2**16,)
+        elif is_profile(name):
+            nz = get_profile_size()
+            chunksizes = (max(1, min(nt, (4 * 2**20) // (dtype.itemsize * nz))),) + (1,) * (len(dims) - 2) + (nz,)
+        else:
+            chunksizes = (nt,) + (1,) * (len(dims) - 1)
+
+        return chunksizes
 
     # =================================================================================================
 
-    # ================================================= #
-    # Assign Local Node Results to Global Result Arrays
-    # ================================================= #
+    # ============================================== #
+    # Write Local Node Results to Output NETCDF File
+    # ============================================== #
     
-    def copy_local_to_global(self,y,x,
-        local_AIR_TEMPERATURE,local_AIR_PRESSURE,local_RELATIVE_HUMIDITY,local_SPECIFIC_HUMIDITY,local_WIND_SPEED,local_FRACTIONAL_CLOUD_COVER, \
-        local_SHORTWAVE,local_LONGWAVE,local_SENSIBLE,local_LATENT,local_SUBSURFACE,local_RAIN_HEAT_FLUX,local_MELT_ENERGY, \
-        local_RAIN,local_SNOWFALL,local_EVAPORATION,local_SUBLIMATION,local_CONDENSATION,local_DEPOSITION,local_SURFACE_MELT,local_SURFACE_MASS_BALANCE, \
-        local_REFREEZE,local_SUBSURFACE_MELT,local_RUNOFF,local_MASS_BALANCE, \
-        local_SNOW_HEIGHT,local_SNOW_WATER_EQUIVALENT,local_TOTAL_HEIGHT,local_SURFACE_ELEVATION,local_SURFACE_TEMPERATURE,local_SURFACE_HUMIDITY,local_SURFACE_ALBEDO,local_N_LAYERS,local_FIRN_TEMPERATURE,local_FIRN_TEMPERATURE_CHANGE,local_FIRN_FACIE, \
-        local_LAYER_DEPTH,local_LAYER_HEIGHT,local_LAYER_DENSITY,local_LAYER_TEMPERATURE,local_LAYER_WATER_CONTENT,local_LAYER_COLD_CONTENT,local_LAYER_POROSITY,local_LAYER_ICE_FRACTION, \
-        local_LAYER_IRREDUCIBLE_WATER,local_LAYER_REFREEZE,local_LAYER_HYDRO_YEAR,local_LAYER_GRAIN_SIZE):
-        """ Fills the global result arrays with local variables from each node """
-
-        # Meteorological Variables (6):
-        if ('AIR_TEMPERATURE' in self.meteorological_variables):
-            self.AIR_TEMPERATURE[:,y,x] = local_AIR_TEMPERATURE
-        if ('AIR_PRESSURE' in self.meteorological_variables):
-            self.AIR_PRESSURE[:,y,x] = local_AIR_PRESSURE
-        if ('RELATIVE_HUMIDITY' in self.meteorological_variables):
-            self.RELATIVE_HUMIDITY[:,y,x] = local_RELATIVE_HUMIDITY
-        if ('SPECIFIC_HUMIDITY' in self.meteorological_variables):
-            self.SPECIFIC_HUMIDITY[:,y,x] = local_SPECIFIC_HUMIDITY 
-        if ('WIND_SPEED' in self.meteorological_variables):
-            self.WIND_SPEED[:,y,x] = local_WIND_SPEED
-        if ('FRACTIONAL_CLOUD_COVER' in self.meteorological_variables):
-            self.FRACTIONAL_CLOUD_COVER[:,y,x] = local_FRACTIONAL_CLOUD_COVER
-
-        # Surface Energy Fluxes (7):
-        if ('SHORTWAVE' in self.surface_energy_fluxes):
-            self.SHORTWAVE[:,y,x] = local_SHORTWAVE
-        if ('LONGWAVE' in self.surface_energy_fluxes):
-            self.LONGWAVE[:,y,x] = local_LONGWAVE
-        if ('SENSIBLE' in self.surface_energy_fluxes):
-            self.SENSIBLE[:,y,x] = local_SENSIBLE
-        if ('LATENT' in self.surface_energy_fluxes):
-            self.LATENT[:,y,x] = local_LATENT 
-        if ('SUBSURFACE' in self.surface_energy_fluxes):
-            self.SUBSURFACE[:,y,x] = local_SUBSURFACE 
-        if ('RAIN_HEAT_FLUX' in self.surface_energy_fluxes):
-            self.RAIN_HEAT_FLUX[:,y,x] = local_RAIN_HEAT_FLUX 
-        if ('MELT_ENERGY' in self.surface_energy_fluxes):
-            self.MELT_ENERGY[:,y,x] = local_MELT_ENERGY
-
-        # Surface Mass Fluxes (8):
-        if ('RAIN' in self.surface_mass_fluxes):
-            self.RAIN[:,y,x] = local_RAIN
-        if ('SNOWFALL' in self.surface_mass_fluxes):
-            self.SNOWFALL[:,y,x] = local_SNOWFALL
-        if ('EVAPORATION' in self.surface_mass_fluxes):
-            self.EVAPORATION[:,y,x] = local_EVAPORATION
-        if ('SUBLIMATION' in self.surface_mass_fluxes):
-            self.SUBLIMATION[:,y,x] = local_SUBLIMATION
-        if ('CONDENSATION' in self.surface_mass_fluxes):
-            self.CONDENSATION[:,y,x] = local_CONDENSATION
-        if ('DEPOSITION' in self.surface_mass_fluxes):
-            self.DEPOSITION[:,y,x] = local_DEPOSITION
-        if ('SURFACE_MELT' in self.surface_mass_fluxes):
-            self.SURFACE_MELT[:,y,x] = local_SURFACE_MELT
-        if ('SURFACE_MASS_BALANCE' in self.surface_mass_fluxes):
-            self.SURFACE_MASS_BALANCE[:,y,x] = local_SURFACE_MASS_BALANCE
-
-        # Subsurface Mass Fluxes (4):
-        if ('REFREEZE' in self.subsurface_mass_fluxes):
-            self.REFREEZE[:,y,x] = local_REFREEZE
-        if ('SUBSURFACE_MELT' in self.subsurface_mass_fluxes):
-            self.SUBSURFACE_MELT[:,y,x] = local_SUBSURFACE_MELT
-        if ('RUNOFF' in self.subsurface_mass_fluxes):
-            self.RUNOFF[:,y,x] = local_RUNOFF
-        if ('MASS_BALANCE' in self.subsurface_mass_fluxes):
-            self.MASS_BALANCE[:,y,x] = local_MASS_BALANCE         
-
-        # Other Information (11):
-        if ('SNOW_HEIGHT' in self.other):
-            self.SNOW_HEIGHT[:,y,x] = local_SNOW_HEIGHT
-        if ('SNOW_WATER_EQUIVALENT' in self.other):
-            self.SNOW_WATER_EQUIVALENT[:,y,x] = local_SNOW_WATER_EQUIVALENT
-        if ('TOTAL_HEIGHT' in self.other):
-            self.TOTAL_HEIGHT[:,y,x] = local_TOTAL_HEIGHT
-        if ('SURFACE_ELEVATION' in self.other):
-            self.SURFACE_ELEVATION[:,y,x] = local_SURFACE_ELEVATION     
-        if ('SURFACE_TEMPERATURE' in self.other):
-            self.SURFACE_TEMPERATURE[:,y,x] = local_SURFACE_TEMPERATURE
-        if ('SURFACE_HUMIDITY' in self.other):
-            self.SURFACE_HUMIDITY[:,y,x] = local_SURFACE_HUMIDITY
-        if ('SURFACE_ALBEDO' in self.other):
-            self.SURFACE_ALBEDO[:,y,x] = local_SURFACE_ALBEDO
-        if ('N_LAYERS' in self.other):
-            self.N_LAYERS[:,y,x] = local_N_LAYERS
-        if ('FIRN_TEMPERATURE' in self.other):
-            self.FIRN_TEMPERATURE[:,y,x] = local_FIRN_TEMPERATURE
-        if ('FIRN_TEMPERATURE_CHANGE' in self.other):
-            self.FIRN_TEMPERATURE_CHANGE[:,y,x] = local_FIRN_TEMPERATURE_CHANGE
-        if ('FIRN_FACIE' in self.other):
-            self.FIRN_FACIE[:,y,x] = local_FIRN_FACIE
-        
-        # Subsurface Variables (12):
-        if full_field:
-            if ('DEPTH' in self.subsurface_variables):
-                self.LAYER_DEPTH[:,y,x,:] = local_LAYER_DEPTH
-            if ('HEIGHT' in self.subsurface_variables):
-                self.LAYER_HEIGHT[:,y,x,:] = local_LAYER_HEIGHT 
-            if ('DENSITY' in self.subsurface_variables):
-                self.LAYER_DENSITY[:,y,x,:] = local_LAYER_DENSITY 
-            if ('TEMPERATURE' in self.subsurface_variables):
-                self.LAYER_TEMPERATURE[:,y,x,:] = local_LAYER_TEMPERATURE
-            if ('WATER_CONTENT' in self.subsurface_variables):
-                self.LAYER_WATER_CONTENT[:,y,x,:] = local_LAYER_WATER_CONTENT 
-            if ('COLD_CONTENT' in self.subsurface_variables):
-                self.LAYER_COLD_CONTENT[:,y,x,:] = local_LAYER_COLD_CONTENT 
-            if ('POROSITY' in self.subsurface_variables):
-                self.LAYER_POROSITY[:,y,x,:] = local_LAYER_POROSITY 
-            if ('ICE_FRACTION' in self.subsurface_variables):
-                self.LAYER_ICE_FRACTION[:,y,x,:] = local_LAYER_ICE_FRACTION 
-            if ('IRREDUCIBLE_WATER' in self.subsurface_variables):
-                self.LAYER_IRREDUCIBLE_WATER[:,y,x,:] = local_LAYER_IRREDUCIBLE_WATER 
-            if ('REFREEZE' in self.subsurface_variables):
-                self.LAYER_REFREEZE[:,y,x,:] = local_LAYER_REFREEZE 
-            if ('HYDRO_YEAR' in self.subsurface_variables):
-                self.LAYER_HYDRO_YEAR[:,y,x,:] = local_LAYER_HYDRO_YEAR
-            if ('GRAIN_SIZE' in self.subsurface_variables):
-                self.LAYER_GRAIN_SIZE[:,y,x,:] = local_LAYER_GRAIN_SIZE
+    def write_local_results(self, y, x, local_BLOCKS, local_HEADER):
+        """ Writes the local variables from each node into their region of the output NetCDF file """
+
+        if local_HEADER != self.result_layout:
+            raise ValueError('Error: Result header of node [y: %s, x: %s] does not match the output dataset.' % (y, x))
+
+        # The HDF5 library is not thread-safe: the writes are serialised with the reads of Xarray (e.g. the forcing read by in-process workers)
+        region = self.get_output_region(y, x)
+        with HDF5_LOCK:
+            if ragged_profiles == True:
+                write_local_blocks(self.OUTPUT, region, local_BLOCKS, dict(local_HEADER, profiles = []))
+                if len(local_HEADER['profiles']) > 0:
+                    self.write_ragged_profiles(region, local_BLOCKS, local_HEADER)
+            else:
+                write_local_blocks(self.OUTPUT, region, local_BLOCKS, local_HEADER)
 
     # =================================================================================================
 
-    # =================================== #
-    # Write Results to Output NETCDF File
-    # =================================== #
-
-    def write_results_to_file(self):
-        """ Writes the results into the RESULT Xarray dataset """
-
-        # Meteorological Variables (6):
-        if ('AIR_TEMPERATURE' in self.meteorological_variables):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.AIR_TEMPERATURE, 'AIR_TEMPERATURE', '°C', 'Air Temperature')
-        if ('AIR_PRESSURE' in self.meteorological_variables):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.AIR_PRESSURE, 'AIR_PRESSURE', 'hPa', 'Air Pressure')
-        if ('RELATIVE_HUMIDITY' in self.meteorological_variables):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.RELATIVE_HUMIDITY, 'RELATIVE_HUMIDITY', '%', 'Relative Humidity')
-        if ('SPECIFIC_HUMIDITY' in self.meteorological_variables):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.SPECIFIC_HUMIDITY, 'SPECIFIC_HUMIDITY', 'g kg\u207b\xb1', 'Specific Humidity')
-        if ('WIND_SPEED' in self.meteorological_variables):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.WIND_SPEED, 'WIND_SPEED', 'm s\u207b\xb9', 'Wind Speed')
-        if ('FRACTIONAL_CLOUD_COVER' in self.meteorological_variables):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.FRACTIONAL_CLOUD_COVER, 'FRACTIONAL_CLOUD_COVER', '-', 'Fractional Cloud Cover')
-
-        # Surface Energy Fluxes (7):
-        if ('SHORTWAVE' in self.surface_energy_fluxes):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.SHORTWAVE, 'SHORTWAVE', 'W m\u207b\xb2', 'Net Shortwave Flux')
-        if ('LONGWAVE' in self.surface_energy_fluxes):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.LONGWAVE, 'LONGWAVE', 'W m\u207b\xb2', 'Net Longwave Flux')
-        if ('SENSIBLE' in self.surface_energy_fluxes):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.SENSIBLE, 'SENSIBLE', 'W m\u207b\xb2', 'Net Sensible Heat Flux')
-        if ('LATENT' in self.surface_energy_fluxes):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.LATENT, 'LATENT', 'W m\u207b\xb2', 'Net Latent Heat Flux')
-        if ('SUBSURFACE' in self.surface_energy_fluxes):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.SUBSURFACE, 'SUBSURFACE', 'W m\u207b\xb2', 'Net Subsurface / Ground Heat Flux')
-        if ('RAIN_HEAT_FLUX' in self.surface_energy_fluxes):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.RAIN_HEAT_FLUX, 'RAIN_HEAT_FLUX', 'W m\u207b\xb2', 'Rain Heat Flux')
-        if ('MELT_ENERGY' in self.surface_energy_fluxes):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.MELT_ENERGY, 'MELT_ENERGY', 'W m\u207b\xb2', 'Melt Flux')
-
-        # Surface Mass Fluxes (8):
-        if ('RAIN' in self.surface_mass_fluxes):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.RAIN, 'RAIN', 'm w.e.', 'Rain')
-        if ('SNOWFALL' in self.surface_mass_fluxes):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.SNOWFALL, 'SNOWFALL', 'm w.e.', 'Snowfall')
-        if ('EVAPORATION' in self.surface_mass_fluxes):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.EVAPORATION, 'EVAPORATION', 'm w.e.', 'Evaporation')
-        if ('SUBLIMATION' in self.surface_mass_fluxes):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.SUBLIMATION, 'SUBLIMATION', 'm w.e.', 'Sublimation')
-        if ('CONDENSATION' in self.surface_mass_fluxes):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.CONDENSATION, 'CONDENSATION', 'm w.e.', 'Condensation')
-        if ('DEPOSITION' in self.surface_mass_fluxes):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.DEPOSITION, 'DEPOSITION', 'm w.e.', 'Moisture Deposition')
-        if ('SURFACE_MELT' in self.surface_mass_fluxes):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.SURFACE_MELT, 'SURFACE_MELT', 'm w.e.', 'Surface Melt')
-        if ('SURFACE_MASS_BALANCE' in self.surface_mass_fluxes):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.SURFACE_MASS_BALANCE, 'SURFACE_MASS_BALANCE', 'm w.e.', 'Surface Mass Balance')
-
-        # Subsurface Mass Fluxes (4):
-        if ('REFREEZE' in self.subsurface_mass_fluxes):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.REFREEZE, 'REFREEZE', 'm w.e.', 'Refreezing')
-        if ('SUBSURFACE_MELT' in self.subsurface_mass_fluxes):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.SUBSURFACE_MELT, 'SUBSURFACE_MELT', 'm w.e.', 'Subsurface Melt')
-        if ('RUNOFF' in self.subsurface_mass_fluxes):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.RUNOFF, 'RUNOFF', 'm w.e.', 'Runoff')
-        if ('MASS_BALANCE' in self.subsurface_mass_fluxes):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.MASS_BALANCE, 'MASS_BALANCE', 'm w.e.', 'Mass Balance')       
-
-        # Other Information (11):
-        if ('SNOW_HEIGHT' in self.other):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.SNOW_HEIGHT, 'SNOW_HEIGHT', 'm', 'Snow Height')
-        if ('SNOW_WATER_EQUIVALENT' in self.other):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.SNOW_WATER_EQUIVALENT, 'SNOW_WATER_EQUIVALENT', 'm w.e.', 'Snow Water Equivalent')
-        if ('TOTAL_HEIGHT' in self.other):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.TOTAL_HEIGHT, 'TOTAL_HEIGHT', 'm', 'Total Height')
-        if ('SURFACE_ELEVATION' in self.other):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.SURFACE_ELEVATION, 'SURFACE_ELEVATION', 'm a.s.l.', 'Surface Elevation')
-        if ('SURFACE_TEMPERATURE' in self.other):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.SURFACE_TEMPERATURE, 'SURFACE_TEMPERATURE', '°C', 'Surface Temperature')
-        if ('SURFACE_HUMIDITY' in self.other):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.SURFACE_HUMIDITY, 'SURFACE_HUMIDITY', 'g kg\u207b\xb1', 'Surface Humidity')
-        if ('SURFACE_ALBEDO' in self.other):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.SURFACE_ALBEDO, 'SURFACE_ALBEDO', '-', 'Surface Albedo')
-        if ('N_LAYERS' in self.other):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.N_LAYERS, 'N_LAYERS', 'n', 'Number of Layers')
-        if ('FIRN_TEMPERATURE' in self.other):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.FIRN_TEMPERATURE, 'FIRN_TEMPERATURE', '°C', 'Firn Temperature at x m Depth')
-        if ('FIRN_TEMPERATURE_CHANGE' in self.other):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.FIRN_TEMPERATURE_CHANGE, 'FIRN_TEMP_CHANGE', 'ΔC', 'Firn Warming at x m Depth')
-        if ('FIRN_FACIE' in self.other):
-            self.add_variable_along_northingeastingtime(self.RESULT, self.FIRN_FACIE, 'FIRN_FACIE', '-', '1 : Recrystallization | 2 : Recrystallization-Infiltraion | 3 : Cold-Infilitration | 4 : Temperate')
-
-        # Subsurface Variables (12):
-        if full_field:
-            if ('DEPTH' in self.subsurface_variables):
-                self.add_variable_along_northingeastinglayertime(self.RESULT, self.LAYER_DEPTH, 'LAYER_DEPTH', 'm', 'Layer Depth')
-            if ('HEIGHT' in self.subsurface_variables):
-                self.add_variable_along_northingeastinglayertime(self.RESULT, self.LAYER_HEIGHT, 'LAYER_HEIGHT', 'm', 'Layer Height') 
-            if ('DENSITY' in self.subsurface_variables):
-                self.add_variable_along_northingeastinglayertime(self.RESULT, self.LAYER_DENSITY, 'LAYER_DENSITY', 'kg m\u207b\xb3', 'Layer Density') 
-            if ('TEMPERATURE' in self.subsurface_variables):
-                self.add_variable_along_northingeastinglayertime(self.RESULT, self.LAYER_TEMPERATURE, 'LAYER_TEMPERATURE', '°C', 'Layer Temperature') 
-            if ('WATER_CONTENT' in self.subsurface_variables):
-                self.add_variable_along_northingeastinglayertime(self.RESULT, self.LAYER_WATER_CONTENT, 'LAYER_WATER_CONTENT', '-', 'Layer Liquid Water Content') 
-            if ('COLD_CONTENT' in self.subsurface_variables):
-                self.add_variable_along_northingeastinglayertime(self.RESULT, self.LAYER_COLD_CONTENT, 'LAYER_COLD_CONTENT', 'J m\u207b\xb2', 'Layer Cold Content') 
-            if ('POROSITY' in self.subsurface_variables):
-                self.add_variable_along_northingeastinglayertime(self.RESULT, self.LAYER_POROSITY, 'LAYER_POROSITY', '-', 'Layer Porosity') 
-            if ('ICE_FRACTION' in self.subsurface_variables):
-                self.add_variable_along_northingeastinglayertime(self.RESULT, self.LAYER_ICE_FRACTION, 'LAYER_ICE_FRACTION', '-', 'Layer Ice Fraction') 
-            if ('IRREDUCIBLE_WATER' in self.subsurface_variables):
-                self.add_variable_along_northingeastinglayertime(self.RESULT, self.LAYER_IRREDUCIBLE_WATER, 'LAYER_IRR_WATER', '-', 'Layer Irreducible Water') 
-            if ('REFREEZE' in self.subsurface_variables):
-                self.add_variable_along_northingeastinglayertime(self.RESULT, self.LAYER_REFREEZE, 'LAYER_REFREEZE', 'm w.e.', 'Layer Refreezing')   
-            if ('HYDRO_YEAR' in self.subsurface_variables):
-                self.add_variable_along_northingeastinglayertime(self.RESULT, self.LAYER_HYDRO_YEAR, 'LAYER_HYDRO_YEAR', 'yyyy', 'Layer Hydrological Year') 
-            if ('GRAIN_SIZE' in self.subsurface_variables):
-                self.add_variable_along_northingeastinglayertime(self.RESULT, self.LAYER_GRAIN_SIZE, 'LAYER_GRAIN_SIZE', 'mm', 'Layer Grain Size')                   
+    # ========================== #
+    # Ragged Subsurface Profiles
+    # ========================== #
+
+    def create_ragged_index_variables(self, RESULT):
+        """ Creates the unlimited 'layer_obs' dimension and the index variables of the ragged subsurface profiles """
+
+        self.OUTPUT.createDimension('layer_obs', None)
+        self.n_layer_obs = 0
+
+        # Dimensions of the index variables:
+        time_dim = 'profile_time' if 'profile_time' in RESULT.coords else 'time'
+        dims = (time_dim,'node') if output_layout == 'node' else (time_dim,'y','x')
+        chunksizes = (self.n_profiles,) + (1,) * (len(dims) - 1)
+
+        # Offset of the first layer of each profile along the 'layer_obs' dimension:
+        variable = self.OUTPUT.createVariable('LAYER_START', 'i8', dims, zlib = True, complevel = compression_level,
+                                              chunksizes = chunksizes, fill_value = -9999)
+        variable.units = 'n'
+        variable.long_name = 'Index of the First Layer of each Profile'
+
+        # Number of layers of each profile (CF contiguous ragged array count variable):
+        variable = self.OUTPUT.createVariable('LAYER_COUNT', 'i4', dims, zlib = True, complevel = compression_level,
+                                              chunksizes = chunksizes, fill_value = -9999)
+        variable.units = 'n'
+        variable.long_name = 'Number of Layers of each Profile'
+        variable.sample_dimension = 'layer_obs'
+
+        for variable in [self.OUTPUT['LAYER_START'], self.OUTPUT['LAYER_COUNT']]:
+            if 'spatial_ref' in RESULT.coords:
+                variable.grid_mapping = 'spatial_ref'
+
+    def write_ragged_profiles(self, region, local_BLOCKS, local_HEADER):
+        """ Appends the active layers of each profile of a node to the 'layer_obs' dimension of the output NetCDF file """
+
+        # Active layers of each profile (t,z) & their offsets:
+        layer_count = local_BLOCKS['layer_count']
+        active = np.arange(max_layers) < layer_count[:,None]
+        layer_start = self.n_layer_obs + np.cumsum(layer_count) - layer_count
+        n_obs = int(layer_count.sum())
+
+        # Profiles of a time window are written after the profiles of the previous time windows:
+        offset = local_BLOCKS.get('offsets', {}).get('profiles', 0)
+        self.OUTPUT['LAYER_START'][(slice(offset, offset + len(layer_count)),) + region] = layer_start
+        self.OUTPUT['LAYER_COUNT'][(slice(offset, offset + len(layer_count)),) + region] = layer_count
+        if n_obs == 0:
+            return
+
+        for i, name in enumerate(local_HEADER['profiles']):
+            values = encode_values(get_output_encoding(name), local_BLOCKS['profiles'][i][active])
+            self.OUTPUT[OUTPUT_VARIABLES[name]['netcdf_name']][self.n_layer_obs:self.n_layer_obs + n_obs] = values
+
+        self.n_layer_obs += n_obs
+
+    # =================================================================================================
+
+    # ========================= #
+    # Close Output NETCDF File:
+    # ========================= #
+
+    def close_output_file(self):
+        """ Closes the output NetCDF file """
+        if self.OUTPUT is not None:
+            self.OUTPUT.close()
 
     # =================================================================================================
 
@@ -771,23 +836,52 @@ class IOClass:
         ds[name].encoding['_FillValue'] = -9999
         return ds
     
-    def add_variable_along_northingeastingtime(self, ds, var, name, units, long_name):
-        """ This function adds variables to the RESULT Xarray dataset (x,y,t)"""
-        ds[name] = (('time','y','x'), var.data)
-        ds[name].attrs['units'] = units
-        ds[name].attrs['long_name'] = long_name
-        ds[name].attrs['grid_mapping'] = 'spatial_ref'
-        ds[name].encoding['_FillValue'] = -9999
-        return ds
-    
-    def add_variable_along_northingeastinglayertime(self, ds, var, name, units, long_name):
-        """ This function adds variables to the RESULT Xarray dataset (x,y,z,t) """
-        ds[name] = (('time','y','x','layer'), var.data)
-        ds[name].attrs['units'] = units
-        ds[name].attrs['long_name'] = long_name
-        ds[name].attrs['grid_mapping'] = 'spatial_ref'
-        ds[name].encoding['_FillValue'] = -9999
-        return ds
-    
     # =================================================================================================
     
+
+# ===================================================================================================
+
+# ================================================ #
+# Write Local Node Results to Output Store Regions
+# ================================================ #
+
+def write_local_blocks(OUTPUT, region, local_BLOCKS, local_HEADER, threads = 1, append_offsets = {}):
+    """ Writes the packed result blocks of a node into its region ((y,x) or (node)) of an open NetCDF dataset or Zarr group.
+        The variables are encoded (quantised / packed, missing values as the fill value) and may be compressed by several threads. """
+
+    # Results of a time window are written at their offset along the temporal dimension (after the existing timesteps when appending):
+    offsets = {block: local_BLOCKS.get('offsets', {}).get(block, 0) + append_offsets.get(block, 0) for block in local_HEADER}
+
+    def write_variable(item):
+        block, i, name = item
+        values = encode_values(get_output_encoding(name), local_BLOCKS[block][i])
+        time = slice(offsets.get(block, 0), offsets.get(block, 0) + values.shape[0])
+
+        # Multi-resolution aggregates & derived indicators are written into their output group:
+        GROUP = OUTPUT if block in ['series','profiles'] else OUTPUT[block]
+        if is_profile(name):
+            GROUP[OUTPUT_VARIABLES[name]['netcdf_name']][(time,) + region + (slice(None),)] = values
+        else:
+            GROUP[OUTPUT_VARIABLES[name]['netcdf_name']][(time,) + region] = values
+
+    items = [(block, i, name) for block, names in local_HEADER.items() for i, name in enumerate(names)]
+    if threads > 1:
+        with ThreadPoolExecutor(max_workers = threads) as executor:
+            list(executor.map(write_variable, items))
+    else:
+        for item in items:
+            write_variable(item)
+
+def write_local_results_to_zarr(NODE_RESULT, region, append_offsets = {}):
+    """ Writes the results of a node directly into its region of the output Zarr store (executed on the workers) 
+        and returns the node result without its result blocks (except the runtime & simulated timesteps of the node) (& the node state of a time window) """
+
+    # Zarr is an optional dependency (only required for the Zarr output format):
+    import zarr
+
+    indY, indX, BLOCKS, HEADER = NODE_RESULT[:4]
+    write_local_blocks(zarr.open_group(os.path.join(data_path,'output',output_netcdf), mode = 'r+'), region, BLOCKS, HEADER, compression_threads, append_offsets)
+
+    return (indY, indX, {block: BLOCKS[block] for block in ['runtime','timesteps'] if block in BLOCKS}, HEADER) + tuple(NODE_RESULT[4:])
+
+# ===================================================================================================
@@ -0,0 +1,361 @@
+"""
+    ==================================================================
+
+                      OUTPUT VARIABLES REGISTRY FILE
+
+        This file declares every output variable that the model can
+        report, together with its configuration group, NetCDF name,
+        metadata, temporal aggregation and storage encoding. The core,
+        IO Class and output writing all consult this registry so that
+        only the variables requested in the config file are computed.
+
+    ==================================================================
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from parameters import *
+from config import *
+from main.kernel.indicators import INDICATORS
+
+# ========================= #
+# Output Variables Registry
+# ========================= #
+
+# Aggregation between output timestamps:
+#   'mean'           :: averaged (meteorological conditions & energy fluxes)
+#   'sum'            :: summated (mass fluxes)
+#   'instantaneous'  :: reported at the output timestamp (state variables)
+#   'indicator'      :: derived indicator reported once per calendar year (see indicators.py)
+
+# Encoding profiles (output_encoding = 'compact'):
+#   least_significant_digit  :: values are quantised to keep this many decimal digits (trailing mantissa bits are zeroed & compress well)
+#   scale_factor, add_offset :: values are packed into integers: stored = round((value - add_offset) / scale_factor)
+#   dtype                    :: storage data type (integer fill value: minimum of the data type)
+ENCODING_PROFILES = {
+    'lossless':     dict(),
+    'energy_flux':  dict(least_significant_digit = 1),                                 # [W m-2]
+    'mass_flux':    dict(least_significant_digit = 6),                                 # [m w.e.]
+    'temperature':  dict(least_significant_digit = 2),                                 # [°C]
+    'height':       dict(least_significant_digit = 3),                                 # [m]
+    'meteorology':  dict(least_significant_digit = 2),                                 # [hPa, %, g kg-1, m s-1]
+    'density':      dict(least_significant_digit = 1),                                 # [kg m-3]
+    'grain_size':   dict(least_significant_digit = 3),                                 # [mm]
+    'fraction':     dict(dtype = 'int16', scale_factor = 1e-4, add_offset = 0.0),      # [-] (range: -3.2767 - 3.2767)
+    'year':         dict(dtype = 'int16'),                                             # [yyyy]
+    'count':        dict(dtype = 'int16'),                                             # [n]
+    'category':     dict(dtype = 'int8'),                                              # [-]
+}
+
+# Default encoding profile of each unit:
+UNIT_ENCODING = {'W m\u207b\xb2': 'energy_flux', 'm w.e.': 'mass_flux', '°C': 'temperature', 'ΔC': 'temperature', 'm': 'height',
+                 'm a.s.l.': 'height', 'hPa': 'meteorology', '%': 'meteorology', 'g kg\u207b\xb1': 'meteorology', 'm s\u207b\xb9': 'meteorology',
+                 'kg m\u207b\xb3': 'density', 'mm': 'grain_size', '-': 'fraction', 'yyyy': 'year', 'n': 'count',
+                 'h': 'count', 'days': 'count', 'doy': 'count'}
+
+def variable(group, config_name, netcdf_name, units, long_name, aggregation, dims = ('time','y','x'), dtype = precision, encoding = None, remap = 'mean'):
+    """ Returns a single entry of the output variables registry (remap: remapping of the subsurface variables onto the fixed
+        depth grid, 'mean', 'sum' or 'nearest', or None if the variable is not reported on the depth grid) """
+    if encoding is None:
+        encoding = UNIT_ENCODING.get(units, 'lossless')
+    return dict(group = group, config_name = config_name, netcdf_name = netcdf_name, units = units, long_name = long_name,
+                aggregation = aggregation, dims = dims, dtype = dtype, encoding = encoding, remap = remap)
+
+OUTPUT_VARIABLES = OrderedDict([
+
+    # Meteorological Variables (6):
+    ('AIR_TEMPERATURE',         variable('meteorological_variables', 'AIR_TEMPERATURE', 'AIR_TEMPERATURE', '°C', 'Air Temperature', 'mean')),
+    ('AIR_PRESSURE',            variable('meteorological_variables', 'AIR_PRESSURE', 'AIR_PRESSURE', 'hPa', 'Air Pressure', 'mean')),
+    ('RELATIVE_HUMIDITY',       variable('meteorological_variables', 'RELATIVE_HUMIDITY', 'RELATIVE_HUMIDITY', '%', 'Relative Humidity', 'mean')),
+    ('SPECIFIC_HUMIDITY',       variable('meteorological_variables', 'SPECIFIC_HUMIDITY', 'SPECIFIC_HUMIDITY', 'g kg\u207b\xb1', 'Specific Humidity', 'mean')),
+    ('WIND_SPEED',              variable('meteorological_variables', 'WIND_SPEED', 'WIND_SPEED', 'm s\u207b\xb9', 'Wind Speed', 'mean')),
+    ('FRACTIONAL_CLOUD_COVER',  variable('meteorological_variables', 'FRACTIONAL_CLOUD_COVER', 'FRACTIONAL_CLOUD_COVER', '-', 'Fractional Cloud Cover', 'mean')),
+
+    # Surface Energy Fluxes (7):
+    ('SHORTWAVE',               variable('surface_energy_fluxes', 'SHORTWAVE', 'SHORTWAVE', 'W m\u207b\xb2', 'Net Shortwave Flux', 'mean')),
+    ('LONGWAVE',                variable('surface_energy_fluxes', 'LONGWAVE', 'LONGWAVE', 'W m\u207b\xb2', 'Net Longwave Flux', 'mean')),
+    ('SENSIBLE',                variable('surface_energy_fluxes', 'SENSIBLE', 'SENSIBLE', 'W m\u207b\xb2', 'Net Sensible Heat Flux', 'mean')),
+    ('LATENT',                  variable('surface_energy_fluxes', 'LATENT', 'LATENT', 'W m\u207b\xb2', 'Net Latent Heat Flux', 'mean')),
+    ('SUBSURFACE',              variable('surface_energy_fluxes', 'SUBSURFACE', 'SUBSURFACE', 'W m\u207b\xb2', 'Net Subsurface / Ground Heat Flux', 'mean')),
+    ('RAIN_HEAT_FLUX',          variable('surface_energy_fluxes', 'RAIN_HEAT_FLUX', 'RAIN_HEAT_FLUX', 'W m\u207b\xb2', 'Rain Heat Flux', 'mean')),
+    ('MELT_ENERGY',             variable('surface_energy_fluxes', 'MELT_ENERGY', 'MELT_ENERGY', 'W m\u207b\xb2', 'Melt Flux', 'mean')),
+
+    # Surface Mass Fluxes (8):
+    ('RAIN',                    variable('surface_mass_fluxes', 'RAIN', 'RAIN', 'm w.e.', 'Rain', 'sum')),
+    ('SNOWFALL',                variable('surface_mass_fluxes', 'SNOWFALL', 'SNOWFALL', 'm w.e.', 'Snowfall', 'sum')),
+    ('EVAPORATION',             variable('surface_mass_fluxes', 'EVAPORATION', 'EVAPORATION', 'm w.e.', 'Evaporation', 'sum')),
+    ('SUBLIMATION',             variable('surface_mass_fluxes', 'SUBLIMATION', 'SUBLIMATION', 'm w.e.', 'Sublimation', 'sum')),
+    ('CONDENSATION',            variable('surface_mass_fluxes', 'CONDENSATION', 'CONDENSATION', 'm w.e.', 'Condensation', 'sum')),
+    ('DEPOSITION',              variable('surface_mass_fluxes', 'DEPOSITION', 'DEPOSITION', 'm w.e.', 'Moisture Deposition', 'sum')),
+    ('SURFACE_MELT',            variable('surface_mass_fluxes', 'SURFACE_MELT', 'SURFACE_MELT', 'm w.e.', 'Surface Melt', 'sum')),
+    ('SURFACE_MASS_BALANCE',    variable('surface_mass_fluxes', 'SURFACE_MASS_BALANCE', 'SURFACE_MASS_BALANCE', 'm w.e.', 'Surface Mass Balance', 'sum')),
+
+    # Subsurface Mass Fluxes (4):
+    ('REFREEZE',                variable('subsurface_mass_fluxes', 'REFREEZE', 'REFREEZE', 'm w.e.', 'Refreezing', 'sum')),
+    ('SUBSURFACE_MELT',         variable('subsurface_mass_fluxes', 'SUBSURFACE_MELT', 'SUBSURFACE_MELT', 'm w.e.', 'Subsurface Melt', 'sum')),
+    ('RUNOFF',                  variable('subsurface_mass_fluxes', 'RUNOFF', 'RUNOFF', 'm w.e.', 'Runoff', 'sum')),
+    ('MASS_BALANCE',            variable('subsurface_mass_fluxes', 'MASS_BALANCE', 'MASS_BALANCE', 'm w.e.', 'Mass Balance', 'sum')),
+
+    # Other Information (11):
+    ('SNOW_HEIGHT',             variable('other', 'SNOW_HEIGHT', 'SNOW_HEIGHT', 'm', 'Snow Height', 'instantaneous')),
+    ('SNOW_WATER_EQUIVALENT',   variable('other', 'SNOW_WATER_EQUIVALENT', 'SNOW_WATER_EQUIVALENT', 'm w.e.', 'Snow Water Equivalent', 'instantaneous')),
+    ('TOTAL_HEIGHT',            variable('other', 'TOTAL_HEIGHT', 'TOTAL_HEIGHT', 'm', 'Total Height', 'instantaneous')),
+    ('SURFACE_ELEVATION',       variable('other', 'SURFACE_ELEVATION', 'SURFACE_ELEVATION', 'm a.s.l.', 'Surface Elevation', 'instantaneous')),
+    ('SURFACE_TEMPERATURE',     variable('other', 'SURFACE_TEMPERATURE', 'SURFACE_TEMPERATURE', '°C', 'Surface Temperature', 'instantaneous')),
+    ('SURFACE_HUMIDITY',        variable('other', 'SURFACE_HUMIDITY', 'SURFACE_HUMIDITY', 'g kg\u207b\xb1', 'Surface Humidity', 'instantaneous')),
+    ('SURFACE_ALBEDO',          variable('other', 'SURFACE_ALBEDO', 'SURFACE_ALBEDO', '-', 'Surface Albedo', 'instantaneous')),
+    ('N_LAYERS',                variable('other', 'N_LAYERS', 'N_LAYERS', 'n', 'Number of Layers', 'instantaneous')),
+    ('FIRN_TEMPERATURE',        variable('other', 'FIRN_TEMPERATURE', 'FIRN_TEMPERATURE', '°C', 'Firn Temperature at x m Depth', 'instantaneous')),
+    ('FIRN_TEMPERATURE_CHANGE', variable('other', 'FIRN_TEMPERATURE_CHANGE', 'FIRN_TEMP_CHANGE', 'ΔC', 'Firn Warming at x m Depth', 'instantaneous')),
+    ('FIRN_FACIE',              variable('other', 'FIRN_FACIE', 'FIRN_FACIE', '-', '1 : Recrystallization | 2 : Recrystallization-Infiltraion | 3 : Cold-Infilitration | 4 : Temperate', 'instantaneous', dtype = 'int32', encoding = 'category')),
+
+    # Subsurface Variables (12):
+    ('LAYER_DEPTH',             variable('subsurface_variables', 'DEPTH', 'LAYER_DEPTH', 'm', 'Layer Depth', 'instantaneous', dims = ('time','y','x','layer'), remap = None)),
+    ('LAYER_HEIGHT',            variable('subsurface_variables', 'HEIGHT', 'LAYER_HEIGHT', 'm', 'Layer Height', 'instantaneous', dims = ('time','y','x','layer'), remap = None)),
+    ('LAYER_DENSITY',           variable('subsurface_variables', 'DENSITY', 'LAYER_DENSITY', 'kg m\u207b\xb3', 'Layer Density', 'instantaneous', dims = ('time','y','x','layer'))),
+    ('LAYER_TEMPERATURE',       variable('subsurface_variables', 'TEMPERATURE', 'LAYER_TEMPERATURE', '°C', 'Layer Temperature', 'instantaneous', dims = ('time','y','x','layer'))),
+    ('LAYER_WATER_CONTENT',     variable('subsurface_variables', 'WATER_CONTENT', 'LAYER_WATER_CONTENT', '-', 'Layer Liquid Water Content', 'instantaneous', dims = ('time','y','x','layer'))),
+    ('LAYER_COLD_CONTENT',      variable('subsurface_variables', 'COLD_CONTENT', 'LAYER_COLD_CONTENT', 'J m\u207b\xb2', 'Layer Cold Content', 'instantaneous', dims = ('time','y','x','layer'), remap = 'sum')),
+    ('LAYER_POROSITY',          variable('subsurface_variables', 'POROSITY', 'LAYER_POROSITY', '-', 'Layer Porosity', 'instantaneous', dims = ('time','y','x','layer'))),
+    ('LAYER_ICE_FRACTION',      variable('subsurface_variables', 'ICE_FRACTION', 'LAYER_ICE_FRACTION', '-', 'Layer Ice Fraction', 'instantaneous', dims = ('time','y','x','layer'))),
+    ('LAYER_IRREDUCIBLE_WATER', variable('subsurface_variables', 'IRREDUCIBLE_WATER', 'LAYER_IRR_WATER', '-', 'Layer Irreducible Water', 'instantaneous', dims = ('time','y','x','layer'))),
+    ('LAYER_REFREEZE',          variable('subsurface_variables', 'REFREEZE', 'LAYER_REFREEZE', 'm w.e.', 'Layer Refreezing', 'instantaneous', dims = ('time','y','x','layer'), remap = 'sum')),
+    ('LAYER_HYDRO_YEAR',        variable('subsurface_variables', 'HYDRO_YEAR', 'LAYER_HYDRO_YEAR', 'yyyy', 'Layer Hydrological Year', 'instantaneous', dims = ('time','y','x','layer'), remap = 'nearest')),
+    ('LAYER_GRAIN_SIZE',        variable('subsurface_variables', 'GRAIN_SIZE', 'LAYER_GRAIN_SIZE', 'mm', 'Layer Grain Size', 'instantaneous', dims = ('time','y','x','layer'))),
+])
+
+# Derived Indicators (see indicators.py):
+for name, indicator in INDICATORS.items():
+    OUTPUT_VARIABLES[name] = variable('indicators', name, name, indicator.units, indicator.long_name, 'indicator', dims = ('year','y','x'))
+
+# ============================================================================================================================= #
+
+# ========================== #
+# Requested Output Variables
+# ========================== #
+
+def get_output_variables(full = False):
+    """ Returns the names of the output variables requested in the config file (in registry order),
+        or all output variables of the registry (full, e.g. the cached node results: subsurface variables only if full_field) """
+
+    groups = {'meteorological_variables': meteorological_variables,
+              'surface_energy_fluxes': surface_energy_fluxes,
+              'surface_mass_fluxes': surface_mass_fluxes,
+              'subsurface_mass_fluxes': subsurface_mass_fluxes,
+              'other': other,
+              'subsurface_variables': subsurface_variables if full_field == True else [],
+              'indicators': []}         # (derived indicators are reported in their own output group, see get_indicators)
+
+    # Check that all requested variables exist in the registry:
+    for group, requested in groups.items():
+        allowed = [var['config_name'] for var in OUTPUT_VARIABLES.values() if var['group'] == group]
+        for config_name in requested:
+            if config_name not in allowed:
+                raise ValueError("Output variable = \"{:s}\" is not allowed in {:s}, must be one of {:s}".format(config_name, group, ", ".join(allowed)))
+
+    # Requested output variables (or all output variables of the registry):
+    if full:
+        names = [name for name, var in OUTPUT_VARIABLES.items() if (var['group'] != 'indicators') and ((full_field == True) or not is_profile(name))]
+    else:
+        names = [name for name, var in OUTPUT_VARIABLES.items() if var['config_name'] in groups[var['group']]]
+
+    # Layer geometry (LAYER_DEPTH & LAYER_HEIGHT) is implied by the fixed depth grid and not stored:
+    if profile_depth_grid is not None:
+        names = [name for name in names if not (is_profile(name) and OUTPUT_VARIABLES[name]['remap'] is None)]
+
+    return names
+
+def is_profile(name):
+    """ Returns True if the output variable has a subsurface layer dimension (z) """
+    return 'layer' in OUTPUT_VARIABLES[name]['dims']
+
+def get_profile_size():
+    """ Returns the size of the subsurface dimension: max_layers, or the number of depth intervals of the fixed depth grid """
+    if profile_depth_grid is None:
+        return max_layers
+    if ragged_profiles == True:
+        raise ValueError('Error: Ragged profiles cannot be combined with the fixed depth grid (profile_depth_grid).')
+    cutoff, resolution = profile_depth_grid
+    if (resolution <= 0.0) or (cutoff < resolution):
+        raise ValueError("profile_depth_grid = {:s} is not allowed, must be (cutoff depth, resolution) with 0 < resolution <= cutoff depth".format(str(profile_depth_grid)))
+    return int(round(cutoff / resolution))
+
+# ============================================================================================================================= #
+
+# ============================ #
+# Subsurface Variable Schedule
+# ============================ #
+
+def get_profile_timestamps(time):
+    """ Returns the output timestamps of the subsurface variables (profile_timestamps) within the simulation timestamps """
+
+    time = pd.DatetimeIndex(time)
+
+    # User-defined output timestamps (CSV) or a regular schedule (pandas frequency):
+    if str(profile_timestamps).endswith('.csv'):
+        timestamps = pd.DatetimeIndex(pd.read_csv(os.path.join(data_path,'output/output_timestamps',profile_timestamps), header = None).iloc[:,0])
+    else:
+        timestamps = pd.date_range(time[0].floor('D'), time[-1], freq = profile_timestamps)
+
+    return time[time.isin(timestamps)].values
+
+# ============================================================================================================================= #
+
+# ========================== #
+# Multi-resolution Aggregates
+# ========================== #
+
+# Aggregation levels (pandas period frequency), each reported in its own output group:
+AGGREGATION_LEVELS = OrderedDict([('daily', 'D'), ('monthly', 'M'), ('hydrological_year', None)])
+
+def get_aggregation_levels(full = False):
+    """ Returns the aggregation levels requested in the config file and their output variables (in registry order),
+        or all output variables that can be aggregated (full) """
+
+    levels_allowed = list(AGGREGATION_LEVELS.keys())
+    allowed = [name for name, var in OUTPUT_VARIABLES.items() if var['aggregation'] in ['mean','sum']]
+
+    for level, requested in aggregation_levels.items():
+        if level not in levels_allowed:
+            raise ValueError("Aggregation level = \"{:s}\" is not allowed, must be one of {:s}".format(level, ", ".join(levels_allowed)))
+        for name in requested:
+            if name not in allowed:
+                raise ValueError("Output variable = \"{:s}\" is not allowed in aggregation level {:s}, must be one of {:s}".format(name, level, ", ".join(allowed)))
+
+    return OrderedDict((level, [name for name in allowed if full or (name in aggregation_levels[level])]) for level in levels_allowed if level in aggregation_levels)
+
+def get_aggregation_periods(time, level):
+    """ Returns the period index of each timestamp and the start timestamp of each period of an aggregation level """
+
+    time = pd.DatetimeIndex(time)
+
+    # Hydrological years start on the 1st of October:
+    if level == 'hydrological_year':
+        codes, years = pd.factorize(np.where(time.month < 10, time.year, time.year + 1))
+        starts = pd.to_datetime(['{:d}-10-01'.format(year - 1) for year in years])
+    else:
+        codes, periods = pd.factorize(time.to_period(AGGREGATION_LEVELS[level]))
+        starts = periods.to_timestamp()
+
+    return codes, starts.values
+
+# ============================================================================================================================= #
+
+# ================== #
+# Derived Indicators
+# ================== #
+
+def get_indicators():
+    """ Returns the derived indicators requested in the config file (in registry order) """
+
+    allowed = list(INDICATORS.keys())
+    for name in indicators:
+        if name not in allowed:
+            raise ValueError("Indicator = \"{:s}\" is not allowed, must be one of {:s}".format(name, ", ".join(allowed)))
+
+    return [name for name in allowed if name in indicators]
+
+# ============================================================================================================================= #
+
+# ======================== #
+# Output Variable Encoding
+# ======================== #
+
+def get_output_encoding(name):
+    """ Returns the storage encoding of an output variable (dtype, fill value, shuffle filter, quantisation & integer packing) """
+
+    output_encoding_allowed = ['lossless','compact']
+    if output_encoding not in output_encoding_allowed:
+        raise ValueError("Output encoding = \"{:s}\" is not allowed, must be one of {:s}".format(output_encoding, ", ".join(output_encoding_allowed)))
+
+    var = OUTPUT_VARIABLES[name]
+    encoding = dict(dtype = var['dtype'], shuffle = True)
+    if output_encoding == 'compact':
+        encoding.update(ENCODING_PROFILES[var['encoding']])
+
+    # NetCDF does not support half precision (16bit) floats:
+    dtype = np.dtype(encoding['dtype'])
+    if (dtype == np.float16) and (output_format == 'netcdf'):
+        dtype = np.dtype(np.float32)
+    encoding['dtype'] = dtype
+
+    # Fill value (integer profiles: minimum of the data type):
+    if np.issubdtype(dtype, np.integer) and (dtype.itemsize < 4):
+        encoding['fill_value'] = np.iinfo(dtype).min
+    else:
+        encoding['fill_value'] = -9999
+
+    return encoding
+
+def encode_values(encoding, values):
+    """ Returns the values quantised / packed to their storage data type (missing values are set to the fill value) """
+
+    values = np.array(values, dtype = np.float64)
+    missing = np.isnan(values)
+
+    # Quantisation (as in netCDF4: the precision is retained to the nearest power of two):
+    if 'least_significant_digit' in encoding:
+        scale = 2.0 ** np.ceil(np.log2(10.0 ** encoding['least_significant_digit']))
+        values = np.around(values * scale) / scale
+
+    # Integer packing (values beyond the range of the data type are clipped):
+    if np.issubdtype(encoding['dtype'], np.integer):
+        if 'scale_factor' in encoding:
+            values = (values - encoding['add_offset']) / encoding['scale_factor']
+        values = np.clip(np.around(np.nan_to_num(values)), np.iinfo(encoding['dtype']).min + 1, np.iinfo(encoding['dtype']).max)
+
+    values[missing] = encoding['fill_value']
+
+    return values.astype(encoding['dtype'])
+
+# ============================================================================================================================= #
+
+# ===================== #
+# Packed Result Blocks
+# ===================== #
+
+# Node results are transported as one contiguous block per variable group (in the output precision) and a small header:
+#   'series'       :: (n_variables, t)          time series of the spatial node
+#   'profiles'     :: (n_variables, t, z)       subsurface layer profiles of the spatial node
+#   'layer_count'  :: (t)                       number of layers stored in each profile
+#   '<level>'      :: (n_variables, periods)    multi-resolution aggregates of each aggregation level (e.g. 'daily')
+#   'indicators'   :: (n_indicators, years)     derived indicators of each calendar year
+# Integer variables (e.g. FIRN_FACIE) are packed in the output precision and cast back when written to file.
+
+def get_result_layout(full = False):
+    """ Returns the result header: the names of the requested output variables stored in each result block
+        (full: all output variables of the registry & aggregation levels, the derived indicators remain as requested) """
+    names = get_output_variables(full)
+    HEADER = {'series': [name for name in names if not is_profile(name)],
+              'profiles': [name for name in names if is_profile(name)]}
+
+    # Multi-resolution aggregates ((n_variables, periods) block of each aggregation level) & derived indicators ((n_indicators, years) block):
+    HEADER.update(get_aggregation_levels(full))
+    if len(get_indicators()) > 0:
+        HEADER['indicators'] = get_indicators()
+
+    return HEADER
+
+def create_result_blocks(HEADER, shape, level_periods = {}, profile_shape = None):
+    """ Returns empty result blocks for the given header, where shape is the leading shape of each variable (profile_shape of
+        the subsurface variables, if reported on their own schedule) and level_periods is the number of periods of each aggregation
+        level (or years of the derived indicators) """
+    if profile_shape is None:
+        profile_shape = shape
+    BLOCKS = {'series': np.full((len(HEADER['series']),) + shape, np.nan, dtype = precision),
+              'profiles': np.full((len(HEADER['profiles']),) + profile_shape + (get_profile_size(),), np.nan, dtype = precision),
+              'layer_count': np.zeros(profile_shape, dtype = 'int32')}
+    for level in level_periods:
+        BLOCKS[level] = np.full((len(HEADER[level]), level_periods[level]), np.nan, dtype = precision)
+
+    # Integer variables are initialised with zeros:
+    for block, names in HEADER.items():
+        for i, name in enumerate(names):
+            if np.issubdtype(np.dtype(OUTPUT_VARIABLES[name]['dtype']), np.integer):
+                BLOCKS[block][i] = 0
+
+    return BLOCKS
+
+# ============================================================================================================================= #
@@ -0,0 +1,59 @@
+"""
+    ==================================================================
+
+                    FIXED-DEPTH PROFILE REGRIDDING FILE
+
+        This file conservatively remaps the subsurface layer profiles
+        (reported by layer index) onto a fixed depth grid down to a
+        cutoff depth (profile_depth_grid = (cutoff, resolution)).
+
+    ==================================================================
+"""
+
+import numpy as np
+from config import *
+from main.kernel.output_variables import get_profile_size
+
+# ============================================================================================================================= #
+
+def get_depth_grid():
+    """ Returns the edges of the fixed depth grid [m] (profile_depth_grid = (cutoff depth, resolution)) """
+    return np.arange(get_profile_size() + 1) * profile_depth_grid[1]
+
+def remap_profile(height, values, edges, method):
+    """ Conservatively remaps a layer profile (z) onto the intervals of the fixed depth grid:
+
+            'mean'     ::  intensive variables: overlap-weighted mean of the layers within each depth interval
+            'sum'      ::  extensive variables (per layer, e.g. [m w.e.] or [J m-2]): split in proportion to the overlap
+            'nearest'  ::  categorical variables: value of the layer at the centre of each depth interval
+
+        Depth intervals below the bottom of the profile are missing (NaN).
+    """
+
+    height = np.asarray(height, dtype = np.float64)
+    values = np.asarray(values, dtype = np.float64)
+
+    # Layer edges & bottom of the profile:
+    layer_edges = np.concatenate(([0.0], np.cumsum(height)))
+    bottom = layer_edges[-1]
+
+    if method == 'nearest':
+        centres = 0.5 * (edges[1:] + edges[:-1])
+        remapped = values[np.minimum(np.searchsorted(layer_edges[1:], centres, side = 'right'), len(values) - 1)]
+
+    else:
+        # Depth integral of the profile at the layer edges (exact for piecewise constant layers), interpolated to the grid edges:
+        per_metre = values if method == 'mean' else np.divide(values, height, out = np.zeros_like(values), where = height > 0)
+        integral = np.interp(edges, layer_edges, np.concatenate(([0.0], np.cumsum(per_metre * height))))
+        remapped = np.diff(integral)
+
+        # Intensive variables are averaged over the part of each depth interval covered by the profile:
+        if method == 'mean':
+            covered = np.diff(np.minimum(edges, bottom))
+            remapped = np.divide(remapped, covered, out = np.full_like(remapped, np.nan), where = covered > 0)
+
+    remapped[edges[:-1] >= bottom] = np.nan
+
+    return remapped
+
+# ============================================================================================================================= #
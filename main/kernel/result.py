@@ -0,0 +1,167 @@
+"""
+    ==================================================================
+
+                        RESULT (OUTPUT DATASET) FILE
+
+        This file contains helper functions for reading the model 
+        output dataset, such as re-expanding the ragged subsurface
+        profiles (ragged_profiles = True) to the padded view and 
+        rebuilding the (y,x) maps of the node-indexed output layout
+        (output_layout = 'node').
+
+    ==================================================================
+"""
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+# ============================================================================================================================= #
+
+# ========================== #
+# Ragged Subsurface Profiles
+# ========================== #
+
+def expand_ragged_profile(RESULT, name, n_layers = None):
+    """ Re-expands a ragged subsurface variable (layer_obs) of the RESULT Xarray dataset to the padded (time,y,x,layer) view
+        (or (time,node,layer) for the node-indexed output layout).
+        The RESULT dataset may first be subset in time / space, only the required layer observations are then read. 
+
+        Input:
+                RESULT          ::    Xarray output dataset (opened with xr.open_dataset)
+                name            ::    Name of the ragged subsurface variable (e.g. 'LAYER_DENSITY')
+                n_layers        ::    Length of the padded layer dimension (default: 'Max_layers' attribute)
+
+        Output:
+                PROFILE         ::    Xarray DataArray of the padded subsurface variable (time,y,x,layer) or (time,node,layer)
+    """
+
+    if n_layers is None:
+        n_layers = int(RESULT.attrs['Max_layers'])
+
+    # Offset & number of layers of each profile (non-glacier nodes are missing):
+    layer_start = np.nan_to_num(RESULT['LAYER_START'].values).astype(np.int64)
+    layer_count = np.minimum(np.nan_to_num(RESULT['LAYER_COUNT'].values).astype(np.int64), n_layers)
+
+    # Active layers of each profile & their positions along the 'layer_obs' dimension:
+    active = np.arange(n_layers) < layer_count[..., None]
+    index = (layer_start[..., None] + np.arange(n_layers))[active]
+
+    # Read only the range of layer observations that is required:
+    padded = np.full(layer_count.shape + (n_layers,), np.nan, dtype = np.promote_types(RESULT[name].dtype, np.float32))
+    if index.size > 0:
+        first, last = index.min(), index.max() + 1
+        padded[active] = RESULT[name].isel(layer_obs = slice(first, last)).values[index - first]
+
+    dims = RESULT['LAYER_COUNT'].dims
+    coords = {coord: RESULT[coord] for coord in RESULT['LAYER_COUNT'].coords}
+    coords['layer'] = np.arange(n_layers)
+
+    return xr.DataArray(padded, name = name, dims = dims + ('layer',), attrs = RESULT[name].attrs, coords = coords)
+
+def expand_ragged_profiles(RESULT, n_layers = None):
+    """ Returns the RESULT Xarray dataset with all ragged subsurface variables re-expanded to the padded view """
+
+    if 'layer_obs' not in RESULT.dims:
+        return RESULT
+
+    names = [name for name in RESULT.data_vars if RESULT[name].dims == ('layer_obs',)]
+    PADDED = RESULT.drop_vars(names + ['LAYER_START','LAYER_COUNT'])
+    PADDED.encoding.pop('unlimited_dims', None)
+    for name in names:
+        PADDED[name] = expand_ragged_profile(RESULT, name, n_layers)
+
+    return PADDED
+
+# ========================== #
+# Node-indexed Output Layout
+# ========================== #
+
+def node_to_grid(RESULT, name):
+    """ Rebuilds the (y,x) maps of a node-indexed variable (time,node[,layer]) of the RESULT Xarray dataset.
+
+        Input:
+                RESULT          ::    Xarray output dataset (output_layout = 'node')
+                name            ::    Name of the node-indexed variable (e.g. 'SURFACE_MASS_BALANCE')
+
+        Output:
+                GRID            ::    Xarray DataArray of the variable on the (time,y,x[,layer]) grid (non-glacier nodes: NaN)
+    """
+
+    VARIABLE = RESULT[name]
+    axis = VARIABLE.dims.index('node')
+
+    # Grid indexes of the simulated nodes:
+    iy = pd.Index(RESULT['y'].values).get_indexer(RESULT['node_y'].values)
+    ix = pd.Index(RESULT['x'].values).get_indexer(RESULT['node_x'].values)
+
+    # Scatter the nodes into the grid (the node axis is moved to the front for a single fancy-indexed assignment):
+    values = np.moveaxis(VARIABLE.values, axis, 0)
+    grid = np.full((RESULT.sizes['y'], RESULT.sizes['x']) + values.shape[1:], np.nan, dtype = np.promote_types(values.dtype, np.float32))
+    grid[iy, ix] = values
+    grid = np.moveaxis(grid, (0, 1), (axis, axis + 1))
+
+    dims = VARIABLE.dims[:axis] + ('y','x') + VARIABLE.dims[axis+1:]
+    coords = {dim: RESULT[dim] for dim in dims if dim in RESULT.coords}
+
+    return xr.DataArray(grid, name = name, dims = dims, attrs = VARIABLE.attrs, coords = coords)
+
+# ============================================================================================================================= #
+
+class ResultClass:
+    """ Wrapper around the model output dataset (NetCDF file, Zarr store or Xarray dataset).
+        The multi-resolution aggregates are opened with the group of their aggregation level (e.g. group = 'daily').
+        Ragged subsurface variables are only re-expanded to the padded view when they are accessed, so the dataset should
+        first be subset in time / space (isel / sel) before reading a subsurface variable. """
+
+    def __init__(self, RESULT, group = None):
+
+        # Open the output dataset:
+        if isinstance(RESULT, xr.Dataset):
+            self.RESULT = RESULT
+        elif str(RESULT).endswith('.zarr'):
+            self.RESULT = xr.open_zarr(RESULT, group = group)
+        else:
+            self.RESULT = xr.open_dataset(RESULT, group = group)
+
+        # Ragged subsurface variables (re-expanded on access):
+        self.ragged = [name for name in self.RESULT.data_vars if self.RESULT[name].dims == ('layer_obs',)]
+
+    def __getitem__(self, name):
+        if name in self.ragged:
+            return expand_ragged_profile(self.RESULT, name)
+        return self.RESULT[name]
+
+    def isel(self, **indexers):
+        """ Returns the output dataset subset by index (e.g. time = slice(0, 24)), without reading the ragged subsurface variables """
+        return ResultClass(self.RESULT.isel(**indexers))
+
+    def sel(self, **indexers):
+        """ Returns the output dataset subset by label (e.g. time = '2000-01'), without reading the ragged subsurface variables """
+        return ResultClass(self.RESULT.sel(**indexers))
+
+    def is_node_layout(self):
+        return 'node' in self.RESULT.dims
+
+    def to_grid(self, name = None):
+        """ Returns an output variable (or the whole dataset if name is None) on the (time,y,x[,layer]) grid """
+
+        if name is not None:
+            VARIABLE = self[name]
+            if self.is_node_layout() and ('node' in VARIABLE.dims):
+                return node_to_grid(self.RESULT.assign({name: VARIABLE}), name)
+            return VARIABLE
+
+        # Whole dataset: all ragged subsurface variables are re-expanded
+        RESULT = expand_ragged_profiles(self.RESULT)
+        if not self.is_node_layout():
+            return RESULT
+
+        names = [name for name in RESULT.data_vars if 'node' in RESULT[name].dims]
+        GRID = RESULT.drop_vars(names + ['node','node_y','node_x','node_easting','node_northing'])
+        for name in names:
+            GRID[name] = node_to_grid(RESULT, name)
+
+        return GRID
+
+# ============================================================================================================================= #
@@ -0,0 +1,125 @@
+"""
+    ==================================================================
+
+                          NODE SCHEDULING FILE
+
+        This file orders the spatial nodes for their submission to
+        the cluster (longest expected runtime first), so that the
+        simulation does not end with a long tail of a single busy
+        worker. The runtime of each node is predicted by a cost
+        model of its static features, fitted to the node runtimes
+        logged by previous simulations ('<data_path>/output/').
+
+    ==================================================================
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from config import *
+
+# ============================================================================================================================= #
+
+# ========== #
+# Cost Model
+# ========== #
+
+def get_node_features(STATIC, nodes):
+    """ Returns the static features of the nodes (n,f) for the cost model: elevation, aspect (north & east components), slope
+        and the glacier thickness (if provided in the static file) """
+
+    y = np.array([y for y, x in nodes], dtype = np.int64)
+    x = np.array([x for y, x in nodes], dtype = np.int64)
+
+    FEATURES = [STATIC.ELEVATION.values[y, x], np.cos(np.radians(STATIC.ASPECT.values[y, x])), np.sin(np.radians(STATIC.ASPECT.values[y, x])),
+                STATIC.SLOPE.values[y, x]]
+    if 'THICKNESS' in list(STATIC.keys()):
+        FEATURES.append(STATIC.THICKNESS.values[y, x])
+
+    return np.column_stack(FEATURES).astype(np.float64)
+
+def impute_node_features(FEATURES):
+    """ Returns the node features with their non-finite values (e.g. missing glacier thickness) replaced by the median of the finite
+        values of the feature (zero: no finite values) """
+
+    finite = np.isfinite(FEATURES)
+    medians = np.array([np.median(FEATURES[finite[:, f], f]) if finite[:, f].any() else 0.0 for f in range(FEATURES.shape[1])])
+    return np.where(finite, FEATURES, medians)
+
+def get_runtime_log():
+    """ Returns the path of the node runtimes [s per timestep] logged by the simulations (spatial co-ordinates y, x) """
+    return os.path.join(data_path, 'output', 'node_runtimes.csv')
+
+def load_node_runtimes(STATIC, nodes):
+    """ Returns the runtimes [s per timestep] of the nodes logged by previous simulations (NaN: not logged) """
+
+    RUNTIMES = np.full(len(nodes), np.nan)
+    if not os.path.isfile(get_runtime_log()):
+        return RUNTIMES
+
+    LOG = pd.read_csv(get_runtime_log())
+    logged = dict(zip(zip(LOG['y'].values, LOG['x'].values), LOG['runtime'].values))
+    for n, (y, x) in enumerate(nodes):
+        RUNTIMES[n] = logged.get((STATIC.y.values[y], STATIC.x.values[x]), np.nan)
+
+    return RUNTIMES
+
+def order_nodes(STATIC, nodes):
+    """ Returns the nodes in their order of submission to the cluster (node_ordering):
+
+            'raster'    ::    Order of the spatial grid
+            'cost'      ::    Longest predicted runtime first: logged runtimes, or a least-squares fit of the logarithmic runtime to the
+                              static features of the logged nodes. Without (enough) logged runtimes, low & sun-facing nodes (melt:
+                              percolation substeps & thin layers; south-facing in the northern, north-facing in the southern hemisphere)
+                              are expected to be the most expensive.
+    """
+
+    node_ordering_allowed = ['raster','cost']
+    if node_ordering == 'raster':
+        return nodes
+    elif node_ordering != 'cost':
+        raise ValueError("Node ordering = \"{:s}\" is not allowed, must be one of {:s}".format(node_ordering, ", ".join(node_ordering_allowed)))
+
+    # Standardised static features (non-finite features imputed):
+    FEATURES = impute_node_features(get_node_features(STATIC, nodes))
+    deviation = FEATURES.std(axis = 0)
+    FEATURES = (FEATURES - FEATURES.mean(axis = 0)) / np.where(deviation > 0, deviation, 1.0)
+    PREDICTORS = np.column_stack((np.ones(len(nodes)), FEATURES))
+
+    # Logarithmic runtime: logged, or predicted from the static features
+    RUNTIMES = load_node_runtimes(STATIC, nodes)
+    logged = np.isfinite(RUNTIMES) & (RUNTIMES > 0)
+    if np.all(logged):
+        cost = np.log(RUNTIMES)
+        print('\t Node Ordering: logged node runtimes')
+    elif np.count_nonzero(logged) > PREDICTORS.shape[1]:
+        coefficients = np.linalg.lstsq(PREDICTORS[logged], np.log(RUNTIMES[logged]), rcond = None)[0]
+        cost = np.where(logged, np.log(np.where(logged, RUNTIMES, 1.0)), PREDICTORS @ coefficients)
+        print('\t Node Ordering: cost model fitted to %s logged node runtimes' % np.count_nonzero(logged))
+    else:
+        # Sun-facing aspect: south in the northern hemisphere, north in the southern hemisphere (northward component of the aspect)
+        latitude = STATIC.LATITUDE.values[[y for y, x in nodes], [x for y, x in nodes]]
+        cost = -FEATURES[:, 0] - 0.5 * np.where(latitude < 0, -1.0, 1.0) * FEATURES[:, 1]
+        print('\t Node Ordering: elevation & aspect (no logged node runtimes)')
+
+    return [nodes[n] for n in np.argsort(-cost, kind = 'stable')]
+
+# ============================================================================================================================= #
+
+# ============ #
+# Runtime Log
+# ============ #
+
+def write_node_runtimes(STATIC, RUNTIMES):
+    """ Logs the runtimes of the simulated nodes {(indY, indX): (runtime [s], simulated timesteps)} per timestep (excluding the spin-up),
+        replacing previously logged runtimes of the same nodes (NaN: runtime not representative (cached result or compilation of the
+        model functions), the previously logged runtime is kept) """
+
+    NEW = pd.DataFrame({'y': [STATIC.y.values[y] for y, x in RUNTIMES], 'x': [STATIC.x.values[x] for y, x in RUNTIMES],
+                        'runtime': [runtime / timesteps if timesteps > 0 else np.nan for runtime, timesteps in RUNTIMES.values()]}).dropna()
+    if os.path.isfile(get_runtime_log()):
+        NEW = pd.concat([pd.read_csv(get_runtime_log()), NEW]).drop_duplicates(['y','x'], keep = 'last')
+
+    NEW.to_csv(get_runtime_log(), index = False)
+
+# ============================================================================================================================= #
@@ -0,0 +1,191 @@
+"""
+    ==================================================================
+
+                        NODE STATE HANDOFF FILE
+
+        This file splits the simulation period into successive time
+        windows and converts the subsurface grid (GRID) of a node to
+        and from a picklable state, so that a node can be simulated
+        one time window at a time with its state carried forward.
+        The final state of the nodes is also exported to (and read
+        from) restart files to continue a simulation.
+
+    ==================================================================
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import xarray as xr
+from constants import *
+from parameters import *
+from config import *
+from main.kernel.grid import Grid
+
+# ============================================================================================================================= #
+
+# ============ #
+# Time Windows
+# ============ #
+
+def get_time_windows(time):
+    """ Returns the (start, stop) timestep indexes of the successive time windows of the simulation (time_window: pandas frequency
+        of the window starts, e.g. 'YS-OCT' for hydrological years), or a single window (None) covering the whole simulation """
+
+    if time_window is None:
+        return [None]
+
+    time = pd.DatetimeIndex(time)
+    starts = np.searchsorted(time, pd.date_range(time[0].floor('D'), time[-1], freq = time_window))
+    starts = np.unique(np.concatenate(([0], starts)))
+    stops = np.append(starts[1:], len(time))
+
+    return [(int(start), int(stop)) for start, stop in zip(starts, stops)]
+
+# ============================================================================================================================= #
+
+# ================ #
+# Grid State (I/O)
+# ================ #
+
+def get_grid_state(GRID):
+    """ Returns the state of the subsurface grid (layer profiles, snow properties & column totals) as a picklable dictionary """
+
+    return {'layer_heights': np.asarray(GRID.get_height(), dtype = np.float64),
+            'layer_densities': np.asarray(GRID.get_density(), dtype = np.float64),
+            'layer_temperatures': np.asarray(GRID.get_temperature(), dtype = np.float64),
+            'average_layer_temperatures': np.asarray(GRID.get_average_temperature(), dtype = np.float64),
+            'layer_liquid_water_content': np.asarray(GRID.get_liquid_water_content(), dtype = np.float64),
+            'layer_refreezes': np.asarray(GRID.get_refreeze(), dtype = np.float64),
+            'layer_firn_refreezes': np.asarray(GRID.get_firn_refreeze(), dtype = np.float64),
+            'layer_hydro_years': np.asarray(GRID.get_hydro_year(), dtype = np.int32),
+            'layer_grain_sizes': np.asarray(GRID.get_grain_size(), dtype = np.float64),
+            'layer_ice_fraction': np.asarray(GRID.get_ice_fraction(), dtype = np.float64),
+            'base_elevation': GRID.get_base_elevation(),
+            'old_snow_age': GRID.old_snow_age,
+            'old_snow_albedo': GRID.old_snow_albedo,
+            'old_snow_SWE': GRID.old_snow_SWE,
+            'fresh_snow_age': GRID.fresh_snow_age,
+            'fresh_snow_albedo': GRID.fresh_snow_albedo,
+            'fresh_snow_SWE': GRID.fresh_snow_SWE,
+            'total_liquid_water': GRID.get_total_liquid_water(),
+            'total_mass': GRID.get_total_mass()}
+
+def restore_grid(GRID_STATE):
+    """ Rebuilds the subsurface grid from its state (see get_grid_state) """
+
+    GRID = Grid(GRID_STATE['layer_heights'],
+                GRID_STATE['layer_densities'],
+                GRID_STATE['layer_temperatures'],
+                GRID_STATE['average_layer_temperatures'],
+                GRID_STATE['layer_liquid_water_content'],
+                GRID_STATE['layer_refreezes'],
+                GRID_STATE['layer_firn_refreezes'],
+                GRID_STATE['layer_hydro_years'],
+                GRID_STATE['layer_grain_sizes'],
+                float(GRID_STATE['base_elevation']),
+                GRID_STATE['layer_ice_fraction'],
+                float(GRID_STATE['old_snow_age']),
+                float(GRID_STATE['old_snow_albedo']),
+                float(GRID_STATE['old_snow_SWE']),
+                float(GRID_STATE['fresh_snow_age']),
+                float(GRID_STATE['fresh_snow_albedo']),
+                float(GRID_STATE['fresh_snow_SWE']))
+
+    # The incrementally maintained column totals are carried over (instead of being recalculated from the layers):
+    GRID.total_liquid_water = GRID_STATE['total_liquid_water']
+    GRID.total_mass = GRID_STATE['total_mass']
+
+    return GRID
+
+# ============================================================================================================================= #
+
+# ============= #
+# Restart Files
+# ============= #
+
+# Layer profiles & scalar properties of the subsurface grid state and the physical state of a node (see fricosipy_core: get_state)
+# stored in the restart file (the running aggregates of the output variables are not carried over to a new simulation):
+RESTART_LAYERS = ['layer_heights','layer_densities','layer_temperatures','average_layer_temperatures','layer_liquid_water_content',
+                  'layer_refreezes','layer_firn_refreezes','layer_hydro_years','layer_grain_sizes','layer_ice_fraction']
+RESTART_GRID = ['base_elevation','old_snow_age','old_snow_albedo','old_snow_SWE','fresh_snow_age','fresh_snow_albedo','fresh_snow_SWE',
+                'total_liquid_water','total_mass']
+RESTART_NODE = ['melted','accumulation','surface_temperature','cumulative_mass_balance','cumulative_melt','Initial_Firn_Temperature',
+                'first_hydro_year','previous_hydro_year']
+
+def write_restart_file(STATES, STATIC, time):
+    """ Writes the final state of the simulated nodes {(y, x): STATE} at the final simulation timestamp (time) to the restart file
+        (restart_output in 'data/restart/'): layer profiles (y,x,layer) padded with NaNs beyond the number of layers of each node """
+
+    ny, nx = STATIC.sizes['y'], STATIC.sizes['x']
+    n_layers = max([len(STATE['GRID']['layer_heights']) for STATE in STATES.values()] + [1])
+    n_years = max([len(STATE['annual_mass_balances']) for STATE in STATES.values()] + [1])
+
+    RESTART = xr.Dataset(coords = {'y': STATIC.y.values, 'x': STATIC.x.values, 'layer': np.arange(n_layers), 'year': np.arange(n_years)})
+    NODES = np.zeros((ny, nx), dtype = np.int8)
+    N_LAYERS = np.zeros((ny, nx), dtype = np.int32)
+    N_YEARS = np.zeros((ny, nx), dtype = np.int32)
+    LAYERS = {name: np.full((ny, nx, n_layers), -1 if name == 'layer_hydro_years' else np.nan,
+                            dtype = np.int32 if name == 'layer_hydro_years' else np.float64) for name in RESTART_LAYERS}
+    SCALARS = {name: np.full((ny, nx), np.nan) for name in RESTART_GRID + RESTART_NODE}
+    ANNUAL_MASS_BALANCES = np.full((ny, nx, n_years), np.nan)
+
+    for (y, x), STATE in STATES.items():
+        NODES[y, x] = 1
+        N_LAYERS[y, x] = len(STATE['GRID']['layer_heights'])
+        N_YEARS[y, x] = len(STATE['annual_mass_balances'])
+        for name in RESTART_LAYERS:
+            LAYERS[name][y, x, :N_LAYERS[y, x]] = STATE['GRID'][name]
+        for name in RESTART_GRID:
+            SCALARS[name][y, x] = STATE['GRID'][name]
+        for name in RESTART_NODE:
+            SCALARS[name][y, x] = STATE[name]
+        ANNUAL_MASS_BALANCES[y, x, :N_YEARS[y, x]] = STATE['annual_mass_balances']
+
+    RESTART['RESTART_NODE'] = (('y','x'), NODES)
+    RESTART['N_LAYERS'] = (('y','x'), N_LAYERS)
+    RESTART['N_YEARS'] = (('y','x'), N_YEARS)
+    for name in RESTART_LAYERS:
+        RESTART[name] = (('y','x','layer'), LAYERS[name])
+    for name, values in SCALARS.items():
+        RESTART[name] = (('y','x'), values)
+    RESTART['annual_mass_balances'] = (('y','x','year'), ANNUAL_MASS_BALANCES)
+
+    RESTART.attrs['Restart_time'] = str(pd.Timestamp(time))
+    RESTART.attrs['Description'] = 'FRICOSIPY restart file: final state of the simulated nodes (initial state of a continued simulation)'
+
+    os.makedirs(os.path.join(data_path,'restart'), exist_ok = True)
+    RESTART.to_netcdf(os.path.join(data_path,'restart',restart_output), encoding = {name: dict(zlib = True, complevel = compression_level) for name in RESTART.data_vars})
+
+def load_restart_file(time):
+    """ Loads the restart file (restart_input in 'data/restart/'), which must end one timestep (dt) before the first simulation timestamp (time) """
+
+    RESTART = xr.open_dataset(os.path.join(data_path,'restart',restart_input)).load()
+    restart_time = pd.Timestamp(RESTART.attrs['Restart_time'])
+    if restart_time + pd.Timedelta(seconds = dt) != pd.Timestamp(time):
+        raise ValueError('Error: The simulation must start one timestep after the final timestamp of the restart file (%s).' % restart_time)
+
+    return RESTART
+
+def get_restart_state(RESTART, y, x):
+    """ Returns the state of a node (spatial co-ordinates y, x) from the restart file, or None if the node is not in the restart file """
+
+    if (y not in RESTART.y.values) or (x not in RESTART.x.values):
+        return None
+    NODE = RESTART.sel(y = y, x = x)
+    if NODE.RESTART_NODE.values == 0:
+        return None
+
+    n_layers = int(NODE.N_LAYERS.values)
+    GRID_STATE = {name: NODE[name].values[:n_layers].astype(np.int32 if name == 'layer_hydro_years' else np.float64) for name in RESTART_LAYERS}
+    GRID_STATE.update({name: float(NODE[name].values) for name in RESTART_GRID})
+
+    STATE = {name: float(NODE[name].values) for name in RESTART_NODE}
+    STATE['melted'] = bool(STATE['melted'])
+    STATE['first_hydro_year'], STATE['previous_hydro_year'] = int(STATE['first_hydro_year']), int(STATE['previous_hydro_year'])
+    STATE['GRID'] = GRID_STATE
+    STATE['annual_mass_balances'] = NODE.annual_mass_balances.values[:int(NODE.N_YEARS.values)]
+
+    return STATE
+
+# ============================================================================================================================= #
@@ -0,0 +1,63 @@
+"""
+    ==================================================================
+
+                    BACKGROUND RESULT WRITER FILE
+
+        This file contains the background writer, which takes the
+        finished node results from a bounded queue and writes them
+        into the output file, so that the simulation, the collection
+        of results and the compression / disk I/O overlap.
+
+    ==================================================================
+"""
+
+import queue
+import threading
+
+# ============================================================================================================================= #
+
+class WriterClass:
+    """ Background thread writing the node results into the output file (IO Class) from a bounded queue.
+        When the writer falls behind, the queue fills up and put() blocks the client (backpressure). """
+
+    def __init__(self, IO, maxsize):
+        self.IO = IO
+        self.queue = queue.Queue(maxsize = maxsize)
+        self.error = None
+        self.thread = threading.Thread(target = self.run, name = 'fricosipy-writer', daemon = True)
+        self.thread.start()
+
+    def put(self, NODE_RESULT):
+        """ Queues a node result (indY, indX, BLOCKS, HEADER) for writing, blocking while the queue is full """
+        self.check()
+        self.queue.put(NODE_RESULT)
+
+    def run(self):
+        """ Writes the queued node results until the end-of-results marker (None) is received """
+        while True:
+            NODE_RESULT = self.queue.get()
+            try:
+                if NODE_RESULT is None:
+                    return
+
+                # After an error the remaining results are discarded (the error is raised in the client):
+                if self.error is None:
+                    indY, indX, BLOCKS, HEADER = NODE_RESULT
+                    self.IO.write_local_results(indY, indX, BLOCKS, HEADER)
+            except Exception as error:
+                self.error = error
+            finally:
+                self.queue.task_done()
+
+    def check(self):
+        """ Raises the error of the writer thread (if any) in the client """
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        """ Waits until all queued node results are written and stops the writer thread """
+        self.queue.put(None)
+        self.thread.join()
+        self.check()
+
+# ============================================================================================================================= #
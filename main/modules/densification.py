@@ -18,14 +18,19 @@ from numba import njit
 # Dry Densification
 # ================= #
 
-def densification(GRID,dt,accumulation):
+def densification(GRID,dt,accumulation,substep = explicit_substep):
     """ This module calculates the dry densification of the snowpack """
 
+    # Time steps longer than the substep (explicit_substep) are integrated in equal substeps (numerical stability of the explicit schemes):
+    n_substeps = int(np.ceil(dt / substep))
+
     densification_allowed = ['Anderson76', 'Ligtenberg11', 'disabled']
     if dry_densification_method == 'Anderson76':
-        method_Boone(GRID,dt)
+        for _ in range(n_substeps):
+            method_Boone(GRID,dt / n_substeps)
     elif dry_densification_method == 'Ligtenberg11':
-        method_Ligtenberg(GRID,dt,accumulation)
+        for _ in range(n_substeps):
+            method_Ligtenberg(GRID,dt / n_substeps,accumulation)
     elif densification_method == 'disabled':
         pass
     else:
@@ -19,12 +19,16 @@ from numba import njit
 # Snow Metamorphism
 # ================= #
 
-def snow_metamorphism(GRID,dt):
+def snow_metamorphism(GRID,dt,substep = explicit_substep):
     """ This module determines the metamorphism of the snowpack (snow grain growth) """
 
+    # Time steps longer than the substep (explicit_substep) are integrated in equal substeps (numerical stability of the explicit scheme):
+    n_substeps = int(np.ceil(dt / substep))
+
     metamorphism_allowed = ['Katsushima09', 'disabled']
     if snow_metamorphism_method == 'Katsushima09':
-        method_Katsushima(GRID,dt)
+        for _ in range(n_substeps):
+            method_Katsushima(GRID,dt / n_substeps)
     elif snow_metamorphism_method == 'disabled':
         pass
     else:
@@ -38,12 +38,17 @@ snow_metamorphism_method = 'Katsushima09'         # Options: ['Katsushima09','di
 # ================ #
 
 # General Model Parameters:
-dt = 3600                                       # Simulation time step [s] (minimum: 3600 s / hour)
+dt = 3600                                       # Simulation time step [s] (multiple of 3600 s / hour: finer meteorological data is aggregated to the time step)
+explicit_substep = 3600                         # Maximum integration step of the explicit densification & snow metamorphism schemes [s] (longer time steps are substepped)
+quiescent_aggregation = 1                       # Maximum number of consecutive quiescent time steps (night, no precipitation, cold & dry snowpack) aggregated into a single
+                                                # thermal diffusion, snow metamorphism & densification step (1: no aggregation)
 max_depth = 50                                  # Maximum simulation depth [m]
 max_layers = 200                                # Maximum number of subsurface layers               
 
 # Meteorological Input Parameters:
 station_altitude = 3000.0                       # Altitude of meteorological station [m a.s.l.]
+station_neighbours = 3                          # Number of nearest stations interpolated to each node (multi-station meteorological data only)
+station_idw_power = 2.0                         # Inverse distance weighting power of the station interpolation [-] (multi-station meteorological data only)
 z = 2.0                                         # Meteorological data measurement height [m] (typically 2m)
 air_temperature_lapse_rate = -0.006             # Air temperature lapse rate [°C m-1] (default = -0.006)
 air_temperature_offset = 0.0                    # Air temperature offset for adjusting data in meteorlogical forcing [°C] (default = 0.0 - no modification)
@@ -109,3 +114,4 @@ initial_upper_snowpack_density = 250.0          # Top density for initial snowpa
 initial_lower_snowpack_density = 275.0          # Bottom density for initial snowpack [kg m-3]
 initial_upper_temperature = -3.0                # Upper boundary condition for initial temperature profile [°C]
 initial_lower_temperature = -1.0                # Lower boundary condition for initial temperature profile [°C] 
+initial_profile_method = 'linear'               # Options: ['linear','HerronLangway80'] (steady-state firn density profile from the mean air temperature & accumulation of each node)
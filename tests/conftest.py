@@ -0,0 +1,159 @@
+"""
+    ==================================================================
+
+                        REGRESSION TEST FIXTURES
+
+        Shared fixtures of the regression tests: a small synthetic
+        glacier (static, meteorological & illumination files), the
+        configuration of a test simulation (config.py & parameters.py
+        options) and an in-process run of the FRICOSIPY simulation.
+
+    ==================================================================
+"""
+
+import os
+import sys
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import xarray as xr
+import pytest
+
+# The model modules are imported from the repository root (as FRICOSIPY.py does):
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import config
+import parameters
+import FRICOSIPY
+
+# Simulation period of the synthetic meteorological file (hourly):
+METEO_START, METEO_END = '2000-01-01T00:00', '2000-01-20T23:00'
+
+# ============================================================================================================================= #
+
+# ================ #
+# Synthetic Inputs
+# ================ #
+
+def write_input_files(path):
+    """ Writes a small synthetic glacier into the data directory: a 3 x 4 static grid (5 glacier nodes), hourly meteorological data
+        around the melting point (diurnal melt, rain & snowfall: wet & dry periods of the snowpack) and a fully illuminated grid """
+
+    for directory in ['static','meteo','illumination','output','restart']:
+        os.makedirs(os.path.join(path, directory), exist_ok = True)
+
+    # Static file (Swiss LV95 co-ordinates):
+    import rioxarray
+    ny, nx = 3, 4
+    y = 1136500.0 + 100.0 * np.arange(ny)
+    x = 2604300.0 + 100.0 * np.arange(nx)
+    mask = np.zeros((ny, nx))
+    mask[1:3, 1:4] = 1
+    mask[1, 1] = 0
+    STATIC = xr.Dataset(coords = {'y': y, 'x': x})
+    for name, values in {'ELEVATION': 3000.0 + 100.0 * np.arange(ny)[:, None] + 50.0 * np.arange(nx)[None, :],
+                         'MASK': mask, 'SLOPE': np.full((ny, nx), 10.0), 'ASPECT': np.full((ny, nx), 180.0),
+                         'LATITUDE': np.full((ny, nx), 45.9), 'LONGITUDE': np.full((ny, nx), 7.87),
+                         'EASTING': np.broadcast_to(x, (ny, nx)).copy(), 'NORTHING': np.broadcast_to(y[:, None], (ny, nx)).copy()}.items():
+        STATIC[name] = (('y','x'), values)
+    STATIC.rio.write_crs('EPSG:2056', inplace = True)
+    STATIC.to_netcdf(os.path.join(path, 'static', 'static.nc'))
+
+    # Meteorological file:
+    time = pd.date_range(METEO_START, METEO_END, freq = 'h')
+    rng = np.random.default_rng(0)
+    METEO = xr.Dataset(coords = {'time': time})
+    METEO['T2'] = ('time', -1.0 + 5.0 * np.sin(2 * np.pi * (time.hour.values - 9) / 24) + rng.normal(0, 1, len(time)))
+    METEO['PRES'] = ('time', 700.0 + rng.normal(0, 2, len(time)))
+    METEO['RH2'] = ('time', np.clip(70.0 + rng.normal(0, 10, len(time)), 5, 100))
+    METEO['U2'] = ('time', np.abs(3.0 + rng.normal(0, 1, len(time))))
+    METEO['RRR'] = ('time', np.where(rng.random(len(time)) < 0.1, 2.0 * rng.random(len(time)), 0.0))
+    METEO['N'] = ('time', rng.random(len(time)))
+    METEO.to_netcdf(os.path.join(path, 'meteo', 'meteo.nc'))
+
+    # Illumination file (hour of the year of normal & leap years):
+    ILLUMINATION = xr.Dataset(coords = {'HOY': np.arange(1, 8785, dtype = np.float32), 'y': y, 'x': x})
+    for name in ['ILLUMINATION_NORM','ILLUMINATION_LEAP']:
+        ILLUMINATION[name] = (('HOY','y','x'), np.ones((8784, ny, nx), dtype = np.int8))
+    ILLUMINATION.to_netcdf(os.path.join(path, 'illumination', 'illumination.nc'))
+
+@pytest.fixture(scope = 'session')
+def data_path(tmp_path_factory):
+    """ Data directory of the synthetic glacier """
+    path = str(tmp_path_factory.mktemp('data'))
+    write_input_files(path)
+    return path + '/'
+
+# ============================================================================================================================= #
+
+# ============= #
+# Configuration
+# ============= #
+
+def set_option(monkeypatch, name, value):
+    """ Sets a config.py / parameters.py option in every model module that imported it (from config import *) """
+
+    source = config if hasattr(config, name) else parameters
+    if not hasattr(source, name):
+        raise KeyError('Error: %s is not a config.py or parameters.py option' % name)
+
+    original = getattr(source, name)
+    for module in list(sys.modules.values()):
+        if (module is not None) and ((module.__name__ in ['config','parameters','FRICOSIPY']) or module.__name__.startswith('main.')):
+            if (name in vars(module)) and (vars(module)[name] is original):
+                monkeypatch.setattr(module, name, value)
+
+@pytest.fixture
+def configure(monkeypatch, data_path):
+    """ Returns a function setting the options of a test simulation of the synthetic glacier (restored after the test) """
+
+    def configure(**options):
+        base = {'data_path': data_path, 'static_netcdf': 'static.nc', 'meteo_netcdf': 'meteo.nc', 'illumination_netcdf': 'illumination.nc',
+                'time_start': METEO_START, 'time_end': METEO_END, 'workers': 1, 'local_port': 0}
+        for name, value in dict(base, **options).items():
+            set_option(monkeypatch, name, value)
+
+    return configure
+
+# ============================================================================================================================= #
+
+# ========== #
+# Simulation
+# ========== #
+
+def run_simulation():
+    """ Runs the configured simulation in-process (a single threaded worker, so that the configuration applies to the worker)
+        and returns the path of the output file """
+
+    from dask.distributed import LocalCluster
+
+    IO = FRICOSIPY.IOClass()
+    METEO = IO.load_meteo_file()
+    STATIC = IO.load_static_file()
+    ILLUMINATION = IO.load_illumination_file()
+    IO.create_result_file()
+    IO.create_output_file()
+    try:
+        with LocalCluster(n_workers = 1, threads_per_worker = 1, processes = False, scheduler_port = 0, dashboard_address = None) as cluster:
+            FRICOSIPY.run_fricosipy(cluster, IO, STATIC, METEO, ILLUMINATION, datetime.now())
+    finally:
+        IO.close_output_file()
+
+    return os.path.join(FRICOSIPY.data_path, 'output', FRICOSIPY.output_netcdf)
+
+def open_output(path, group = None):
+    """ Opens (& loads) an output file of run_simulation (NetCDF file or Zarr store) """
+    if path.endswith('.zarr'):
+        return xr.open_zarr(path, group = group).load()
+    with xr.open_dataset(path, group = group) as RESULT:
+        return RESULT.load()
+
+def assert_identical_outputs(path, reference, group = None):
+    """ Asserts that two output files (or one of their groups) hold the same output variables with identical values & timestamps """
+    RESULT, REFERENCE = open_output(path, group), open_output(reference, group)
+    assert sorted(RESULT.data_vars) == sorted(REFERENCE.data_vars)
+    np.testing.assert_array_equal(RESULT['time'].values, REFERENCE['time'].values)
+    for name in REFERENCE.data_vars:
+        np.testing.assert_array_equal(RESULT[name].values, REFERENCE[name].values, err_msg = name)
@@ -0,0 +1,30 @@
+"""
+    Regression tests of the multi-resolution aggregates (aggregation_levels): the aggregates of each level match the hourly
+    output series resampled to the periods of the level.
+"""
+
+import numpy as np
+from conftest import run_simulation, open_output
+from main.kernel.output_variables import OUTPUT_VARIABLES
+
+LEVELS = {'daily': ['AIR_TEMPERATURE','LATENT','SURFACE_MELT','SURFACE_MASS_BALANCE','RUNOFF'],
+          'monthly': ['AIR_TEMPERATURE','SURFACE_MASS_BALANCE']}
+
+def test_aggregation_levels_match_resampled_series(configure):
+    """ Daily & monthly aggregates (sums & means) equal the resampled hourly series of the same simulation (within the output precision) """
+
+    configure(aggregation_levels = LEVELS, output_netcdf = 'levels.nc')
+    path = run_simulation()
+    RESULT = open_output(path)
+
+    for level, frequency in [('daily', '1D'), ('monthly', 'MS')]:
+        AGGREGATES = open_output(path, group = level)
+        for name in LEVELS[level]:
+            series = RESULT[name].astype(np.float64).resample(time = frequency)
+            expected = series.sum(skipna = False) if OUTPUT_VARIABLES[name]['aggregation'] == 'sum' else series.mean(skipna = False)
+
+            aggregate = AGGREGATES[name]
+            assert aggregate.sizes['time'] == expected.sizes['time'], (level, name)
+            np.testing.assert_array_equal(aggregate['time'].values, expected['time'].values)
+            np.testing.assert_allclose(aggregate.values, expected.transpose(*aggregate.dims).values, rtol = 1e-5,
+                                       atol = 1e-6 * np.nanmax(np.abs(expected.values)), err_msg = '%s %s' % (level, name))
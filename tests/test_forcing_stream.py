@@ -0,0 +1,42 @@
+"""
+    Regression tests of the streamed meteorological forcing (meteo_chunk_size): the forcing read & downscaled in chunks equals
+    the forcing of a single read.
+"""
+
+import numpy as np
+import FRICOSIPY
+from conftest import run_simulation, assert_identical_outputs
+from main.kernel.forcing import ForcingStream, get_node_forcing
+
+def test_forcing_chunks_match_single_read(configure):
+    """ The chunks are contiguous over [start, stop) and their concatenation equals the forcing of the whole range """
+
+    configure()
+    IO = FRICOSIPY.IOClass()
+    METEO, STATIC, ILLUMINATION = IO.load_meteo_file(), IO.load_static_file(), IO.load_illumination_file()
+    STATIC, ILLUMINATION = STATIC.isel(y = 1, x = 2), ILLUMINATION.isel(y = 1, x = 2)
+    start, stop = 7, len(METEO.time)
+
+    STREAM = ForcingStream(METEO, STATIC, ILLUMINATION, start, stop, 50)
+    chunks, chunk_stop = [], start
+    while chunk_stop < stop:
+        chunk_start, chunk_stop, FORCING = STREAM.get()
+        assert (chunk_start == (chunks[-1][1] if chunks else start)) and (chunk_stop - chunk_start <= 50)
+        chunks.append((chunk_start, chunk_stop, FORCING))
+    STREAM.close()
+
+    EXPECTED = get_node_forcing(METEO.isel(time = slice(start, stop)).load(), STATIC, ILLUMINATION)
+    for name, VAR in EXPECTED.items():
+        if VAR is None:
+            assert all(FORCING[name] is None for _, _, FORCING in chunks), name
+        else:
+            np.testing.assert_array_equal(np.concatenate([FORCING[name] for _, _, FORCING in chunks]), VAR, err_msg = name)
+
+def test_streamed_simulation_matches_single_chunk(configure):
+    """ A simulation streaming its forcing in chunks of 50 timesteps equals the simulation of a single chunk bit for bit """
+
+    configure(output_netcdf = 'single_chunk.nc')
+    reference = run_simulation()
+
+    configure(meteo_chunk_size = 50, output_netcdf = 'streamed.nc')
+    assert_identical_outputs(run_simulation(), reference)
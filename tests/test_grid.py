@@ -0,0 +1,47 @@
+"""
+    Regression tests of the subsurface grid: conservation of the incrementally maintained column totals
+    (liquid water & mass) over wet & dry cycles of the snowpack.
+"""
+
+import os
+import numpy as np
+import xarray as xr
+from constants import zero_temperature
+from parameters import grain_size_fresh_snow
+from main.kernel.init import init_snowpack
+from main.modules.percolation_refreezing import percolation_refreezing
+
+def test_column_totals_conserved_over_wet_dry_cycles(data_path):
+    """ The incremental column totals match a full recalculation after repeated wetting (percolation & refreezing),
+        snowfall, remeshing, mass removal and drying of every layer """
+
+    with xr.open_dataset(os.path.join(data_path, 'static', 'static.nc')) as STATIC:
+        GRID = init_snowpack(STATIC.isel(y = 1, x = 2).load())
+
+    for cycle in range(20):
+
+        # Wet period: liquid water in the upper layers & surface water, percolated through a temperate or cold snowpack
+        for i in range(min(GRID.get_number_layers(), 10)):
+            GRID.set_node_liquid_water_content(i, 0.02)
+            GRID.set_node_temperature(i, zero_temperature if cycle % 2 == 0 else zero_temperature - 5.0)
+        percolation_refreezing(GRID, 2000, 0.005, 3600)
+
+        # Snowfall, remeshing & surface mass loss:
+        GRID.add_fresh_snow(0.05, 250.0, zero_temperature - 3.0, 2000, grain_size_fresh_snow)
+        GRID.update_grid()
+        GRID.remove_mass(0.01)
+
+        # Dry period: every layer is dry, the incremental liquid water total only retains round-off
+        for i in range(GRID.get_number_layers()):
+            GRID.set_node_liquid_water_content(i, 0.0)
+        assert not np.any(np.asarray(GRID.get_liquid_water_content()))
+        assert abs(GRID.get_total_liquid_water()) < 1e-12
+
+    # Accumulated drift of the column totals over all cycles (the check leaves the totals unchanged):
+    error = GRID.get_column_totals_error()
+    assert error < 1e-9
+    assert GRID.get_column_totals_error() == error
+
+    # Explicit re-synchronisation with the layers:
+    GRID.reset_column_totals()
+    assert GRID.get_column_totals_error() == 0.0
@@ -0,0 +1,64 @@
+"""
+    Regression tests of the gridded meteorological forcing (time,y,x): gridded forcing holding the station data downscaled to
+    each node reproduces the forcing & meteorological output of the station simulation.
+"""
+
+import os
+import numpy as np
+import xarray as xr
+import FRICOSIPY
+from constants import zero_temperature, g, M, R
+from parameters import station_altitude, air_temperature_lapse_rate, precipitation_lapse_rate
+from conftest import run_simulation, open_output
+from main.kernel.forcing import is_gridded, get_node_forcing
+
+def write_gridded_meteo_file(data_path):
+    """ Writes the station data of the synthetic glacier downscaled to every node of the static grid (lapse rates & barometric equation) """
+
+    path = os.path.join(data_path, 'meteo', 'gridded.nc')
+    if os.path.exists(path):
+        return
+
+    with xr.open_dataset(os.path.join(data_path, 'meteo', 'meteo.nc')) as METEO, xr.open_dataset(os.path.join(data_path, 'static', 'static.nc')) as STATIC:
+        dz = STATIC.ELEVATION - station_altitude
+        GRIDDED = METEO.copy()
+        GRIDDED['T2'] = METEO.T2 + dz * air_temperature_lapse_rate
+        GRIDDED['PRES'] = METEO.PRES * np.power((GRIDDED.T2 + zero_temperature) / (METEO.T2 + zero_temperature), (-g * M) / (R * air_temperature_lapse_rate))
+        GRIDDED['RRR'] = METEO.RRR * (1 + dz * precipitation_lapse_rate)
+        for name in ['RH2','U2','N']:
+            GRIDDED[name] = METEO[name].broadcast_like(dz)
+        GRIDDED.transpose('time','y','x').load().to_netcdf(path)
+
+def test_gridded_forcing_matches_downscaled_station_forcing(configure, data_path):
+    """ The forcing of a node column of the gridded data equals the station forcing downscaled to the node """
+
+    write_gridded_meteo_file(data_path)
+    configure()
+    IO = FRICOSIPY.IOClass()
+    STATION, STATIC, ILLUMINATION = IO.load_meteo_file(), IO.load_static_file(), IO.load_illumination_file()
+    configure(meteo_netcdf = 'gridded.nc')
+    GRIDDED = IO.load_meteo_file()
+    assert is_gridded(GRIDDED) and not is_gridded(STATION)
+
+    for y, x in [(1, 2), (2, 3)]:
+        EXPECTED = get_node_forcing(STATION.load(), STATIC.isel(y = y, x = x), ILLUMINATION.isel(y = y, x = x))
+        FORCING = get_node_forcing(GRIDDED.isel(y = y, x = x).load(), STATIC.isel(y = y, x = x), ILLUMINATION.isel(y = y, x = x))
+        for name, VAR in EXPECTED.items():
+            if VAR is None:
+                assert FORCING[name] is None, name
+            else:
+                np.testing.assert_allclose(FORCING[name], VAR, rtol = 1e-10, err_msg = name)
+
+def test_gridded_simulation_matches_station_simulation(configure, data_path):
+    """ Each node reads its own column of the gridded data: the meteorological output equals the station simulation """
+
+    write_gridded_meteo_file(data_path)
+    names = ['AIR_TEMPERATURE','AIR_PRESSURE','RELATIVE_HUMIDITY','WIND_SPEED']
+    configure(meteorological_variables = names, output_netcdf = 'station_forcing.nc')
+    REFERENCE = open_output(run_simulation())
+
+    configure(meteorological_variables = names, meteo_netcdf = 'gridded.nc', output_netcdf = 'gridded_forcing.nc')
+    RESULT = open_output(run_simulation())
+
+    for name in names:
+        np.testing.assert_allclose(RESULT[name].values, REFERENCE[name].values, rtol = 1e-6, err_msg = name)
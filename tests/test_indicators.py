@@ -0,0 +1,31 @@
+"""
+    Regression tests of the derived indicators (indicators): the annual indicators of the 'indicators' output group match the
+    hourly output series of the same simulation.
+"""
+
+import numpy as np
+import pandas as pd
+from conftest import run_simulation, open_output
+
+def test_indicators_match_hourly_series(configure):
+    """ Melt hours & days, first & last melt day and the maximum snow height equal their evaluation from the hourly series """
+
+    configure(indicators = ['MELT_HOURS','MELT_DAYS','FIRST_MELT_DAY','LAST_MELT_DAY','MAX_SNOW_HEIGHT'],
+              surface_mass_fluxes = ['SURFACE_MELT'], other = ['SNOW_HEIGHT'], output_netcdf = 'indicators.nc')
+    path = run_simulation()
+    RESULT, INDICATORS = open_output(path), open_output(path, group = 'indicators')
+
+    np.testing.assert_array_equal(INDICATORS['year'].values, [2000])
+    glacier = RESULT['MASK'].values == 1
+    time = pd.DatetimeIndex(RESULT['time'].values)
+
+    melt = RESULT['SURFACE_MELT'].values[:, glacier] > 0.0
+    assert melt.any()
+    melt_days = [time.normalize()[melt[:, i]].unique() for i in range(melt.shape[1])]
+
+    np.testing.assert_array_equal(INDICATORS['MELT_HOURS'].values[0, glacier], melt.sum(axis = 0))
+    np.testing.assert_array_equal(INDICATORS['MELT_DAYS'].values[0, glacier], [len(days) for days in melt_days])
+    np.testing.assert_array_equal(INDICATORS['FIRST_MELT_DAY'].values[0, glacier], [days[0].dayofyear for days in melt_days])
+    np.testing.assert_array_equal(INDICATORS['LAST_MELT_DAY'].values[0, glacier], [days[-1].dayofyear for days in melt_days])
+    np.testing.assert_array_equal(INDICATORS['MAX_SNOW_HEIGHT'].values[0, glacier], RESULT['SNOW_HEIGHT'].values[:, glacier].max(axis = 0))
+    assert np.all(np.isnan(INDICATORS['MELT_HOURS'].values[0, ~glacier]))
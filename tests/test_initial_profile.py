@@ -0,0 +1,87 @@
+"""
+    Regression tests of the steady-state initial firn profile (initial_profile_method = 'HerronLangway80'): the Herron & Langway
+    (1980) density-depth relation and the initial snowpack built from the climate of a node.
+"""
+
+import os
+import numpy as np
+import xarray as xr
+import FRICOSIPY
+from constants import ice_density, zero_temperature
+from parameters import initial_upper_snowpack_density, snow_ice_threshold
+from main.kernel.init import init_snowpack, herron_langway_density, herron_langway_depth, herron_langway_critical_depth
+from main.kernel.forcing import get_node_forcing, get_node_climate
+from main.kernel.fricosipy_core import init_node_snowpack
+
+CLIMATE = (263.15, 0.5)                 # Mean air temperature [K] & annual accumulation [m w.e. a-1]
+
+def load_node(data_path, thickness = None):
+    """ Returns the static data of node (1, 2) of the synthetic glacier (optionally with a glacier thickness) """
+    with xr.open_dataset(os.path.join(data_path, 'static', 'static.nc')) as STATIC:
+        NODE = STATIC.isel(y = 1, x = 2).load()
+    return NODE if thickness is None else NODE.assign(THICKNESS = thickness)
+
+def test_herron_langway_density_depth_relation():
+    """ The density increases from the surface density towards the ice density, continuously across the critical depth,
+        and the depth of a density inverts the density profile """
+
+    depths = np.linspace(0.0, 150.0, 1501)
+    densities = herron_langway_density(depths, *CLIMATE)
+    assert np.isclose(densities[0], initial_upper_snowpack_density)
+    assert np.all(np.diff(densities) > 0.0) and np.all(densities < ice_density)
+    assert np.isclose(herron_langway_density(herron_langway_critical_depth(CLIMATE[0]), *CLIMATE), 550.0)
+
+    for density in [300.0, 550.0, 700.0, snow_ice_threshold]:
+        np.testing.assert_allclose(herron_langway_density(herron_langway_depth(density, *CLIMATE), *CLIMATE), density, rtol = 1e-10)
+
+    # Higher accumulation buries the firn deeper (stage 2), warmer firn densifies faster:
+    assert herron_langway_depth(snow_ice_threshold, CLIMATE[0], 1.0) > herron_langway_depth(snow_ice_threshold, *CLIMATE)
+    assert herron_langway_depth(snow_ice_threshold, CLIMATE[0] + 5.0, CLIMATE[1]) < herron_langway_depth(snow_ice_threshold, *CLIMATE)
+
+def test_steady_state_snowpack(configure, data_path):
+    """ The firn extends to the snow-ice threshold depth with the steady-state densities at the layer midpoints, above glacier ice,
+        and the column is isothermal at the mean air temperature """
+
+    configure(initial_profile_method = 'HerronLangway80')
+    GRID = init_snowpack(load_node(data_path, 100.0), CLIMATE)
+
+    heights, densities = np.asarray(GRID.get_height()), np.asarray(GRID.get_density())
+    firn = densities < ice_density
+    assert np.all(firn[:np.sum(firn)]) and np.all(densities[~firn] == ice_density)
+    np.testing.assert_allclose(np.sum(heights[firn]), herron_langway_depth(snow_ice_threshold, *CLIMATE), rtol = 1e-10)
+    np.testing.assert_allclose(densities[firn], herron_langway_density(np.cumsum(heights[firn]) - heights[firn] / 2.0, *CLIMATE), rtol = 1e-5)        # Grid densities from the ice fractions
+    np.testing.assert_allclose(GRID.get_temperature(), CLIMATE[0], rtol = 1e-12)
+
+    # Firn limited to the glacier thickness, temperatures capped at the melting point:
+    GRID = init_snowpack(load_node(data_path, 30.0), (zero_temperature + 2.0, CLIMATE[1]))
+    assert np.all(np.asarray(GRID.get_density()) < ice_density)
+    np.testing.assert_allclose(np.sum(GRID.get_height()), 30.0, rtol = 1e-10)
+    np.testing.assert_allclose(GRID.get_temperature(), zero_temperature, rtol = 1e-12)
+
+def test_linear_profile_without_accumulation(configure, data_path):
+    """ Nodes without accumulation (and the linear method) are initialised with the linear profiles """
+
+    configure()
+    EXPECTED = init_snowpack(load_node(data_path))
+    configure(initial_profile_method = 'HerronLangway80')
+    for GRID in [init_snowpack(load_node(data_path), (CLIMATE[0], 0.0)), init_snowpack(load_node(data_path))]:
+        for getter in ['get_height','get_density','get_temperature']:
+            np.testing.assert_array_equal(getattr(GRID, getter)(), getattr(EXPECTED, getter)(), err_msg = getter)
+
+def test_node_climate_from_forcing(configure):
+    """ The climate of a node is the mean air temperature & the annual solid precipitation of its forcing over the simulation period """
+
+    configure(initial_profile_method = 'HerronLangway80', meteo_chunk_size = 100)
+    IO = FRICOSIPY.IOClass()
+    METEO, STATIC, ILLUMINATION = IO.load_meteo_file(), IO.load_static_file(), IO.load_illumination_file()
+    NODE, NODE_ILLUMINATION = STATIC.isel(y = 1, x = 2), ILLUMINATION.isel(y = 1, x = 2)
+
+    FORCING = get_node_forcing(METEO.load(), NODE, NODE_ILLUMINATION)
+    snow_fraction = 0.5 * (-np.tanh(FORCING['T2'] - zero_temperature) + 1.0)
+    years = len(METEO.time) * 3600 / (365.25 * 86400)
+    temperature, accumulation = get_node_climate(METEO, NODE, NODE_ILLUMINATION)
+    np.testing.assert_allclose(temperature, np.mean(FORCING['T2']), rtol = 1e-10)
+    np.testing.assert_allclose(accumulation, np.sum(FORCING['RRR'] / 1000.0 * snow_fraction) / years, rtol = 1e-10)
+
+    GRID, EXPECTED = init_node_snowpack(NODE, METEO, NODE_ILLUMINATION), init_snowpack(NODE, (temperature, accumulation))
+    np.testing.assert_array_equal(GRID.get_density(), EXPECTED.get_density())
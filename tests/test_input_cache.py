@@ -0,0 +1,60 @@
+"""
+    Regression tests of the on-disk input cache (input_cache): cache entries & their eviction, and simulations reading the
+    downscaled forcing from the cache.
+"""
+
+import os
+import numpy as np
+import main.kernel.forcing
+from conftest import run_simulation, assert_identical_outputs
+from main.kernel.cache import get_cache_key, get_cache_path, load_cache_entry, store_cache_entry
+
+def test_cache_entries_round_trip(configure, tmp_path):
+    """ Stored arrays are memory-mapped read-only, other objects unpickled, missing entries are not cached """
+
+    configure(data_path = str(tmp_path) + '/')
+    T2 = np.linspace(260.0, 275.0, 100)
+    key = get_cache_key('node', T2, (1, 2))
+    store_cache_entry('forcing', key, {'T2': T2, 'HEADER': {'series': ['T2']}})
+
+    ENTRY = load_cache_entry('forcing', key)
+    assert isinstance(ENTRY['T2'], np.memmap) and not ENTRY['T2'].flags.writeable
+    np.testing.assert_array_equal(ENTRY['T2'], T2)
+    assert ENTRY['HEADER'] == {'series': ['T2']}
+    assert load_cache_entry('forcing', get_cache_key('node', T2, (1, 3))) is None
+
+    # Keys depend on the values & data type of the arrays:
+    assert get_cache_key('node', T2, (1, 2)) == key
+    assert get_cache_key('node', T2.astype(np.float32), (1, 2)) != key
+    assert get_cache_key('node', T2 + 1e-9, (1, 2)) != key
+
+def test_least_recently_used_entries_evicted(configure, tmp_path):
+    """ Above the cache size limit, the least recently used entries are evicted """
+
+    configure(data_path = str(tmp_path) + '/', input_cache_size = 2e-5)             # 20 kB: 2 entries of 8 kB
+    keys = [get_cache_key(i) for i in range(3)]
+    for i, key in enumerate(keys[:2]):
+        store_cache_entry('forcing', key, {'T2': np.zeros(1000)})
+        os.utime(os.path.join(get_cache_path('forcing'), key), (i, i))
+
+    # The first entry is used again, the second becomes the least recently used:
+    assert load_cache_entry('forcing', keys[0]) is not None
+    store_cache_entry('forcing', keys[2], {'T2': np.zeros(1000)})
+
+    assert sorted(os.listdir(get_cache_path('forcing'))) == sorted([keys[0], keys[2]])
+
+def test_cached_forcing_simulation(configure, monkeypatch):
+    """ A repeated simulation reads the whole downscaled forcing from the cache, identical to the simulation without cache """
+
+    configure(meteo_chunk_size = 100, output_netcdf = 'uncached.nc')
+    reference = run_simulation()
+
+    configure(input_cache = True, meteo_chunk_size = 100, output_netcdf = 'cached.nc')
+    run_simulation()
+    assert len(os.listdir(get_cache_path('forcing'))) > 0
+
+    def get_node_forcing(*args, **kwargs):
+        raise AssertionError('Error: forcing downscaled despite the input cache')
+    monkeypatch.setattr(main.kernel.forcing, 'get_node_forcing', get_node_forcing)
+
+    assert_identical_outputs(run_simulation(), reference)
@@ -0,0 +1,70 @@
+"""
+    Regression tests of model timesteps coarser than the meteorological data (dt > 3600 s): aggregation of the forcing to the
+    model timestep and output timestamps on the aggregated simulation timestamps (reduced_output).
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import xarray as xr
+import pytest
+import FRICOSIPY
+from conftest import run_simulation, open_output
+from main.kernel.forcing import resample_forcing
+
+def get_hourly_meteo(hours = 11):
+    """ Returns hourly meteorological data (the last model timestep of 3 hours is incomplete) """
+    time = pd.date_range('2000-01-01T00:00', periods = hours, freq = 'h')
+    return xr.Dataset({'T2': ('time', np.arange(hours, dtype = np.float64)), 'RRR': ('time', np.ones(hours))}, coords = {'time': time})
+
+def test_forcing_aggregated_to_model_timestep(configure):
+    """ Precipitation is summed & other variables are averaged over each model timestep, incomplete timesteps are dropped """
+
+    configure(dt = 10800)
+    METEO = resample_forcing(get_hourly_meteo())
+
+    np.testing.assert_array_equal(METEO.time.values, pd.date_range('2000-01-01T00:00', periods = 3, freq = '3h').values)
+    np.testing.assert_array_equal(METEO.T2.values, [1.0, 4.0, 7.0])
+    np.testing.assert_array_equal(METEO.RRR.values, [3.0, 3.0, 3.0])
+
+    # Meteorological data on the model timestep is unchanged:
+    configure(dt = 3600)
+    xr.testing.assert_identical(resample_forcing(get_hourly_meteo()), get_hourly_meteo())
+
+def test_irregular_forcing_rejected(configure):
+    """ The meteorological timestep must be regular & divide the model timestep """
+
+    configure(dt = 10800)
+    with pytest.raises(ValueError, match = 'regular timestep'):
+        resample_forcing(get_hourly_meteo().isel(time = [0, 1, 2, 4, 5, 6]))
+    with pytest.raises(ValueError, match = 'regular timestep'):
+        resample_forcing(get_hourly_meteo().isel(time = slice(None, None, 2)))
+    configure(dt = 5400)
+    with pytest.raises(ValueError, match = 'multiple of an hour'):
+        resample_forcing(get_hourly_meteo())
+
+def write_output_timestamps(data_path, name, timestamps):
+    """ Writes a CSV file of output timestamps (reduced_output) """
+    os.makedirs(os.path.join(data_path, 'output', 'output_timestamps'), exist_ok = True)
+    pd.Series(timestamps).to_csv(os.path.join(data_path, 'output', 'output_timestamps', name), header = False, index = False)
+
+def test_output_timestamps_on_model_timestep(configure, data_path):
+    """ The output timestamps end on the final aggregated simulation timestamp (not time_end) and report the state of the
+        simulation with all timestamps, output timestamps off the model timestep are rejected """
+
+    configure(dt = 10800, output_netcdf = 'timestep_full.nc')
+    REFERENCE = open_output(run_simulation())
+    assert REFERENCE.time.values[-1] == np.datetime64('2000-01-20T21:00')
+
+    write_output_timestamps(data_path, 'timestep_daily.csv', ['2000-01-05 12:00', '2000-01-10 00:00', '2000-01-15 06:00'])
+    configure(dt = 10800, reduced_output = True, output_timestamps = 'timestep_daily.csv', output_netcdf = 'timestep_reduced.nc')
+    RESULT = open_output(run_simulation())
+
+    np.testing.assert_array_equal(RESULT.time.values, np.array(['2000-01-05T12:00', '2000-01-10T00:00', '2000-01-15T06:00', '2000-01-20T21:00'], dtype = 'datetime64[ns]'))
+    for name in ['SNOW_HEIGHT','TOTAL_HEIGHT']:
+        np.testing.assert_allclose(RESULT[name].values, REFERENCE[name].sel(time = RESULT.time).values, rtol = 1e-6, err_msg = name)
+
+    write_output_timestamps(data_path, 'timestep_hourly.csv', ['2000-01-05 12:00', '2000-01-10 01:00'])
+    configure(dt = 10800, reduced_output = True, output_timestamps = 'timestep_hourly.csv')
+    with pytest.raises(ValueError, match = 'model timestep'):
+        FRICOSIPY.IOClass().load_meteo_file()
@@ -0,0 +1,36 @@
+"""
+    Regression tests of the node-indexed output layout (output_layout = 'node'): the nodes scattered back onto the grid
+    (node_to_grid & ResultClass.to_grid) equal the grid output layout.
+"""
+
+import numpy as np
+from conftest import run_simulation, open_output
+from main.kernel.output_variables import OUTPUT_VARIABLES
+from main.kernel.result import ResultClass, node_to_grid
+
+def test_node_layout_matches_grid_layout(configure):
+    """ Only the glacier nodes are stored, their time series & profiles on the grid equal the grid layout bit for bit """
+
+    configure(full_field = True, subsurface_variables = ['DENSITY','TEMPERATURE'], output_netcdf = 'grid_layout.nc')
+    REFERENCE = open_output(run_simulation())
+
+    configure(full_field = True, subsurface_variables = ['DENSITY','TEMPERATURE'], output_layout = 'node', output_netcdf = 'node_layout.nc')
+    path = run_simulation()
+    NODES = open_output(path)
+
+    assert NODES.sizes['node'] == int(REFERENCE['MASK'].sum())
+    names = [name for name in REFERENCE.data_vars if name in OUTPUT_VARIABLES]
+    assert all('node' in NODES[name].dims for name in names)
+
+    # Single variables (node_to_grid & ResultClass.to_grid):
+    for name in ['SURFACE_MASS_BALANCE','LAYER_DENSITY']:
+        GRID = node_to_grid(NODES, name)
+        assert GRID.dims == REFERENCE[name].dims
+        np.testing.assert_array_equal(GRID.values, REFERENCE[name].values, err_msg = name)
+        np.testing.assert_array_equal(ResultClass(path).to_grid(name).values, REFERENCE[name].values, err_msg = name)
+
+    # Whole dataset:
+    GRID = ResultClass(path).to_grid()
+    for name in names:
+        assert GRID[name].dims == REFERENCE[name].dims, name
+        np.testing.assert_array_equal(GRID[name].values, REFERENCE[name].values, err_msg = name)
@@ -0,0 +1,40 @@
+"""
+    Regression tests of the per-variable output encoding (output_encoding = 'compact'): the quantised & packed output variables
+    decode to the lossless output within the precision of their encoding profile.
+"""
+
+import netCDF4
+import numpy as np
+from conftest import run_simulation, open_output
+from main.kernel.output_variables import OUTPUT_VARIABLES, ENCODING_PROFILES, get_output_encoding
+
+def get_tolerance(profile):
+    """ Returns the largest decoding error of an encoding profile (rounding to the stored precision) """
+    if 'least_significant_digit' in profile:
+        return 0.5 * 10.0 ** -profile['least_significant_digit']
+    return 0.5 * profile.get('scale_factor', 0.0)
+
+def test_compact_encoding_round_trip(configure):
+    """ Every output variable is stored in the data type of its profile & decodes to the lossless output (missing values preserved) """
+
+    options = {'full_field': True, 'other': ['SNOW_HEIGHT','SURFACE_ALBEDO','N_LAYERS','FIRN_FACIE']}
+
+    configure(output_netcdf = 'lossless.nc', **options)
+    REFERENCE = open_output(run_simulation())
+
+    configure(output_encoding = 'compact', output_netcdf = 'compact.nc', **options)
+    path = run_simulation()
+    RESULT = open_output(path)
+
+    names = [name for name in OUTPUT_VARIABLES if OUTPUT_VARIABLES[name]['netcdf_name'] in REFERENCE.data_vars]
+    with netCDF4.Dataset(path) as OUTPUT:
+        for name in names:
+            assert OUTPUT[OUTPUT_VARIABLES[name]['netcdf_name']].dtype == get_output_encoding(name)['dtype'], name
+    assert any(np.issubdtype(get_output_encoding(name)['dtype'], np.integer) for name in names)
+
+    for name in names:
+        netcdf_name = OUTPUT_VARIABLES[name]['netcdf_name']
+        profile = ENCODING_PROFILES[OUTPUT_VARIABLES[name]['encoding']]
+        values, expected = RESULT[netcdf_name].values.astype(np.float64), REFERENCE[netcdf_name].values.astype(np.float64)
+        np.testing.assert_array_equal(np.isnan(values), np.isnan(expected), err_msg = name)
+        np.testing.assert_allclose(values, expected, rtol = 1e-6, atol = get_tolerance(profile) * (1 + 1e-6), err_msg = name)
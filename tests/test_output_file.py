@@ -0,0 +1,30 @@
+"""
+    Regression tests of the incremental writing of the node results into the output NetCDF file: node-region chunks & fill values.
+"""
+
+import netCDF4
+import numpy as np
+from conftest import run_simulation, open_output
+from main.kernel.output_variables import OUTPUT_VARIABLES
+
+def test_node_results_written_into_their_regions(configure, data_path):
+    """ Every output variable is chunked by node region, glacier nodes are written and non-glacier nodes keep the fill value """
+
+    configure(full_field = True, other = ['SNOW_HEIGHT','SURFACE_TEMPERATURE','FIRN_FACIE'], output_netcdf = 'regions.nc')
+    path = run_simulation()
+    RESULT = open_output(path)
+    glacier = RESULT['MASK'].values == 1
+    names = [name for name in RESULT.data_vars if name in OUTPUT_VARIABLES]
+
+    with netCDF4.Dataset(path) as OUTPUT:
+        for name in names:
+            chunks = OUTPUT[name].chunking()
+            assert chunks[1:3] == [1, 1], name
+            if 'layer' not in RESULT[name].dims:
+                assert chunks[0] == RESULT.sizes['time'], name
+
+    # Time series & the surface layer of the profiles of the glacier nodes are written:
+    for name in names:
+        values = RESULT[name].values
+        assert np.all(np.isnan(values[:, ~glacier])), name
+        assert np.all(np.isfinite(values[:, glacier] if values.ndim == 3 else values[:, glacier, 0])), name
@@ -0,0 +1,35 @@
+"""
+    Regression tests of the output variables registry: only the requested output variables are computed & written, with the
+    values of the full simulation.
+"""
+
+import numpy as np
+import pytest
+from conftest import run_simulation, open_output
+from main.kernel.output_variables import OUTPUT_VARIABLES, get_output_variables
+
+REQUESTED = {'meteorological_variables': ['AIR_TEMPERATURE'], 'surface_energy_fluxes': ['LATENT','MELT_ENERGY'],
+             'surface_mass_fluxes': ['SURFACE_MASS_BALANCE'], 'subsurface_mass_fluxes': [], 'other': ['SNOW_HEIGHT','FIRN_TEMPERATURE']}
+
+def test_requested_output_variables(configure):
+    """ The requested variables are returned in registry order, unknown variables are rejected """
+
+    configure(**REQUESTED)
+    assert get_output_variables() == ['AIR_TEMPERATURE','LATENT','MELT_ENERGY','SURFACE_MASS_BALANCE','SNOW_HEIGHT','FIRN_TEMPERATURE']
+
+    configure(other = ['SNOW_HEIGHT','SNOW_DEPTH'])
+    with pytest.raises(ValueError, match = 'SNOW_DEPTH'):
+        get_output_variables()
+
+def test_requested_subset_matches_full_output(configure):
+    """ A simulation of a subset of the output variables writes only these variables, identical to the full simulation """
+
+    configure(output_netcdf = 'all_variables.nc')
+    REFERENCE = open_output(run_simulation())
+
+    configure(output_netcdf = 'subset.nc', **REQUESTED)
+    RESULT = open_output(run_simulation())
+
+    assert [name for name in RESULT.data_vars if name in OUTPUT_VARIABLES] == get_output_variables()
+    for name in get_output_variables():
+        np.testing.assert_array_equal(RESULT[name].values, REFERENCE[name].values, err_msg = name)
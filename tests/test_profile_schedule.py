@@ -0,0 +1,33 @@
+"""
+    Regression tests of the output schedule of the subsurface variables (profile_timestamps): profiles sampled on their own
+    'profile_time' co-ordinate equal the profiles reported with the surface variables at the same timestamps.
+"""
+
+import numpy as np
+import pandas as pd
+from conftest import run_simulation, open_output, METEO_START, METEO_END
+from main.kernel.output_variables import OUTPUT_VARIABLES
+
+def test_daily_profiles_match_hourly_profiles(configure):
+    """ Daily profiles equal the hourly profiles at midnight, the surface variables are unchanged """
+
+    options = {'full_field': True, 'subsurface_variables': ['DEPTH','DENSITY','TEMPERATURE','WATER_CONTENT']}
+
+    configure(output_netcdf = 'hourly_profiles.nc', **options)
+    REFERENCE = open_output(run_simulation())
+
+    configure(profile_timestamps = 'D', output_netcdf = 'daily_profiles.nc', **options)
+    RESULT = open_output(run_simulation())
+
+    profile_time = pd.date_range(METEO_START, METEO_END, freq = 'D').values
+    np.testing.assert_array_equal(RESULT['profile_time'].values, profile_time)
+    np.testing.assert_array_equal(RESULT['time'].values, REFERENCE['time'].values)
+
+    names = [var['netcdf_name'] for var in OUTPUT_VARIABLES.values() if var['netcdf_name'] in RESULT.data_vars]
+    for name in names:
+        if 'layer' in RESULT[name].dims:
+            assert RESULT[name].dims[0] == 'profile_time', name
+            expected = REFERENCE[name].sel(time = profile_time).values
+        else:
+            expected = REFERENCE[name].values
+        np.testing.assert_array_equal(RESULT[name].values, expected, err_msg = name)
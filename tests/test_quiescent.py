@@ -0,0 +1,66 @@
+"""
+    Regression tests of the quiescent fast path (quiescent_aggregation): aggregated quiescent timesteps reproduce the surface
+    output of the timestep-by-timestep simulation, and the fast path statistics of a node.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import FRICOSIPY
+from conftest import run_simulation, open_output, METEO_START, METEO_END
+from main.kernel.fricosipy_core import fricosipy_core
+
+# Tolerances of the surface output with aggregated quiescent timesteps (the surface energy balance is solved against an older subsurface profile):
+SURFACE_TOLERANCES = {'SURFACE_TEMPERATURE': 0.5, 'SURFACE_MELT': 5e-5, 'SURFACE_MASS_BALANCE': 5e-5, 'MASS_BALANCE': 5e-5,
+                      'SNOW_HEIGHT': 5e-3, 'TOTAL_HEIGHT': 5e-3}
+
+def write_daily_timestamps(data_path):
+    """ Writes daily output timestamps at noon (reduced_output): the quiescent nights are aggregated between the outputs """
+    os.makedirs(os.path.join(data_path, 'output', 'output_timestamps'), exist_ok = True)
+    timestamps = pd.date_range(METEO_START, METEO_END, freq = 'D') + pd.Timedelta(hours = 12)
+    pd.Series(timestamps.strftime('%Y-%m-%d %H:%M')).to_csv(os.path.join(data_path, 'output', 'output_timestamps', 'quiescent_daily.csv'), header = False, index = False)
+
+def test_aggregated_surface_output(configure, data_path):
+    """ The surface output with aggregated quiescent timesteps matches the simulation of every timestep within the tolerances
+        of the aggregated subsurface steps """
+
+    write_daily_timestamps(data_path)
+    RESULTS = {}
+    for aggregation in [1, 6]:
+        configure(quiescent_aggregation = aggregation, reduced_output = True, output_timestamps = 'quiescent_daily.csv',
+                  output_netcdf = 'quiescent_%s.nc' % aggregation)
+        RESULTS[aggregation] = open_output(run_simulation())
+
+    for name, tolerance in SURFACE_TOLERANCES.items():
+        np.testing.assert_array_equal(np.isnan(RESULTS[6][name].values), np.isnan(RESULTS[1][name].values), err_msg = name)
+        np.testing.assert_allclose(RESULTS[6][name].values, RESULTS[1][name].values, rtol = 0, atol = tolerance, err_msg = name)
+
+def get_quiescent_statistics(configure, **options):
+    """ Simulates node (1, 2) over the whole period and returns its fast path statistics (quiescent timesteps, timesteps,
+        skipped percolation calls & aggregated subsurface steps) """
+    configure(**options)
+    IO = FRICOSIPY.IOClass()
+    METEO, STATIC, ILLUMINATION = IO.load_meteo_file(), IO.load_static_file(), IO.load_illumination_file()
+    n_timesteps = METEO.sizes['time']
+    BLOCKS = fricosipy_core(STATIC.isel(y = 1, x = 2), METEO, ILLUMINATION.isel(y = 1, x = 2), 1, 2, n_timesteps, (0, n_timesteps))[2]
+    return BLOCKS['quiescent'], n_timesteps
+
+def test_quiescent_statistics(configure, data_path):
+    """ Quiescent timesteps skip the percolation of the dry column, and are aggregated up to quiescent_aggregation timesteps
+        unless an output reads the column on every timestep """
+
+    write_daily_timestamps(data_path)
+    (n_quiescent, n_timesteps, n_skipped, n_aggregated), nt = get_quiescent_statistics(configure, quiescent_aggregation = 1)
+    assert (n_timesteps == nt) and (0 < n_quiescent < nt)
+    assert (0 < n_skipped < n_quiescent) and (n_aggregated == 0)
+
+    (n_quiescent, n_timesteps, n_skipped, n_aggregated), nt = get_quiescent_statistics(configure, quiescent_aggregation = 6, reduced_output = True,
+                                                                                         output_timestamps = 'quiescent_daily.csv')
+    assert (n_timesteps == nt) and (0 < n_quiescent < nt) and (0 < n_skipped < n_quiescent)
+    assert np.ceil(n_quiescent / 6) <= n_aggregated < n_quiescent
+
+    # Hourly output: the deferred timesteps are integrated before every output of the column (SNOW_HEIGHT), not of the surface
+    (n_quiescent, _, _, n_aggregated), _ = get_quiescent_statistics(configure, quiescent_aggregation = 6, reduced_output = False, other = ['SNOW_HEIGHT'])
+    assert 0 < n_aggregated == n_quiescent
+    (n_quiescent, _, _, n_aggregated), _ = get_quiescent_statistics(configure, quiescent_aggregation = 6, reduced_output = False, other = ['SURFACE_TEMPERATURE'])
+    assert 0 < n_aggregated < n_quiescent
@@ -0,0 +1,37 @@
+"""
+    Regression tests of the ragged subsurface profiles (ragged_profiles = True): the re-expanded profiles round-trip to the
+    padded subsurface variables.
+"""
+
+import numpy as np
+from conftest import run_simulation, open_output
+from main.kernel.result import ResultClass, expand_ragged_profile
+
+def test_ragged_profiles_round_trip(configure):
+    """ Every ragged subsurface variable re-expands (expand_ragged_profile & ResultClass) to the padded variable of the same simulation """
+
+    configure(full_field = True, output_netcdf = 'padded.nc')
+    PADDED = open_output(run_simulation())
+
+    configure(full_field = True, ragged_profiles = True, output_netcdf = 'ragged.nc')
+    path = run_simulation()
+    RAGGED = open_output(path)
+
+    names = [name for name in RAGGED.data_vars if RAGGED[name].dims == ('layer_obs',)]
+    assert len(names) > 0
+    assert RAGGED.sizes['layer_obs'] == np.count_nonzero(np.isfinite(PADDED['LAYER_DENSITY'].values))
+
+    for name in names:
+        expanded = expand_ragged_profile(RAGGED, name, PADDED.sizes['layer'])
+        assert expanded.dims == PADDED[name].dims
+        np.testing.assert_array_equal(expanded.values, PADDED[name].values, err_msg = name)
+
+    # Lazy re-expansion of a subset (time & space) of the output file:
+    SUBSET = ResultClass(path).isel(time = slice(100, 110), x = slice(1, 3))['LAYER_TEMPERATURE']
+    np.testing.assert_array_equal(SUBSET.values[..., :PADDED.sizes['layer']],
+                                  PADDED['LAYER_TEMPERATURE'].isel(time = slice(100, 110), x = slice(1, 3)).values)
+
+    # Surface variables are identical:
+    for name in PADDED.data_vars:
+        if 'layer' not in PADDED[name].dims:
+            np.testing.assert_array_equal(RAGGED[name].values, PADDED[name].values, err_msg = name)
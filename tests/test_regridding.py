@@ -0,0 +1,42 @@
+"""
+    Regression tests of the fixed-depth profile regridding (profile_depth_grid): conservation of the remapped layer profiles.
+"""
+
+import numpy as np
+from main.kernel.regridding import remap_profile
+
+HEIGHT = np.array([0.13, 0.27, 0.05, 0.4, 0.9, 1.25])
+EDGES = np.arange(0, 16) * 0.25                                     # 3.75 m cutoff, below the bottom of the profile (3.0 m)
+
+def test_sum_remapping_conserves_extensive_variables():
+    """ Extensive variables (e.g. refreezing) are split by overlap: the column total is conserved """
+    values = np.array([0.02, 0.0, 0.01, 0.005, 0.03, 0.001])
+    remapped = remap_profile(HEIGHT, values, EDGES, 'sum')
+    assert np.isclose(np.nansum(remapped), values.sum(), rtol = 1e-12)
+
+    # Above a cutoff within the profile, the total down to the cutoff depth is conserved:
+    remapped = remap_profile(HEIGHT, values, EDGES[:5], 'sum')
+    assert np.isclose(remapped.sum(), values[:4].sum() + values[4] * (1.0 - HEIGHT[:4].sum()) / HEIGHT[4], rtol = 1e-12)
+
+def test_mean_remapping_conserves_depth_integral():
+    """ Intensive variables (e.g. density) are overlap-weighted means: the depth integral is conserved & constants are preserved """
+    values = np.array([300.0, 350.0, 910.0, 450.0, 600.0, 917.0])
+    remapped = remap_profile(HEIGHT, values, EDGES, 'mean')
+    covered = np.diff(np.minimum(EDGES, HEIGHT.sum()))
+    assert np.isclose(np.nansum(remapped * covered), np.sum(values * HEIGHT), rtol = 1e-12)
+
+    constant = remap_profile(HEIGHT, np.full(HEIGHT.shape, 917.0), EDGES, 'mean')
+    np.testing.assert_allclose(constant[np.isfinite(constant)], 917.0, rtol = 1e-12)
+
+def test_nearest_remapping_and_missing_intervals():
+    """ Categorical variables take the layer at the interval centre, intervals below the bottom of the profile are missing """
+    values = np.array([2005.0, 2004.0, 2003.0, 2002.0, 2001.0, 2000.0])
+    remapped = remap_profile(HEIGHT, values, EDGES, 'nearest')
+
+    bottom = HEIGHT.sum()
+    centres = 0.5 * (EDGES[1:] + EDGES[:-1])
+    layer = np.searchsorted(np.cumsum(HEIGHT), centres, side = 'right')
+    np.testing.assert_array_equal(remapped[EDGES[:-1] < bottom], values[layer[EDGES[:-1] < bottom]])
+
+    for method in ['mean','sum','nearest']:
+        assert np.all(np.isnan(remap_profile(HEIGHT, values, EDGES, method)[EDGES[:-1] >= bottom])), method
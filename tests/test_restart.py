@@ -0,0 +1,23 @@
+"""
+    Regression tests of the restart files & append mode (restart_input, restart_output, append_output): a simulation continued
+    from its restart file & appended to its output store is identical to the continuous simulation.
+"""
+
+from conftest import run_simulation, assert_identical_outputs
+
+def test_restart_append_matches_continuous_simulation(configure):
+    """ Jan 1-10 (restart file written) continued over Jan 11-20 (restart file read, appended to the Zarr store) equals the
+        continuous Jan 1-20 simulation (surface series & subsurface profiles) bit for bit """
+
+    options = {'output_format': 'zarr', 'full_field': True}
+
+    configure(output_netcdf = 'continuous.zarr', **options)
+    reference = run_simulation()
+
+    configure(output_netcdf = 'continued.zarr', time_end = '2000-01-10T23:00', restart_output = 'restart.nc', **options)
+    run_simulation()
+    configure(output_netcdf = 'continued.zarr', time_start = '2000-01-11T00:00', restart_input = 'restart.nc', restart_output = None,
+              append_output = True, **options)
+    path = run_simulation()
+
+    assert_identical_outputs(path, reference)
@@ -0,0 +1,33 @@
+"""
+    Regression tests of the packed result blocks: the result header & the contiguous blocks of the requested output variables.
+"""
+
+import numpy as np
+from main.kernel.output_variables import get_output_variables, get_result_layout, create_result_blocks, get_profile_size
+
+def test_result_layout_splits_series_and_profiles(configure):
+    """ The header holds every requested variable once, the time series & subsurface profiles in their own block """
+
+    configure(full_field = True, other = ['SNOW_HEIGHT','FIRN_FACIE'], subsurface_variables = ['DENSITY','TEMPERATURE'])
+    HEADER = get_result_layout()
+
+    assert HEADER['series'] + HEADER['profiles'] == get_output_variables()
+    assert HEADER['profiles'] == ['LAYER_DENSITY','LAYER_TEMPERATURE']
+    assert 'FIRN_FACIE' in HEADER['series']
+
+def test_result_blocks_shape_and_initial_values(configure):
+    """ Each block is a contiguous (n_variables, ...) array: missing values (NaN), integer variables initialised with zeros """
+
+    configure(full_field = True, other = ['SNOW_HEIGHT','FIRN_FACIE'], subsurface_variables = ['DENSITY'])
+    HEADER = get_result_layout()
+    BLOCKS = create_result_blocks(HEADER, (48,), level_periods = {}, profile_shape = (2,))
+
+    assert BLOCKS['series'].shape == (len(HEADER['series']), 48)
+    assert BLOCKS['profiles'].shape == (1, 2, get_profile_size())
+    assert BLOCKS['layer_count'].shape == (2,)
+    assert all(BLOCKS[block].flags['C_CONTIGUOUS'] for block in ['series','profiles'])
+
+    facie = HEADER['series'].index('FIRN_FACIE')
+    assert np.all(BLOCKS['series'][facie] == 0)
+    assert np.all(np.isnan(np.delete(BLOCKS['series'], facie, axis = 0)))
+    assert np.all(np.isnan(BLOCKS['profiles']))
@@ -0,0 +1,56 @@
+"""
+    Regression tests of the per-node result cache (result_cache): selection of the requested output variables from the cached
+    results, rejection of lower precisions, and simulations served from the cache.
+"""
+
+import numpy as np
+import main.kernel.fricosipy_core
+from conftest import run_simulation, open_output
+from main.kernel.cache import select_cached_result
+
+CACHED_HEADER = {'series': ['AIR_TEMPERATURE','LATENT','SURFACE_MELT','SNOW_HEIGHT'], 'profiles': ['LAYER_DENSITY']}
+
+def get_cached_result(dtype):
+    """ Returns a cached node result (indY, indX, BLOCKS, HEADER, STATE) of the given precision """
+    BLOCKS = {'series': np.arange(4 * 6, dtype = dtype).reshape(4, 6), 'profiles': np.ones((1, 6, 3), dtype = dtype),
+              'layer_count': np.full(6, 3, dtype = 'int32'), 'runtime': 1.5}
+    return (1, 2, BLOCKS, CACHED_HEADER, {'melted': False})
+
+def test_select_subset_of_cached_result(configure):
+    """ The requested variables are selected (in the requested order) & cast to the output precision, other blocks pass through """
+
+    configure(precision = 'single')
+    HEADER = {'series': ['SNOW_HEIGHT','AIR_TEMPERATURE'], 'profiles': []}
+    indY, indX, BLOCKS, SELECTED_HEADER, STATE = select_cached_result(get_cached_result('float64'), 1, 2, HEADER)
+
+    assert (indY, indX, SELECTED_HEADER, STATE) == (1, 2, HEADER, {'melted': False})
+    assert BLOCKS['series'].dtype == np.float32
+    np.testing.assert_array_equal(BLOCKS['series'], np.arange(24, dtype = np.float32).reshape(4, 6)[[3, 0]])
+    assert BLOCKS['profiles'].shape == (0, 6, 3)
+    assert (BLOCKS['runtime'] == 1.5) and np.all(BLOCKS['layer_count'] == 3)
+
+def test_cached_result_rejected(configure):
+    """ A cached result is not used if it misses a requested variable or was stored in a lower precision """
+
+    configure(precision = 'single')
+    assert select_cached_result(get_cached_result('float32'), 1, 2, {'series': ['RUNOFF'], 'profiles': []}) is None
+    assert select_cached_result(get_cached_result('float16'), 1, 2, {'series': ['LATENT'], 'profiles': []}) is None
+    assert select_cached_result(get_cached_result('float32'), 1, 2, {'series': ['LATENT'], 'profiles': []}) is not None
+
+def test_cached_simulation_of_other_output_variables(configure, monkeypatch):
+    """ A simulation of another selection of output variables is served from the cache, with the values of the first simulation """
+
+    configure(result_cache = True, full_field = True, output_netcdf = 'cache_first.nc')
+    REFERENCE = open_output(run_simulation())
+
+    def fricosipy_core(*args, **kwargs):
+        raise AssertionError('Error: node simulated despite the result cache')
+    monkeypatch.setattr(main.kernel.fricosipy_core, 'fricosipy_core', fricosipy_core)
+
+    configure(result_cache = True, full_field = True, meteorological_variables = ['WIND_SPEED'], surface_energy_fluxes = ['LATENT'],
+              subsurface_variables = ['TEMPERATURE'], output_netcdf = 'cache_subset.nc')
+    RESULT = open_output(run_simulation())
+
+    for name in ['WIND_SPEED','LATENT','SURFACE_MASS_BALANCE','LAYER_TEMPERATURE']:
+        np.testing.assert_array_equal(RESULT[name].values, REFERENCE[name].values, err_msg = name)
+    assert ('AIR_TEMPERATURE' not in RESULT) and ('LAYER_DENSITY' not in RESULT)
@@ -0,0 +1,75 @@
+"""
+    Regression tests of the node scheduling (node_ordering = 'cost'): ordering by the logged runtimes, the cost model fitted to
+    static features with missing values, the sun-facing fallback of each hemisphere and the runtime log.
+"""
+
+import os
+import numpy as np
+import xarray as xr
+from main.kernel.scheduling import get_node_features, impute_node_features, load_node_runtimes, order_nodes, write_node_runtimes, get_runtime_log
+
+def get_static(latitude = 46.0, thickness = True):
+    """ Returns a 3 x 4 static grid: elevation increasing along x, aspects alternating between north (y = 0, 2) & south (y = 1) """
+    y, x = np.arange(3) * 100.0, np.arange(4) * 100.0
+    STATIC = xr.Dataset({'ELEVATION': (('y','x'), np.broadcast_to(3000.0 + 100.0 * np.arange(4), (3, 4)).copy()),
+                         'ASPECT': (('y','x'), np.broadcast_to(np.array([0.0, 180.0, 0.0])[:, None], (3, 4)).copy()),
+                         'SLOPE': (('y','x'), np.full((3, 4), 10.0)), 'LATITUDE': (('y','x'), np.full((3, 4), latitude))},
+                        coords = {'y': y, 'x': x})
+    if thickness:
+        STATIC['THICKNESS'] = (('y','x'), 50.0 + 10.0 * np.arange(12, dtype = np.float64).reshape(3, 4))
+    return STATIC
+
+NODES = [(y, x) for y in range(3) for x in range(4)]
+
+def test_sun_facing_nodes_first_without_logged_runtimes(configure, tmp_path):
+    """ The lowest nodes come first, for equal elevations the south-facing nodes in the northern hemisphere and the north-facing
+        nodes in the southern hemisphere """
+
+    configure(data_path = str(tmp_path) + '/', node_ordering = 'cost')
+    ordered = order_nodes(get_static(46.0), NODES)
+    assert [node for node in ordered if node[1] == 0] == [(1, 0), (0, 0), (2, 0)]
+    assert [node for node in ordered if node[0] == 1] == [(1, 0), (1, 1), (1, 2), (1, 3)]
+
+    ordered = order_nodes(get_static(-46.0), NODES)
+    assert [node for node in ordered if node[1] == 0] == [(0, 0), (2, 0), (1, 0)]
+    assert [node for node in ordered if node[0] == 0] == [(0, 0), (0, 1), (0, 2), (0, 3)]
+
+def test_missing_features_imputed(configure, tmp_path):
+    """ Non-finite features are replaced by the median of the feature: the cost model is fitted & the nodes are ordered """
+
+    configure(data_path = str(tmp_path) + '/', node_ordering = 'cost')
+    STATIC = get_static()
+    STATIC['THICKNESS'][0, 1] = np.nan
+    STATIC['THICKNESS'][2, 3] = np.inf
+
+    FEATURES = impute_node_features(get_node_features(STATIC, NODES))
+    assert np.all(np.isfinite(FEATURES))
+    assert FEATURES[1, 4] == FEATURES[11, 4] == np.median(STATIC.THICKNESS.values[np.isfinite(STATIC.THICKNESS.values)])
+    np.testing.assert_array_equal(impute_node_features(np.full((3, 2), np.nan)), 0.0)
+
+    # Logged runtimes of the nodes with finite features, increasing with the thickness (the imputed nodes are predicted):
+    RUNTIMES = {node: (1e-3 * STATIC.THICKNESS.values[node], 1) for node in NODES if node not in [(0, 1), (2, 3)]}
+    os.makedirs(os.path.join(str(tmp_path), 'output'))
+    write_node_runtimes(STATIC, RUNTIMES)
+    ordered = order_nodes(STATIC, NODES)
+    assert sorted(ordered) == sorted(NODES)
+    logged = [node for node in ordered if node in RUNTIMES]
+    assert logged == sorted(RUNTIMES, key = lambda node: -RUNTIMES[node][0])
+
+def test_runtime_log(configure, tmp_path):
+    """ Runtimes are logged per timestep by the co-ordinates of the node, replace earlier runtimes and NaN runtimes are not logged """
+
+    configure(data_path = str(tmp_path) + '/', node_ordering = 'cost')
+    os.makedirs(os.path.join(str(tmp_path), 'output'))
+    STATIC = get_static()
+    write_node_runtimes(STATIC, {(0, 0): (2.0, 100), (1, 2): (3.0, 100), (2, 3): (np.nan, 100)})
+    write_node_runtimes(STATIC, {(0, 0): (np.nan, 100), (1, 2): (6.0, 100), (2, 1): (1.0, 0)})
+    assert os.path.isfile(get_runtime_log())
+
+    RUNTIMES = load_node_runtimes(STATIC, [(0, 0), (1, 2), (2, 3), (2, 1)])
+    np.testing.assert_array_equal(RUNTIMES, [0.02, 0.06, np.nan, np.nan])
+
+    # All nodes logged: ordered by their logged runtimes
+    write_node_runtimes(STATIC, {node: (1.0 + n % 5, 1) for n, node in enumerate(NODES)})
+    ordered = order_nodes(STATIC, NODES)
+    assert [NODES.index(node) % 5 for node in ordered] == sorted([n % 5 for n in range(12)], reverse = True)
@@ -0,0 +1,42 @@
+"""
+    Regression tests of the cyclic spin-up (spin_up_cycles): convergence detection & early termination, and the state carried
+    over to the main simulation.
+"""
+
+import re
+import numpy as np
+import FRICOSIPY
+from main.kernel.fricosipy_core import spin_up_node, get_spin_up_profile, SPIN_UP_STATE
+
+SPIN_UP_PERIOD = ('2000-01-01T00:00', '2000-01-05T23:00')
+
+def spin_up(configure, capsys, cycles, tolerances):
+    """ Spins up node (1, 2) of the synthetic glacier and returns its state & the number of cycles (converged or not) """
+    configure(spin_up_cycles = cycles, spin_up_period = SPIN_UP_PERIOD, spin_up_tolerances = tolerances)
+    IO = FRICOSIPY.IOClass()
+    METEO, STATIC, ILLUMINATION = IO.load_meteo_file(), IO.load_static_file(), IO.load_illumination_file()
+    capsys.readouterr()
+    STATE = spin_up_node(STATIC.isel(y = 1, x = 2), METEO, ILLUMINATION.isel(y = 1, x = 2), 1, 2)
+    converged, cycles = re.search(r'spin-up (converged|not converged) after (\d+) cycles', capsys.readouterr().out).groups()
+    return STATE, converged == 'converged', int(cycles)
+
+def test_spin_up_stops_when_converged(configure, capsys):
+    """ The spin-up stops at the first cycle changing the firn state by less than the tolerances, the previous cycle did not """
+
+    tolerances = {'density': 5.0, 'temperature': 0.1, 'height': 0.05}
+    STATE, converged, cycles = spin_up(configure, capsys, 30, tolerances)
+    assert converged and (1 < cycles < 30)
+    assert sorted(STATE) == sorted(SPIN_UP_STATE)
+
+    # Firn state of the previous cycle (the spin-up stopped one cycle earlier):
+    PREVIOUS_STATE, _, previous_cycles = spin_up(configure, capsys, cycles - 1, tolerances)
+    assert previous_cycles == cycles - 1
+    changes = [np.nan_to_num(np.abs(current - previous)) for previous, current in
+               zip(get_spin_up_profile(PREVIOUS_STATE['GRID']), get_spin_up_profile(STATE['GRID']))]
+    assert all(np.all(change <= tolerances[name]) for name, change in zip(['density','temperature','height'], changes))
+
+def test_spin_up_stops_after_maximum_cycles(configure, capsys):
+    """ Without convergence, the spin-up stops after spin_up_cycles cycles """
+
+    _, converged, cycles = spin_up(configure, capsys, 3, {'density': -1.0, 'temperature': -1.0, 'height': -1.0})
+    assert (not converged) and (cycles == 3)
@@ -0,0 +1,48 @@
+"""
+    Regression tests of the multi-station interpolation weights (get_station_weights): inverse distance weighting of the
+    nearest stations of each node.
+"""
+
+import numpy as np
+import xarray as xr
+import pytest
+from main.kernel.forcing import get_station_weights
+
+EASTING = np.array([0.0, 1000.0, 2500.0, 0.0, 4000.0])
+NORTHING = np.array([0.0, 0.0, 500.0, 3000.0, 4000.0])
+
+def get_inputs():
+    """ Returns a 2 x 3 static grid & five meteorological stations (the second station lies on node (0, 1)) """
+    y, x = np.arange(2) * 1000.0, np.arange(3) * 1000.0
+    STATIC = xr.Dataset({'EASTING': (('y','x'), np.broadcast_to(x, (2, 3)).copy()), 'NORTHING': (('y','x'), np.broadcast_to(y[:, None], (2, 3)).copy())},
+                        coords = {'y': y, 'x': x})
+    METEO = xr.Dataset({'STATION_EASTING': ('station', EASTING), 'STATION_NORTHING': ('station', NORTHING),
+                        'STATION_ALTITUDE': ('station', np.full(5, 3000.0))})
+    return STATIC, METEO
+
+def test_inverse_distance_weights_of_the_nearest_stations(configure):
+    """ Each node combines its station_neighbours nearest stations with normalised 1 / distance ** station_idw_power weights """
+
+    configure(station_neighbours = 3, station_idw_power = 2.0)
+    STATIC, METEO = get_inputs()
+    nodes = [(1, 0), (1, 2), (0, 2)]
+    WEIGHTS = get_station_weights(STATIC, METEO, nodes).toarray()
+
+    assert WEIGHTS.shape == (3, 5)
+    np.testing.assert_allclose(WEIGHTS.sum(axis = 1), 1.0, rtol = 1e-12)
+    for weights, (y, x) in zip(WEIGHTS, nodes):
+        distances = np.hypot(EASTING - STATIC.EASTING.values[y, x], NORTHING - STATIC.NORTHING.values[y, x])
+        nearest = np.argsort(distances)[:3]
+        expected = np.zeros(5)
+        expected[nearest] = 1.0 / distances[nearest] ** 2.0
+        np.testing.assert_allclose(weights, expected / expected.sum(), rtol = 1e-12)
+
+def test_node_at_a_station_and_missing_station_coordinates(configure):
+    """ A node at a station only uses that station, the station co-ordinates & altitudes must be supplied """
+
+    configure(station_neighbours = 3, station_idw_power = 2.0)
+    STATIC, METEO = get_inputs()
+    np.testing.assert_array_equal(get_station_weights(STATIC, METEO, [(0, 1)]).toarray(), [[0.0, 1.0, 0.0, 0.0, 0.0]])
+
+    with pytest.raises(ValueError, match = 'STATION_ALTITUDE'):
+        get_station_weights(STATIC, METEO.drop_vars('STATION_ALTITUDE'), [(0, 1)])
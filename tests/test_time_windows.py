@@ -0,0 +1,23 @@
+"""
+    Regression tests of the time windows (time_window): a simulation chained over successive time windows (state handoff) is
+    identical to the simulation of the whole period.
+"""
+
+import pandas as pd
+from conftest import run_simulation, assert_identical_outputs, METEO_START, METEO_END
+from main.kernel.state import get_time_windows
+
+def test_window_chained_simulation_matches_unwindowed(configure):
+    """ Surface series, subsurface profiles & daily aggregates of 4-day time windows equal the unwindowed simulation bit for bit """
+
+    options = {'full_field': True, 'aggregation_levels': {'daily': ['SURFACE_MASS_BALANCE','RUNOFF','AIR_TEMPERATURE']}}
+
+    configure(output_netcdf = 'unwindowed.nc', **options)
+    reference = run_simulation()
+
+    configure(output_netcdf = 'windowed.nc', time_window = '4D', **options)
+    assert len(get_time_windows(pd.date_range(METEO_START, METEO_END, freq = 'h'))) == 5
+    path = run_simulation()
+
+    assert_identical_outputs(path, reference)
+    assert_identical_outputs(path, reference, group = 'daily')
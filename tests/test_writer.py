@@ -0,0 +1,64 @@
+"""
+    Regression tests of the background result writer (WriterClass): queued node results are written in order, a full queue
+    blocks the client (backpressure) and writer errors are raised in the client.
+"""
+
+import threading
+import pytest
+from main.kernel.writer import WriterClass
+
+class RecordingIO:
+    """ Output file stand-in recording the written nodes (the writes wait until released) """
+
+    def __init__(self, fail_at = None):
+        self.written = []
+        self.release = threading.Event()
+        self.fail_at = fail_at
+
+    def write_local_results(self, indY, indX, BLOCKS, HEADER):
+        self.release.wait()
+        if (indY, indX) == self.fail_at:
+            raise ValueError('Error: write failed')
+        self.written.append((indY, indX))
+
+def test_writer_writes_all_results_in_order():
+    """ All queued node results are written (in queue order) before close() returns """
+    IO = RecordingIO()
+    IO.release.set()
+    writer = WriterClass(IO, 2)
+    for node in range(10):
+        writer.put((node, 0, {}, {}))
+    writer.close()
+    assert IO.written == [(node, 0) for node in range(10)]
+
+def test_writer_backpressure_blocks_client():
+    """ put() blocks while the queue is full and resumes once the writer catches up """
+    IO = RecordingIO()
+    writer = WriterClass(IO, 1)
+
+    def client():
+        for node in range(3):
+            writer.put((node, 0, {}, {}))
+    thread = threading.Thread(target = client, daemon = True)
+    thread.start()
+
+    # One result in the writer, one in the queue: the third put() blocks
+    thread.join(timeout = 0.5)
+    assert thread.is_alive()
+
+    IO.release.set()
+    thread.join(timeout = 5.0)
+    assert not thread.is_alive()
+    writer.close()
+    assert len(IO.written) == 3
+
+def test_writer_error_raised_in_client():
+    """ A write error is raised by the next put() / close() and the remaining results are discarded """
+    IO = RecordingIO(fail_at = (1, 0))
+    IO.release.set()
+    writer = WriterClass(IO, 4)
+    with pytest.raises(ValueError, match = 'write failed'):
+        for node in range(4):
+            writer.put((node, 0, {}, {}))
+        writer.close()
+    assert IO.written == [(0, 0)]
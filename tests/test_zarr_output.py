@@ -0,0 +1,17 @@
+"""
+    Regression tests of the Zarr output backend (output_format = 'zarr'): the node results written by the workers into their
+    regions of the Zarr store are identical to the NetCDF output file.
+"""
+
+from conftest import run_simulation, assert_identical_outputs
+
+def test_zarr_output_matches_netcdf_output(configure):
+    """ Surface series & subsurface profiles of the Zarr store equal the NetCDF output file bit for bit """
+
+    configure(full_field = True, output_netcdf = 'output.nc')
+    reference = run_simulation()
+
+    configure(full_field = True, output_format = 'zarr', output_netcdf = 'output.zarr')
+    path = run_simulation()
+
+    assert_identical_outputs(path, reference)
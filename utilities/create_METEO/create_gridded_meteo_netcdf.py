@@ -0,0 +1,122 @@
+"""
+    ==================================================================
+
+          CREATE GRIDDED METEOROLOGICAL (METEO) INPUT FILE PROGRAM
+
+        This file creates a gridded model input meteo file from a
+        meteorological dataset (e.g. reanalysis or regional climate
+        model output) varying through time and space (t,y,x):
+
+        T2 (t,y,x)     ::    Air temperature [°C]
+        U2 (t,y,x)     ::    Wind speed [m s-1]
+        RH2 (t,y,x)    ::    Relative humidity [%]
+        PRES (t,y,x)   ::    Atmospheric pressure [hPa]
+        RRR (t,y,x)    ::    Precipitation [mm]
+        N (t,y,x)      ::    Fractional cloud cover [0-1]
+                             (or SWin & LWin [W m-2])
+
+        The meteorological data is interpolated onto the spatial
+        grid of the static file (no further downscaling is applied
+        by the model) and stored in tiles (time_chunk, tile, tile),
+        so that each worker only reads the columns of its own nodes.
+
+    ==================================================================
+"""
+
+import os
+import xarray as xr
+import numpy as np
+import argparse
+
+# ============================================================================================= #
+
+def create_gridded_meteo_input(gridded_file, static_file, meteo_file, tile_size = 16, time_chunk = 720, start_date = None, end_date = None):
+    """ The create gridded meteo program creates the gridded input meteorological (meteo) file:
+
+        Parameters:
+                Tile size        ::    Spatial chunk size (y,x) of the output file [grid nodes]
+                Time chunk       ::    Temporal chunk size of the output file [timesteps]
+                Start date       ::    Start date of meterological data subset [yyyy-mm-dd hh:mm]
+                End date         ::    End date of meterological data subset [yyyy-mm-dd hh:mm]
+        Input:
+                Gridded (t,y,x)  ::    NetCDF file containing gridded meteorological data
+                STATIC (y,x)     ::    Input static file (model spatial grid)
+        Output:
+                METEO (t,y,x)    ::    Xarray dataset containing gridded meteorological data
+
+    """
+
+    print('\n\t ==================================')
+    print('\t CREATE GRIDDED METEOROLOGICAL FILE')
+    print('\t ==================================\n')
+
+    # ======================================= #
+    # Read Gridded Meteorological & Static Data
+    # ======================================= #
+
+    ds = xr.open_dataset(os.path.join('../../data/meteo/',gridded_file))
+    STATIC = xr.open_dataset(os.path.join('../../data/static/',static_file))
+
+    # Check input data:
+    required_variables = {'T2', 'PRES', 'U2', 'RH2'}
+    if not (required_variables.issubset(ds.data_vars) and \
+       ({'N'}.issubset(ds.data_vars) or {'SWin', 'LWin'}.issubset(ds.data_vars) or {'SWin', 'N'}.issubset(ds.data_vars) or {'LWin', 'N'}.issubset(ds.data_vars)) and \
+       ({'RRR'}.issubset(ds.data_vars) or {'D', 'PRECIPITATION_ANOMALY'}.issubset(ds.data_vars))):
+        raise ValueError('Error: Missing meteorological variables (see utilities/create_METEO/create_meteo_netcdf.py for the variable convention)')
+    if not {'time', 'y', 'x'}.issubset(ds.dims):
+        raise ValueError('Error: The gridded meteorological data must have the dimensions (time, y, x)')
+
+    # ===================== #
+    # Select Temporal Range
+    # ===================== #
+
+    if ((start_date != None) & (end_date != None)):
+        ds = ds.sel(time = slice(start_date, end_date))
+
+    # ==================================== #
+    # Interpolate onto the Static Grid (y,x)
+    # ==================================== #
+
+    if not (np.array_equal(ds.y.values, STATIC.y.values) and np.array_equal(ds.x.values, STATIC.x.values)):
+        ds = ds.interp(y = STATIC.y, x = STATIC.x, method = 'linear', kwargs = {'fill_value': 'extrapolate'})
+    ds = ds.transpose('time', 'y', 'x')
+
+    print('\t INFORMATION:')
+    print('\t ==============================================================')
+    print('\t Temporal range from %s until %s. Time steps: %s ' % (ds.time.values[0], ds.time.values[-1], ds.sizes['time']))
+    print('\t Spatial grid: %s x %s grid nodes' % (ds.sizes['y'], ds.sizes['x']))
+    print('\t Chunks (time, y, x): (%s, %s, %s)' % (min(time_chunk, ds.sizes['time']), min(tile_size, ds.sizes['y']), min(tile_size, ds.sizes['x'])))
+    print('\t Input Gridded Meteorological Data: ', gridded_file)
+    print('\t Output Meteorological Dataset: ', meteo_file)
+    print('\t ==============================================================\n')
+
+    # ============================== #
+    # Write Input Meteo File to Disc
+    # ============================== #
+
+    chunksizes = (min(time_chunk, ds.sizes['time']), min(tile_size, ds.sizes['y']), min(tile_size, ds.sizes['x']))
+    encoding = {var: {'zlib': True, 'complevel': 2, 'chunksizes': chunksizes} for var in ds.data_vars if ds[var].dims == ('time', 'y', 'x')}
+    ds.to_netcdf(os.path.join('../../data/meteo/',meteo_file), encoding = encoding)
+
+    print('\n\t =========================================')
+    print('\t GRIDDED INPUT METEOROLOGICAL FILE CREATED')
+    print('\t =========================================\n')
+
+# ============================================================================================= #
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Create gridded meteo input file (on the static grid) from a gridded NetCDF file.')
+    parser.add_argument('-g', '-gridded_file', dest='gridded_file', help='Gridded meteorological NetCDF file (time, y, x)')
+    parser.add_argument('-i', '-static_file', dest='static_file', help='Static file')
+    parser.add_argument('-m', '-meteo_file', dest='meteo_file', help='Meteo file')
+    parser.add_argument('-t', '-tile_size', dest='tile_size', type=int, default=16, help='Spatial chunk (tile) size [grid nodes]')
+    parser.add_argument('-k', '-time_chunk', dest='time_chunk', type=int, default=720, help='Temporal chunk size [timesteps]')
+    parser.add_argument('-s', '-start_date', dest='start_date', help='Start date')
+    parser.add_argument('-e', '-end_date', dest='end_date', help='End date')
+
+    args = parser.parse_args()
+
+    create_gridded_meteo_input(args.gridded_file, args.static_file, args.meteo_file, args.tile_size, args.time_chunk, args.start_date, args.end_date)
+
+# ============================================================================================= #